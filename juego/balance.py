@@ -0,0 +1,194 @@
+"""
+Buscador automático de balance para las estadísticas del roster.
+
+Trata (max_vida, daño_base) de cada campeón como parámetros y busca por
+descenso de coordenadas una configuración en la que todos los cruces se
+acerquen al 50%. Cada configuración se evalúa con duelos por lotes sin
+pantalla (combate_vectorizado) jugando ambos órdenes de cada cruce, con
+las mismas semillas en todas las evaluaciones (números aleatorios comunes):
+así dos configuraciones se comparan sin que el ruido decida.
+
+Las evaluaciones se guardan en una caché en disco (JSON por líneas), de
+modo que repetir o continuar una búsqueda reutiliza lo ya calculado.
+
+Uso:
+    python balance.py --duelos 10000 --evaluaciones 300
+"""
+import json
+import os
+import sys
+import time
+
+import combate
+import combate_vectorizado
+
+RUTA_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".balance_cache.jsonl")
+LIMITES_VIDA = (60, 220)
+LIMITES_DAÑO = (5, 30)
+PASO_VIDA = 10  # Pasos iniciales del descenso (se reducen a la mitad hasta 1)
+PASO_DAÑO = 2
+
+
+def _firma_reglas():
+    """Constantes de combate.py: si cambian las reglas, la caché vieja no sirve."""
+    return sorted((k, v) for k, v in vars(combate).items()
+                  if k.isupper() and isinstance(v, (int, float)))
+
+
+class CacheEvaluaciones:
+    """Caché en disco clave -> tasas de victoria. Solo se añaden líneas al final."""
+    def __init__(self, ruta=RUTA_CACHE):
+        self.ruta = ruta
+        self.datos = {}
+        self.aciertos = 0
+        if ruta and os.path.exists(ruta):
+            with open(ruta, encoding="utf-8") as f:
+                for linea in f:
+                    try:
+                        entrada = json.loads(linea)
+                    except ValueError:
+                        continue  # Línea a medias de una ejecución interrumpida
+                    self.datos[entrada["clave"]] = entrada["tasas"]
+
+    def obtener(self, clave):
+        tasas = self.datos.get(clave)
+        if tasas is not None:
+            self.aciertos += 1
+        return tasas
+
+    def guardar(self, clave, tasas):
+        self.datos[clave] = tasas
+        if self.ruta:
+            with open(self.ruta, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"clave": clave, "tasas": tasas}) + "\n")
+
+
+def tasas_cruces(estadisticas, duelos, semilla=0, cache=None):
+    """
+    Tasa de victoria de A contra B para cada par {A, B}, media de los dos
+    órdenes (A empieza / B empieza), así la ventaja de empezar se cancela.
+    Retorna {"A|B": tasa de A}.
+    """
+    nombres = list(estadisticas)
+    clave = json.dumps([[[n, *estadisticas[n]] for n in nombres], duelos, semilla, _firma_reglas()])
+    if cache is not None:
+        tasas = cache.obtener(clave)
+        if tasas is not None:
+            return tasas
+
+    tasas = {}
+    for i, a in enumerate(nombres):
+        for j, b in enumerate(nombres[i + 1:], start=i + 1):
+            # Semilla fija por cruce: números aleatorios comunes entre evaluaciones
+            base = semilla * 1000 + i * 10 + j
+            ida = combate_vectorizado.simular_lote(a, b, duelos, base * 2, estadisticas)
+            vuelta = combate_vectorizado.simular_lote(b, a, duelos, base * 2 + 1, estadisticas)
+            gana_a = (ida["victorias"][1] + vuelta["victorias"][2]
+                      + (ida["victorias"][0] + vuelta["victorias"][0]) / 2)
+            tasas[f"{a}|{b}"] = float(gana_a / (2 * duelos))
+    if cache is not None:
+        cache.guardar(clave, tasas)
+    return tasas
+
+
+def desbalance(tasas):
+    """Error cuadrático medio de las tasas respecto al 50%."""
+    return sum((t - 0.5) ** 2 for t in tasas.values()) / len(tasas)
+
+
+def tasa_media(tasas, nombre):
+    """Tasa de victoria media de `nombre` contra el resto."""
+    propias = []
+    for par, t in tasas.items():
+        a, b = par.split("|")
+        if a == nombre:
+            propias.append(t)
+        elif b == nombre:
+            propias.append(1 - t)
+    return sum(propias) / len(propias)
+
+
+def buscar_balance(inicial=combate.ESTADISTICAS, duelos=10000, semilla=0,
+                   max_evaluaciones=300, cache=None, al_mejorar=None):
+    """
+    Descenso de coordenadas sobre (max_vida, daño_base) de cada campeón:
+    prueba subir y bajar cada parámetro un paso, se queda con el mejor
+    movimiento que reduzca el desbalance y, cuando ninguno mejora, reduce
+    los pasos a la mitad. Retorna (estadisticas, tasas, evaluaciones).
+    """
+    actual = {n: tuple(v) for n, v in inicial.items()}
+    tasas = tasas_cruces(actual, duelos, semilla, cache)
+    error = desbalance(tasas)
+    evaluaciones = 1
+    pasos = [PASO_VIDA, PASO_DAÑO]
+    limites = (LIMITES_VIDA, LIMITES_DAÑO)
+
+    while evaluaciones < max_evaluaciones and max(pasos) >= 1:
+        mejoro = False
+        for nombre in actual:
+            for k in (0, 1):  # 0 = max_vida, 1 = daño_base
+                if pasos[k] < 1:
+                    continue
+                mejor = None
+                for signo in (1, -1):
+                    valor = actual[nombre][k] + signo * pasos[k]
+                    if not limites[k][0] <= valor <= limites[k][1]:
+                        continue
+                    candidato = dict(actual)
+                    stats = list(actual[nombre])
+                    stats[k] = valor
+                    candidato[nombre] = tuple(stats)
+                    tasas_c = tasas_cruces(candidato, duelos, semilla, cache)
+                    evaluaciones += 1
+                    error_c = desbalance(tasas_c)
+                    if error_c < error and (mejor is None or error_c < mejor[0]):
+                        mejor = (error_c, candidato, tasas_c)
+                if mejor is not None:
+                    error, actual, tasas = mejor
+                    mejoro = True
+                    if al_mejorar:
+                        al_mejorar(actual, error, evaluaciones)
+                if evaluaciones >= max_evaluaciones:
+                    break
+            if evaluaciones >= max_evaluaciones:
+                break
+        if not mejoro:
+            pasos = [p // 2 for p in pasos]
+    return actual, tasas, evaluaciones
+
+
+def imprimir_propuesta(inicial, propuesta, tasas_antes, tasas_despues):
+    print(f"{'Campeón':<9} {'Vida':>11} {'Daño':>9} {'Victoria':>17}")
+    for nombre in propuesta:
+        (v0, d0), (v1, d1) = inicial[nombre], propuesta[nombre]
+        print(f"{nombre:<9} {v0:>4} -> {v1:<4} {d0:>3} -> {d1:<3}"
+              f" {tasa_media(tasas_antes, nombre):>7.2%} -> {tasa_media(tasas_despues, nombre):.2%}")
+    for etiqueta, tasas in (("antes", tasas_antes), ("después", tasas_despues)):
+        par, t = max(tasas.items(), key=lambda e: abs(e[1] - 0.5))
+        print(f"Cruce más desigual {etiqueta}: {par.replace('|', ' vs ')} {t:.2%}"
+              f"  (desbalance {desbalance(tasas):.5f})")
+    print("\nESTADISTICAS = {")
+    for nombre, (vida, daño) in propuesta.items():
+        print(f'    "{nombre}": ({vida}, {daño}),')
+    print("}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Buscar estadísticas balanceadas para el roster")
+    parser.add_argument("--duelos", type=int, default=10000, help="duelos por orden de cada cruce")
+    parser.add_argument("--evaluaciones", type=int, default=300, help="máximo de configuraciones")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--cache", default=RUTA_CACHE, help="archivo de caché ('' = sin caché)")
+    args = parser.parse_args()
+
+    cache = CacheEvaluaciones(args.cache or None)
+    t0 = time.perf_counter()
+    antes = tasas_cruces(combate.ESTADISTICAS, args.duelos, args.semilla, cache)
+    propuesta, despues, evaluaciones = buscar_balance(
+        combate.ESTADISTICAS, args.duelos, args.semilla, args.evaluaciones, cache,
+        al_mejorar=lambda stats, error, n: print(f"  [{n:>4}] desbalance {error:.5f}", file=sys.stderr))
+    dt = time.perf_counter() - t0
+    print(f"{evaluaciones} evaluaciones ({cache.aciertos} desde caché) en {dt:.1f} s\n")
+    imprimir_propuesta(combate.ESTADISTICAS, propuesta, antes, despues)
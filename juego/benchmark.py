@@ -0,0 +1,298 @@
+"""
+Banco de pruebas de rendimiento sin ventana.
+
+Ejecuta el bucle real de Juego (Juego.frame) con el driver de vídeo
+"dummy" de SDL y entrada guionizada (clics publicados en la cola de
+eventos de pygame), sin límite de FPS. Cada escenario corre en su propio
+proceso para que el pico de memoria (RSS) sea solo suyo:
+
+    seleccion        -> pantalla de selección quieta
+    pelea            -> elegir dos campeones y atacar sin parar; al ganar
+                        alguien se pulsa "Jugar de nuevo" y se repite
+    victoria         -> pantalla de victoria con el velo y el texto
+    ambiente_<N>     -> selección con N partículas de ambiente (50 ... 100k)
+    arranque         -> (con --arranque) tiempos de arranque en frío: importar
+                        personajes y juego, iniciar_aplicacion y primer frame
+
+Uso:
+    python benchmark.py --salida base.json
+    python benchmark.py --comparar base.json          # marca regresiones
+    python benchmark.py --escenarios pelea ambiente_10000 --frames 300
+    python benchmark.py --ambiente-proceso     # ambiente en otro proceso
+    python benchmark.py --arranque --escenarios    # solo el arranque
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+ESCENARIOS_BASE = ("seleccion", "pelea", "victoria")
+PARTICULAS_AMBIENTE = (50, 1000, 10000, 100000)
+FRAMES_CALENTAMIENTO = 30  # No se miden (cachés de texto, capas, atlas...)
+TOLERANCIA = 0.10          # Cambio relativo a partir del cual hay regresión
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # La salida es JSON
+
+# Posiciones de los botones (ver Juego.crear_interfaz_seleccion / iniciar_pelea)
+CLIC_ELEGIR_1 = (225, 380)
+CLIC_ELEGIR_2 = (505, 380)
+CLIC_ATACAR = (540, 630)
+CLIC_JUGAR_DE_NUEVO = (540, 525)
+
+
+def escenarios_por_defecto():
+    return list(ESCENARIOS_BASE) + [f"ambiente_{n}" for n in PARTICULAS_AMBIENTE]
+
+
+def pico_rss_mb():
+    """Pico de memoria residente del proceso en MB (None si no se puede medir)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KB, macOS en bytes
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+
+def percentil(ordenados, q):
+    if not ordenados:
+        return 0.0
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * q / 100))]
+
+
+# ============================================================
+# UN ESCENARIO (se ejecuta en el proceso hijo)
+# ============================================================
+def medir_escenario(nombre, frames, semilla=0):
+    """Corre `frames` frames del escenario y retorna sus métricas."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import random
+
+    import pygame
+
+    import juego as J
+
+    random.seed(semilla)
+    particulas = 0
+    if nombre.startswith("ambiente_"):
+        particulas = int(nombre.split("_", 1)[1])
+    elif nombre not in ESCENARIOS_BASE:
+        raise ValueError(f"Escenario desconocido: {nombre}")
+
+    if particulas:
+        # Mismo tipo (hilo o proceso) que elija juego.py, con otro tope
+        J.ambiente_bg = J.nuevo_ambiente(maximo=particulas, por_tick=particulas)
+    partida = J.Juego(fps_render=0, semilla=semilla)  # Sin límite: medimos cuánto tarda cada frame
+
+    def clic(pos):
+        pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=pos))
+
+    if particulas:
+        limite = time.perf_counter() + 10
+        while J.ambiente_bg.publicadas < particulas * 0.9 and time.perf_counter() < limite:
+            time.sleep(0.01)  # Esperar a que el hilo llene el cielo
+        if not J.ambiente_bg.is_alive():
+            raise RuntimeError("La simulación de ambiente terminó antes de tiempo")
+    elif nombre in ("pelea", "victoria"):
+        clic(CLIC_ELEGIR_1)
+        clic(CLIC_ELEGIR_2)
+        partida.frame()
+        if nombre == "victoria":
+            partida.jugador2.vida = 1
+            partida.jugador1.daño_base = 10 ** 6  # El primer golpe siempre mata
+            while partida.escena != "VICTORIA":
+                clic(CLIC_ATACAR)
+                partida.frame()
+
+    tiempos = []
+    for i in range(FRAMES_CALENTAMIENTO + frames):
+        if nombre == "pelea":
+            if partida.escena == "PELEA":
+                clic(CLIC_ATACAR)  # Se ignora mientras haya animación en curso
+            elif partida.escena == "VICTORIA":
+                clic(CLIC_JUGAR_DE_NUEVO)
+            else:
+                clic(CLIC_ELEGIR_1)
+                clic(CLIC_ELEGIR_2)
+        t0 = time.perf_counter()
+        partida.frame()
+        if i >= FRAMES_CALENTAMIENTO:
+            tiempos.append((time.perf_counter() - t0) * 1000)
+
+    publicadas = J.ambiente_bg.publicadas
+    J.ambiente_bg.activo = False
+    rss = pico_rss_mb()
+    total = sum(tiempos)
+    tiempos.sort()
+    return {
+        "frames": frames,
+        "fps": round(1000 * frames / total, 2) if total else 0.0,
+        "p50_ms": round(percentil(tiempos, 50), 3),
+        "p95_ms": round(percentil(tiempos, 95), 3),
+        "p99_ms": round(percentil(tiempos, 99), 3),
+        "max_ms": round(tiempos[-1], 3) if tiempos else 0.0,
+        "pico_rss_mb": round(rss, 1) if rss is not None else None,
+        "particulas": publicadas,
+    }
+
+
+# ============================================================
+# ARRANQUE EN FRÍO (cada medida en un intérprete nuevo)
+# ============================================================
+def medir_fases_arranque():
+    """Tiempos (ms) de cada fase del arranque en este proceso, que debe ser nuevo."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    fases = {}
+    t0 = time.perf_counter()
+    import personajes  # noqa: F401
+    fases["importar_personajes_ms"] = (time.perf_counter() - t0) * 1000
+    if "pygame" in sys.modules:
+        raise RuntimeError("Importar personajes no debería cargar pygame")
+
+    t0 = time.perf_counter()
+    import juego as J
+    fases["importar_juego_ms"] = (time.perf_counter() - t0) * 1000
+    if J.PANTALLA is not None or J.ambiente_bg is not None:
+        raise RuntimeError("Importar juego no debería abrir la ventana ni el ambiente")
+
+    t0 = time.perf_counter()
+    J.iniciar_aplicacion()
+    fases["iniciar_aplicacion_ms"] = (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    partida = J.Juego(fps_render=0)
+    partida.frame()
+    fases["primer_frame_ms"] = (time.perf_counter() - t0) * 1000
+    J.ambiente_bg.activo = False
+    return fases
+
+
+def medir_arranque(repeticiones=5):
+    """Mediana de cada fase del arranque en `repeticiones` procesos nuevos."""
+    muestras = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        proceso = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--hijo", "arranque"],
+            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        total = (time.perf_counter() - t0) * 1000
+        if proceso.returncode != 0:
+            raise RuntimeError(f"La medida de arranque falló:\n{proceso.stderr}")
+        fases = json.loads(proceso.stdout.strip().splitlines()[-1])
+        fases["proceso_total_ms"] = total  # Incluye arrancar el intérprete
+        muestras.append(fases)
+    return {clave: round(sorted(m[clave] for m in muestras)[len(muestras) // 2], 2)
+            for clave in muestras[0]}
+
+
+# ============================================================
+# SUITE COMPLETA Y COMPARACIÓN
+# ============================================================
+def ejecutar_suite(escenarios, frames, semilla=0, arranque=False):
+    """Lanza cada escenario en un proceso nuevo y junta los resultados."""
+    import pygame
+
+    resultados = {}
+    if arranque:
+        resultados["arranque"] = medir_arranque()
+        print("arranque           " + "  ".join(f"{k[:-3]}={v:.1f}" for k, v in
+                                               resultados["arranque"].items()) + " ms",
+              file=sys.stderr)
+    for nombre in escenarios:
+        proceso = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--hijo", nombre,
+             "--frames", str(frames), "--semilla", str(semilla)],
+            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        if proceso.returncode != 0:
+            raise RuntimeError(f"El escenario {nombre} falló:\n{proceso.stderr}")
+        resultados[nombre] = json.loads(proceso.stdout.strip().splitlines()[-1])
+        r = resultados[nombre]
+        print(f"{nombre:<18} {r['fps']:>9.1f} fps  p50={r['p50_ms']:.2f}  p95={r['p95_ms']:.2f}"
+              f"  p99={r['p99_ms']:.2f} ms  rss={r['pico_rss_mb']} MB", file=sys.stderr)
+    return {
+        "python": sys.version.split()[0],
+        "pygame": pygame.version.ver,
+        "plataforma": sys.platform,
+        "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "ambiente": "proceso" if os.environ.get("JUEGO_AMBIENTE_PROCESO") == "1" else "hilo",
+        "escenarios": resultados,
+    }
+
+
+def comparar(actual, base, tolerancia=TOLERANCIA):
+    """
+    Lista de regresiones de `actual` frente a `base` (ambos como los
+    devuelve ejecutar_suite). Menos FPS o más ms/RSS que la tolerancia
+    relativa cuenta como regresión (max_ms es un solo frame: no cuenta).
+    """
+    regresiones = []
+    for nombre, r in actual["escenarios"].items():
+        b = base.get("escenarios", {}).get(nombre)
+        if not b:
+            continue
+        for metrica, ahora in r.items():
+            if metrica == "fps":
+                mayor_es_mejor = True
+            elif (metrica.endswith("_ms") and metrica != "max_ms") or metrica == "pico_rss_mb":
+                mayor_es_mejor = False
+            else:
+                continue
+            antes = b.get(metrica)
+            if not antes or ahora is None:
+                continue
+            cambio = (ahora - antes) / antes
+            if (-cambio if mayor_es_mejor else cambio) > tolerancia:
+                regresiones.append(f"{nombre}.{metrica}: {antes} -> {ahora} ({cambio:+.1%})")
+    return regresiones
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark sin ventana del juego")
+    parser.add_argument("--escenarios", nargs="*", default=None,
+                        help="por defecto: " + " ".join(escenarios_por_defecto()))
+    parser.add_argument("--frames", type=int, default=600, help="frames medidos por escenario")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", help="guardar el resultado JSON en este archivo")
+    parser.add_argument("--comparar", metavar="BASE", help="JSON de referencia")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA)
+    parser.add_argument("--ambiente-proceso", action="store_true",
+                        help="simular el ambiente en otro proceso (JUEGO_AMBIENTE_PROCESO=1)")
+    parser.add_argument("--arranque", action="store_true",
+                        help="medir también el arranque en frío (importación, ventana, primer frame)")
+    parser.add_argument("--hijo", help=argparse.SUPPRESS)  # Uso interno: un escenario
+    args = parser.parse_args()
+
+    if args.ambiente_proceso:
+        os.environ["JUEGO_AMBIENTE_PROCESO"] = "1"  # Lo heredan los procesos hijo
+
+    if args.hijo == "arranque":
+        print(json.dumps(medir_fases_arranque()))
+        sys.exit()
+    if args.hijo:
+        print(json.dumps(medir_escenario(args.hijo, args.frames, args.semilla)))
+        sys.exit()
+
+    escenarios = escenarios_por_defecto() if args.escenarios is None else args.escenarios
+    resultado = ejecutar_suite(escenarios, args.frames, args.semilla, args.arranque)
+    texto = json.dumps(resultado, indent=2)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto)
+    else:
+        print(texto)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        regresiones = comparar(resultado, base, args.tolerancia)
+        for linea in regresiones:
+            print("REGRESIÓN", linea, file=sys.stderr)
+        if regresiones:
+            sys.exit(1)
+        print(f"Sin regresiones (tolerancia {args.tolerancia:.0%})", file=sys.stderr)
@@ -0,0 +1,294 @@
+"""
+Reglas de combate y simulador de duelos sin pantalla.
+
+Este módulo no importa pygame: contiene las reglas de daño que usan las
+clases Personaje de juego.py (críticos, cohete de Jinx, muro de viento de
+Yasuo, escudo de Lux...) y un simulador que ejecuta duelos completos sin
+ventana, imágenes ni animaciones. Todo recibe un generador aleatorio
+explícito (random.Random) para que los resultados sean reproducibles.
+
+Rendimiento: simular_duelo es Python puro y NO garantiza el objetivo de
+cientos de miles de duelos por segundo por núcleo. En la máquina de
+referencia da entre 110k y 350k duelos/s según el cruce (unos 225k de
+media; los duelos con Poppy o Lux, más largos, son los lentos) y en una
+máquina más lenta se han medido 35k/s. Para volumen está
+combate_vectorizado: mismas reglas, unos 2,5 millones de duelos/s por
+núcleo, concordancia estadística (no tirada a tirada).
+
+Uso rápido:
+    python combate.py Jinx Poppy -n 100000 --semilla 1
+    python -m pytest tests/test_combate.py  # equivalencia con la referencia
+"""
+import random
+import time
+from collections import namedtuple
+
+# ============================================================
+# ESTADÍSTICAS DEL ROSTER: nombre -> (max_vida, daño_base)
+# ============================================================
+ESTADISTICAS = {
+    "Lux": (100, 15),
+    "Yasuo": (120, 14),
+    "Ezreal": (105, 16),
+    "Jinx": (95, 18),
+    "Poppy": (150, 10),
+    "Caitlyn": (100, 15),
+}
+
+# ============================================================
+# REGLAS (probabilidades y multiplicadores)
+# ============================================================
+PROB_CRITICO = 0.15
+MULT_CRITICO = 1.8
+PROB_COHETE = 0.25       # Jinx
+MULT_COHETE = 1.5
+PROB_FALLO_EZREAL = 0.2  # Ezreal
+BONO_EZREAL = 10
+PROB_HEADSHOT = 0.4      # Caitlyn
+MULT_HEADSHOT = 1.7
+PROB_MURO = 0.15         # Yasuo
+CD_ESCUDO = 3            # Lux
+ABSORCION_ESCUDO = 0.5
+REDUCCION_POPPY = 0.2
+
+
+def tirar_daño(daño_base, rng):
+    """Daño base aleatorio +-20% y crítico genérico. Retorna (daño, es_critico)."""
+    spread = max(1, int(daño_base * 0.2))
+    # Entero uniforme en [base - spread, base + spread] (como randint, pero
+    # con una sola llamada a random(): el simulador rápido hace lo mismo)
+    daño = daño_base - spread + int(rng.random() * (2 * spread + 1))
+    if rng.random() < PROB_CRITICO:
+        return int(daño * MULT_CRITICO), True
+    return daño, False
+
+
+# --- Habilidades ofensivas: (daño, rng) -> (daño, texto) ---
+def ataque_jinx(daño, rng):
+    if rng.random() < PROB_COHETE:
+        return int(daño * MULT_COHETE), "¡COHETE!"
+    return daño, ""
+
+def ataque_ezreal(daño, rng):
+    if rng.random() < PROB_FALLO_EZREAL:
+        return 0, "¡Falla Skillshot!"
+    return daño + BONO_EZREAL, ""
+
+def ataque_caitlyn(daño, rng):
+    if rng.random() < PROB_HEADSHOT:
+        return int(daño * MULT_HEADSHOT), "¡Headshot!"
+    return daño, ""
+
+
+# --- Habilidades defensivas: (daño, rng) -> (daño, texto) ---
+def defensa_yasuo(daño, rng):
+    # Yasuo tiene probabilidad de bloquear TODO el daño
+    if rng.random() < PROB_MURO:
+        return 0, "¡MURO DE VIENTO!"
+    return daño, ""
+
+def defensa_poppy(daño, rng):
+    # Poppy siempre reduce daño un poco por ser tanque
+    reducido = int(daño * REDUCCION_POPPY)
+    return daño - reducido, "¡PIEL DE HIERRO!"
+
+def defensa_lux(daño, escudo_cd):
+    """El escudo de Lux tiene estado: retorna (daño, texto, nuevo_escudo_cd)."""
+    if escudo_cd == 0:
+        absorb = int(daño * ABSORCION_ESCUDO)
+        return daño - absorb, f"¡ESCUDO! (-{absorb})", CD_ESCUDO
+    if escudo_cd > 0:
+        escudo_cd -= 1
+    return daño, "", escudo_cd
+
+
+# Tablas de habilidades por campeón (si no aparece, no tiene)
+ATAQUES = {"Jinx": ataque_jinx, "Ezreal": ataque_ezreal, "Caitlyn": ataque_caitlyn}
+DEFENSAS = {"Yasuo": defensa_yasuo, "Poppy": defensa_poppy}
+
+# ============================================================
+# SIMULADOR SIN PANTALLA
+# ============================================================
+# Registro compacto de un duelo. ganador: 1, 2 o 0 si se alcanzó max_turnos.
+ResultadoDuelo = namedtuple("ResultadoDuelo", "ganador turnos vida1 vida2")
+
+# Códigos de habilidad usados por el bucle rápido
+_SIN_HABILIDAD, _MULTIPLICA, _EZREAL = 0, 1, 2
+_MURO, _POPPY, _LUX = 1, 2, 3
+_PERFIL_ATAQUE = {
+    "Jinx": (_MULTIPLICA, PROB_COHETE, MULT_COHETE),
+    "Caitlyn": (_MULTIPLICA, PROB_HEADSHOT, MULT_HEADSHOT),
+    "Ezreal": (_EZREAL, PROB_FALLO_EZREAL, 0),
+}
+_PERFIL_DEFENSA = {"Yasuo": _MURO, "Poppy": _POPPY, "Lux": _LUX}
+
+
+def _perfil(nombre, estadisticas):
+    """Precalcula lo que el bucle rápido necesita de un campeón."""
+    daño_base = estadisticas[nombre][1]
+    spread = max(1, int(daño_base * 0.2))
+    tipo_atk, prob_atk, mult_atk = _PERFIL_ATAQUE.get(nombre, (_SIN_HABILIDAD, 0, 0))
+    return (daño_base - spread, 2 * spread + 1, tipo_atk, prob_atk, mult_atk,
+            _PERFIL_DEFENSA.get(nombre, _SIN_HABILIDAD))
+
+
+_golpes_cache = {}  # (nombre1, stats1, nombre2, stats2) -> golpes de cada jugador
+
+
+def _golpes(nombre1, nombre2, estadisticas):
+    """
+    Perfil de cada atacante junto con el tipo de defensa de su rival:
+    ((lo, ancho, tipo_atk, prob_atk, mult_atk, tipo_def_rival) del 1, ... del 2).
+    Se calcula una vez por cruce y estadísticas, no en cada duelo.
+    """
+    clave = (nombre1, tuple(estadisticas[nombre1]), nombre2, tuple(estadisticas[nombre2]))
+    golpes = _golpes_cache.get(clave)
+    if golpes is None:
+        p1, p2 = _perfil(nombre1, estadisticas), _perfil(nombre2, estadisticas)
+        golpes = _golpes_cache[clave] = ((*p1[:5], p2[5]), (*p2[:5], p1[5]))
+    return golpes
+
+
+def simular_duelo(nombre1, nombre2, rng, estadisticas=ESTADISTICAS, max_turnos=1000):
+    """
+    Ejecuta un duelo completo (empieza el jugador 1) sin pygame.
+
+    Es la versión "desenrollada" de las funciones de arriba: mismas reglas y
+    mismo orden de tiradas que Personaje.atacar, así que con la misma semilla
+    da exactamente el mismo resultado que simular_duelo_referencia.
+    """
+    rnd = rng.random
+    golpes = _golpes(nombre1, nombre2, estadisticas)
+    vida = [estadisticas[nombre1][0], estadisticas[nombre2][0]]
+    escudo = [0, 0]  # escudo_cd de Lux (si lo es)
+    # Constantes en variables locales: en el bucle se leen más rápido que las globales
+    prob_critico, mult_critico = PROB_CRITICO, MULT_CRITICO
+
+    at = 0  # Índice del atacante (0 = jugador 1)
+    for turno in range(1, max_turnos + 1):
+        lo, ancho, tipo_atk, prob_atk, mult_atk, tipo_def = golpes[at]
+
+        daño = lo + int(rnd() * ancho)
+        if rnd() < prob_critico:
+            daño = int(daño * mult_critico)
+
+        if tipo_atk:  # 0 = _SIN_HABILIDAD
+            if tipo_atk == _MULTIPLICA:
+                if rnd() < prob_atk:
+                    daño = int(daño * mult_atk)
+            elif rnd() < PROB_FALLO_EZREAL:  # _EZREAL
+                daño = 0
+            else:
+                daño += BONO_EZREAL
+
+        de = 1 - at
+        if tipo_def:  # 0 = _SIN_HABILIDAD
+            if tipo_def == _MURO:
+                if rnd() < PROB_MURO:
+                    daño = 0
+            elif tipo_def == _POPPY:
+                daño -= int(daño * REDUCCION_POPPY)
+            else:  # _LUX
+                cd = escudo[de]
+                if cd == 0:
+                    escudo[de] = CD_ESCUDO
+                    daño -= int(daño * ABSORCION_ESCUDO)
+                elif cd > 0:
+                    escudo[de] = cd - 1
+
+        restante = vida[de] - daño
+        if restante <= 0:
+            vida[de] = 0
+            return ResultadoDuelo(at + 1, turno, vida[0], vida[1])
+        vida[de] = restante
+        at = de
+    return ResultadoDuelo(0, max_turnos, vida[0], vida[1])
+
+
+def resolver_golpe(atacante, daño_base, defensor, escudo_cd, rng):
+    """
+    Un golpe completo con las funciones de habilidad, en el mismo orden de
+    tiradas que Personaje.atacar. Retorna (daño_final, nuevo escudo_cd del
+    defensor); escudo_cd solo cambia si el defensor es Lux.
+    """
+    daño, _ = tirar_daño(daño_base, rng)
+    if atacante in ATAQUES:
+        daño, _ = ATAQUES[atacante](daño, rng)
+    if defensor == "Lux":
+        daño, _, escudo_cd = defensa_lux(daño, escudo_cd)
+    elif defensor in DEFENSAS:
+        daño, _ = DEFENSAS[defensor](daño, rng)
+    return daño, escudo_cd
+
+
+def simular_duelo_referencia(nombre1, nombre2, rng, estadisticas=ESTADISTICAS, max_turnos=1000):
+    """Mismo duelo usando las funciones de habilidad (el camino de Personaje). Más lento."""
+    vida = [0, estadisticas[nombre1][0], estadisticas[nombre2][0]]
+    base = (0, estadisticas[nombre1][1], estadisticas[nombre2][1])
+    nombres = (None, nombre1, nombre2)
+    escudo = [0, 0, 0]
+
+    atacante, defensor = 1, 2
+    for turno in range(1, max_turnos + 1):
+        daño, escudo[defensor] = resolver_golpe(nombres[atacante], base[atacante],
+                                                nombres[defensor], escudo[defensor], rng)
+        vida[defensor] = max(0, vida[defensor] - daño)
+        if vida[defensor] <= 0:
+            return ResultadoDuelo(atacante, turno, vida[1], vida[2])
+        atacante, defensor = defensor, atacante
+    return ResultadoDuelo(0, max_turnos, vida[1], vida[2])
+
+
+def verificar_equivalencia(duelos=2000, semilla=0):
+    """Comprueba que simular_duelo y la referencia coinciden en todos los cruces."""
+    for n1 in ESTADISTICAS:
+        for n2 in ESTADISTICAS:
+            rapido = random.Random(semilla)
+            referencia = random.Random(semilla)
+            for _ in range(duelos):
+                a = simular_duelo(n1, n2, rapido)
+                b = simular_duelo_referencia(n1, n2, referencia)
+                if a != b:
+                    raise AssertionError(f"{n1} vs {n2}: {a} != {b}")
+    return True
+
+
+def simular_duelos(nombre1, nombre2, n, semilla=None, estadisticas=ESTADISTICAS):
+    """Ejecuta `n` duelos con un único generador sembrado; retorna la lista de resultados."""
+    rng = random.Random(semilla)
+    return [simular_duelo(nombre1, nombre2, rng, estadisticas) for _ in range(n)]
+
+
+def resumir(resultados):
+    """Tasa de victoria del jugador 1 y duración media de una lista de resultados."""
+    n = len(resultados)
+    victorias1 = sum(1 for r in resultados if r.ganador == 1)
+    turnos = sum(r.turnos for r in resultados)
+    return {"duelos": n, "victorias_j1": victorias1 / n, "turnos_medios": turnos / n}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Simulador de duelos sin pantalla")
+    parser.add_argument("jugador1", nargs="?", default="Jinx", choices=sorted(ESTADISTICAS))
+    parser.add_argument("jugador2", nargs="?", default="Poppy", choices=sorted(ESTADISTICAS))
+    parser.add_argument("-n", type=int, default=100000, help="número de duelos")
+    parser.add_argument("--semilla", type=int, default=None)
+    parser.add_argument("--verificar", action="store_true",
+                        help="comparar el bucle rápido con las funciones de habilidad")
+    args = parser.parse_args()
+
+    if args.verificar:
+        verificar_equivalencia()
+        print("OK: simular_duelo coincide con la referencia en los 36 cruces")
+
+    t0 = time.perf_counter()
+    resultados = simular_duelos(args.jugador1, args.jugador2, args.n, args.semilla)
+    dt = time.perf_counter() - t0
+
+    resumen = resumir(resultados)
+    print(f"{args.jugador1} vs {args.jugador2}: {resumen['duelos']} duelos")
+    print(f"  Victorias {args.jugador1}: {resumen['victorias_j1']:.2%}")
+    print(f"  Turnos medios: {resumen['turnos_medios']:.2f}")
+    print(f"  {args.n / dt:,.0f} duelos/s")
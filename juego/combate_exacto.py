@@ -0,0 +1,287 @@
+"""
+Probabilidades exactas de victoria por programación dinámica.
+
+El combate de Personaje.atacar es una cadena de Markov finita sobre los
+estados (vida1, vida2, turno, escudo_cd de Lux): las tiradas de cada golpe
+dan una distribución exacta del daño, y desde cada estado la probabilidad
+de ganar es la media ponderada de la de los estados siguientes. Así se
+obtienen probabilidades y duración esperada sin ruido, incluidos los
+sucesos raros (muro de Yasuo encadenado con headshots de Caitlyn...).
+
+Cómo se resuelve:
+- El daño positivo siempre baja alguna vida, así que se recorre la tabla
+  por bloques de vida (del tamaño del daño mínimo) y cada bloque solo
+  depende de bloques ya resueltos. Cada bloque es un producto de matrices
+  (Toeplitz con la distribución de daño) para todos los estados a la vez.
+- Un golpe de daño 0 (muro de viento, fallo de Ezreal) deja la vida igual
+  pero cambia el turno y el escudo: esos ciclos se resuelven de forma
+  exacta con la inversa de (I - Z), que es la misma para cada casilla.
+
+Las tablas de cada cruce quedan en una caché (SolucionadorExacto.cache)
+y sirven para cualquier consulta posterior con vidas menores o iguales.
+
+Uso:
+    python combate_exacto.py             # matriz 6x6 exacta
+    python combate_exacto.py Yasuo Caitlyn
+    python combate_exacto.py --verificar # comparar con Monte Carlo
+    python -m pytest tests/test_combate_exacto.py
+"""
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from combate import (ABSORCION_ESCUDO, BONO_EZREAL, CD_ESCUDO, ESTADISTICAS, MULT_CRITICO,
+                     PROB_CRITICO, PROB_FALLO_EZREAL, PROB_MURO, REDUCCION_POPPY, _EZREAL,
+                     _LUX, _MULTIPLICA, _MURO, _POPPY, _perfil)
+
+# Tablas de un cruce. prob[t, c1, c2, v1, v2]: probabilidad de que gane el
+# jugador 1 si le toca atacar a t (0 = jugador 1) con esos escudos y vidas;
+# turnos[...] es la duración esperada (en ataques) desde ese estado.
+TablaDuelo = namedtuple("TablaDuelo", "nombre1 nombre2 vida1 vida2 prob turnos")
+
+
+def distribucion_daño(perfil_atacante, tipo_defensa, escudo_cd):
+    """
+    Distribución exacta del daño de un golpe: {daño: probabilidad}, más el
+    escudo_cd del defensor después del golpe. Mismas operaciones (y mismos
+    int()) que combate.simular_duelo.
+    """
+    lo, ancho, tipo_atk, prob_atk, mult_atk, _ = perfil_atacante
+    dist = {}
+
+    def sumar(daño, p):
+        dist[daño] = dist.get(daño, 0.0) + p
+
+    for base in range(lo, lo + ancho):
+        for critico, p_crit in ((False, 1 - PROB_CRITICO), (True, PROB_CRITICO)):
+            daño = int(base * MULT_CRITICO) if critico else base
+            p = p_crit / ancho
+            if tipo_atk == _MULTIPLICA:
+                opciones = ((daño, 1 - prob_atk), (int(daño * mult_atk), prob_atk))
+            elif tipo_atk == _EZREAL:
+                opciones = ((daño + BONO_EZREAL, 1 - PROB_FALLO_EZREAL), (0, PROB_FALLO_EZREAL))
+            else:
+                opciones = ((daño, 1.0),)
+            for d, p_atk in opciones:
+                if tipo_defensa == _MURO:
+                    sumar(d, p * p_atk * (1 - PROB_MURO))
+                    sumar(0, p * p_atk * PROB_MURO)
+                elif tipo_defensa == _POPPY:
+                    sumar(d - int(d * REDUCCION_POPPY), p * p_atk)
+                elif tipo_defensa == _LUX and escudo_cd == 0:
+                    sumar(d - int(d * ABSORCION_ESCUDO), p * p_atk)
+                else:
+                    sumar(d, p * p_atk)
+
+    if tipo_defensa != _LUX:
+        nuevo_cd = escudo_cd
+    elif escudo_cd == 0:
+        nuevo_cd = CD_ESCUDO
+    else:
+        nuevo_cd = escudo_cd - 1
+    return dist, nuevo_cd
+
+
+def _toeplitz(dist, vida_max):
+    """T[v, v']: probabilidad de pasar de vida v a v' con un golpe positivo (0 = muerto)."""
+    t = np.zeros((vida_max + 1, vida_max + 1))
+    filas = np.arange(1, vida_max + 1)
+    for d, p in dist.items():
+        if d > 0:
+            t[filas, np.maximum(0, filas - d)] += p
+    return t
+
+
+def resolver_cruce(nombre1, nombre2, estadisticas=ESTADISTICAS, vida1=None, vida2=None):
+    """Resuelve todas las casillas (vidas <= vida1, vida2) del cruce nombre1 (empieza) vs nombre2."""
+    perfiles = (_perfil(nombre1, estadisticas), _perfil(nombre2, estadisticas))
+    defensas = (perfiles[0][5], perfiles[1][5])
+    vidas = (vida1 or estadisticas[nombre1][0], vida2 or estadisticas[nombre2][0])
+    escudos = tuple(CD_ESCUDO + 1 if d == _LUX else 1 for d in defensas)  # Valores de escudo_cd
+
+    # Estados dentro de una casilla: (turno, c1, c2) aplanados
+    forma = (2, escudos[0], escudos[1])
+    num_estados = int(np.prod(forma))
+    indice = lambda t, c1, c2: np.ravel_multi_index((t, c1, c2), forma)
+
+    # Para cada estado: matriz Toeplitz de su golpe, estado siguiente y el ciclo de daño 0
+    toeplitz = [None] * num_estados
+    siguiente = np.zeros(num_estados, dtype=np.intp)
+    ceros = np.zeros((num_estados, num_estados))
+    daño_minimo = [np.inf, np.inf]  # Daño positivo mínimo recibido por cada jugador
+    golpes = {}  # (turno, escudo del defensor) -> (dist, nuevo escudo, Toeplitz)
+    for t in (0, 1):
+        defensor = 1 - t
+        for c1 in range(escudos[0]):
+            for c2 in range(escudos[1]):
+                cds = [c1, c2]
+                clave = (t, cds[defensor])
+                if clave not in golpes:
+                    dist, nuevo = distribucion_daño(perfiles[t], defensas[defensor], cds[defensor])
+                    golpes[clave] = (dist, nuevo, _toeplitz(dist, vidas[defensor]))
+                dist, cds[defensor], toeplitz_golpe = golpes[clave]
+                s = indice(t, c1, c2)
+                siguiente[s] = indice(1 - t, *cds)
+                toeplitz[s] = toeplitz_golpe
+                ceros[s, siguiente[s]] += dist.get(0, 0.0)
+                positivos = [d for d in dist if d > 0]
+                daño_minimo[defensor] = min(daño_minimo[defensor], min(positivos))
+    # Cierra los ciclos de daño 0 (None si no hay: la mezcla sería la identidad)
+    mezcla = np.linalg.inv(np.eye(num_estados) - ceros) if ceros.any() else None
+
+    ataca1 = np.array([s for s in range(num_estados) if np.unravel_index(s, forma)[0] == 0])
+    ataca2 = np.array([s for s in range(num_estados) if np.unravel_index(s, forma)[0] == 1])
+    t1 = np.stack([toeplitz[s].T for s in ataca1])  # Golpes a la vida 2 (columnas)
+    t2 = np.stack([toeplitz[s] for s in ataca2])    # Golpes a la vida 1 (filas)
+
+    # valores[0] = probabilidad de que gane el jugador 1, valores[1] = turnos esperados
+    valores = np.zeros((2, num_estados, vidas[0] + 1, vidas[1] + 1))
+    valores[0, :, :, 0] = 1.0  # Jugador 2 muerto
+    valores[0, :, 0, :] = 0.0  # Jugador 1 muerto
+    constante = np.zeros((2, 1, 1, 1))
+    constante[1] = 1.0  # Cada golpe suma un turno
+
+    paso_filas = int(daño_minimo[0])
+    paso_columnas = int(daño_minimo[1])
+    for f0 in range(1, vidas[0] + 1, paso_filas):
+        filas = slice(f0, min(f0 + paso_filas, vidas[0] + 1))
+        for k0 in range(1, vidas[1] + 1, paso_columnas):
+            columnas = slice(k0, min(k0 + paso_columnas, vidas[1] + 1))
+            aporte = np.empty((2, num_estados, filas.stop - f0, columnas.stop - k0))
+            # Ataca el jugador 1: depende de columnas ya resueltas de la misma fila
+            previas = valores[:, siguiente[ataca1], filas, :k0]
+            aporte[:, ataca1] = np.matmul(previas, t1[:, :k0, columnas])
+            # Ataca el jugador 2: depende de filas ya resueltas
+            previas = valores[:, siguiente[ataca2], :f0, columnas]
+            aporte[:, ataca2] = np.matmul(t2[:, filas, :f0], previas)
+            aporte += constante
+            if mezcla is not None:
+                forma_bloque = aporte.shape
+                aporte = np.matmul(mezcla, aporte.reshape(2, num_estados, -1)).reshape(forma_bloque)
+            valores[:, :, filas, columnas] = aporte
+
+    forma_tabla = forma + (vidas[0] + 1, vidas[1] + 1)
+    return TablaDuelo(nombre1, nombre2, vidas[0], vidas[1],
+                      valores[0].reshape(forma_tabla), valores[1].reshape(forma_tabla))
+
+
+class SolucionadorExacto:
+    """
+    Caché explícita de tablas por cruce. Una tabla resuelta para unas
+    vidas iniciales responde cualquier consulta con vidas menores, turno o
+    escudos distintos sin recalcular.
+    """
+    def __init__(self, estadisticas=ESTADISTICAS):
+        self.estadisticas = estadisticas
+        self.cache = {}  # (nombre1, stats1, nombre2, stats2) -> TablaDuelo
+        self.resueltos = 0
+
+    def tabla(self, nombre1, nombre2, vida1=None, vida2=None):
+        vida1 = vida1 or self.estadisticas[nombre1][0]
+        vida2 = vida2 or self.estadisticas[nombre2][0]
+        clave = (nombre1, tuple(self.estadisticas[nombre1]), nombre2, tuple(self.estadisticas[nombre2]))
+        tabla = self.cache.get(clave)
+        if tabla is None or tabla.vida1 < vida1 or tabla.vida2 < vida2:
+            tabla = resolver_cruce(nombre1, nombre2, self.estadisticas,
+                                   max(vida1, tabla.vida1 if tabla else 0),
+                                   max(vida2, tabla.vida2 if tabla else 0))
+            self.cache[clave] = tabla
+            self.resueltos += 1
+        return tabla
+
+    def consultar(self, nombre1, nombre2, vida1=None, vida2=None, turno=1, escudo1=0, escudo2=0):
+        """
+        (probabilidad de que gane nombre1, turnos esperados) desde ese estado.
+        `turno` es 1 o 2 (quién ataca); los escudos solo cuentan si el
+        campeón es Lux.
+        """
+        vida1 = vida1 or self.estadisticas[nombre1][0]
+        vida2 = vida2 or self.estadisticas[nombre2][0]
+        tabla = self.tabla(nombre1, nombre2, vida1, vida2)
+        c1 = escudo1 if tabla.prob.shape[1] > 1 else 0
+        c2 = escudo2 if tabla.prob.shape[2] > 1 else 0
+        estado = (turno - 1, c1, c2, vida1, vida2)
+        return float(tabla.prob[estado]), float(tabla.turnos[estado])
+
+    def matriz(self, nombres=None):
+        """{(A, B): (prob. de que gane A empezando A, turnos esperados)} para todos los cruces."""
+        nombres = nombres or list(self.estadisticas)
+        return {(a, b): self.consultar(a, b) for a in nombres for b in nombres}
+
+
+# ============================================================
+# COMPARACIÓN CON MONTE CARLO
+# ============================================================
+def comparar_con_monte_carlo(a, b, p, turnos, duelos=200_000, semilla=0):
+    """
+    Juega `duelos` duelos a vs b con combate_vectorizado y los compara con
+    la probabilidad `p` y la duración `turnos` exactas. Retorna (z_p, z_t,
+    detalle) con los z de la tasa de victoria y de la duración media.
+    """
+    import combate_vectorizado
+
+    lote = combate_vectorizado.simular_lote(a, b, duelos, semilla=semilla)
+    error = (p * (1 - p) / duelos) ** 0.5
+    z_p = abs(lote["tasa_victoria_j1"] - p) / error if error else 0.0
+    hist = lote["turnos"]
+    media = lote["turnos_medios"]
+    var = (np.arange(len(hist)) ** 2 * hist).sum() / duelos - media ** 2
+    z_t = abs(media - turnos) / (var / duelos) ** 0.5 if var else 0.0
+    detalle = (f"{a} vs {b}: exacto {p:.5f}/{turnos:.3f}, Monte Carlo "
+               f"{lote['tasa_victoria_j1']:.5f}/{media:.3f} (z={z_p:.2f}, {z_t:.2f})")
+    return z_p, z_t, detalle
+
+
+def verificar_contra_monte_carlo(duelos=200_000, semilla=0, z_max=4.5):
+    """
+    Compara la solución exacta con combate_vectorizado en los 36 cruces
+    (tasa de victoria y duración media, test z). Lanza AssertionError si
+    alguna diferencia no es explicable por azar.
+    """
+    exacto = SolucionadorExacto().matriz()
+    for i, ((a, b), (p, turnos)) in enumerate(exacto.items()):
+        z_p, z_t, detalle = comparar_con_monte_carlo(a, b, p, turnos, duelos, semilla + i)
+        if z_p > z_max or z_t > z_max:
+            raise AssertionError(detalle)
+    return True
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Probabilidades exactas de victoria (DP)")
+    parser.add_argument("jugador1", nargs="?", choices=sorted(ESTADISTICAS))
+    parser.add_argument("jugador2", nargs="?", choices=sorted(ESTADISTICAS))
+    parser.add_argument("--verificar", action="store_true", help="comparar con Monte Carlo")
+    args = parser.parse_args()
+
+    if args.verificar:
+        try:
+            verificar_contra_monte_carlo()
+        except AssertionError as ex:
+            print("FALLO:", ex)
+            sys.exit(1)
+        print("OK: la solución exacta concuerda con Monte Carlo en los 36 cruces")
+        sys.exit()
+
+    solucionador = SolucionadorExacto()
+    t0 = time.perf_counter()
+    if args.jugador1 and args.jugador2:
+        p, turnos = solucionador.consultar(args.jugador1, args.jugador2)
+        dt = time.perf_counter() - t0
+        print(f"{args.jugador1} (empieza) vs {args.jugador2}: gana {args.jugador1} con"
+              f" p = {p:.10f}, duración esperada {turnos:.4f} turnos  ({dt * 1000:.1f} ms)")
+        sys.exit()
+
+    matriz = solucionador.matriz()
+    dt = time.perf_counter() - t0
+    nombres = list(ESTADISTICAS)
+    print("Probabilidad exacta de que gane la fila (empieza la fila):")
+    print(" " * 9 + "".join(f"{n[:7]:>9}" for n in nombres))
+    for a in nombres:
+        print(f"{a:<9}" + "".join(f"{matriz[a, b][0]:>9.4f}" for b in nombres))
+    print("\nDuración esperada (turnos):")
+    for a in nombres:
+        print(f"{a:<9}" + "".join(f"{matriz[a, b][1]:>9.2f}" for b in nombres))
+    print(f"\n36 cruces resueltos en {dt * 1000:.0f} ms")
@@ -1,16 +1,38 @@
 import pygame
+import atexit
+import multiprocessing
+import os
 import sys
 import random
 import math
 import threading
 import time
+import csv
+from array import array
+from collections import OrderedDict
+
+import combate
+from personajes import ANCHO_ESCENARIO, Caitlyn, Ezreal, Jinx, Lux, Personaje, Poppy, Yasuo
+from recursos import GestorRecursos
+from repeticion import Grabacion, Reproductor
+from particulas import (AnilloCompartido, FotosParticulas, SistemaParticulas, dibujar_circulos,
+                        emitir_ambiente, emitir_chispas, simular_ambiente_en_proceso)
 
 # ============================================================
 # CONFIGURACIÓN Y CONSTANTES
 # ============================================================
-ANCHO = 1080
+ANCHO = ANCHO_ESCENARIO  # 1080 (personajes.py lo usa para la animación)
 ALTO = 720
 FPS = 60
+# Simulación a paso fijo: la lógica siempre avanza en pasos de PASO_SIM
+# segundos, vaya el dibujado a la velocidad que vaya.
+PASO_SIM = 1 / 60
+MAX_PASOS_POR_FRAME = 8  # Si un frame se atrasa mucho, no intentar recuperar más
+# Modo depuración (JUEGO_DEBUG=1 y sin python -O): cuenta las superficies creadas
+DEBUG = __debug__ and os.environ.get("JUEGO_DEBUG") == "1"
+MODO_RECTS_SUCIOS = False  # Valor inicial; se alterna en ejecución con F2
+# JUEGO_AMBIENTE_PROCESO=1 simula el ambiente en otro proceso (ver ProcesoAmbiente)
+AMBIENTE_EN_PROCESO = os.environ.get("JUEGO_AMBIENTE_PROCESO") == "1"
 
 # Colores (R, G, B)
 BLANCO = (255, 255, 255)
@@ -24,32 +46,89 @@ GRIS_CLARO = (180, 180, 180)
 AMARILLO = (255, 215, 0)
 PURPURA = (140, 50, 200)
 
-# Rutas (Puedes editar estas rutas. Si fallan, el juego usará cuadros de colores)
-RUTAS_IMAGENES = {
-    "Lux": r"C:/Users/Estudiante/Documents/Programacion Orientada a Objetos/juego/img/lux.png",
-    "Yasuo": r"C:/Users/Estudiante/Documents/Programacion Orientada a Objetos/juego/img/yasuo.png",
-    "Ezreal": r"C:/Users/Estudiante/Documents/Programacion Orientada a Objetos/juego/img/Ezreal.png",
-    "Jinx": r"C:/Users/Estudiante/Documents/Programacion Orientada a Objetos/juego/img/jinx.png",
-    "Poppy": r"C:/Users/Estudiante/Documents/Programacion Orientada a Objetos/juego/img/poppy.png",
-    "Caitlyn": r"C:/Users/Estudiante/Documents/Programacion Orientada a Objetos/juego/img/caytlin.png"
-}
-
-# Inicializar Pygame
-pygame.init()
-PANTALLA = pygame.display.set_mode((ANCHO, ALTO))
-pygame.display.set_caption("League of Pygame - Duelo por Turnos (Con Threads)")
-RELOJ = pygame.time.Clock()
-
-# Fuentes
-FUENTE_GRANDE = pygame.font.SysFont("Arial", 50, bold=True)
-FUENTE_MEDIANA = pygame.font.SysFont("Arial", 30, bold=True)
-FUENTE_PEQUENA = pygame.font.SysFont("Arial", 18)
+# Imágenes: se buscan en juego/img/ relativo al código (ver recursos.py).
+# Si fallan, el juego usará cuadros de colores.
+RECURSOS = GestorRecursos()
+
+# Ventana y reloj: se crean en iniciar_aplicacion(), no al importar
+PANTALLA = None
+RELOJ = None
+
+# ============================================================
+# CONTADOR DE SUPERFICIES (SOLO EN DEPURACIÓN)
+# ============================================================
+class ContadorSuperficies:
+    """Total de superficies creadas por el juego; en un frame estable no debe subir."""
+    total = 0
+
+def nueva_superficie(tamaño, flags=0):
+    """pygame.Surface con contador en modo depuración."""
+    if DEBUG:
+        ContadorSuperficies.total += 1
+    return pygame.Surface(tamaño, flags)
+
+# ============================================================
+# CACHÉ DE FUENTES Y TEXTOS RENDERIZADOS
+# ============================================================
+# Registro compartido: (familia, tamaño, bold) -> pygame.font.Font
+_FUENTES = {}
+
+def obtener_fuente(familia, tamaño, bold=False):
+    """Devuelve la fuente pedida, creándola solo la primera vez."""
+    clave = (familia, tamaño, bold)
+    fuente = _FUENTES.get(clave)
+    if fuente is None:
+        fuente = pygame.font.SysFont(familia, tamaño, bold=bold)
+        _FUENTES[clave] = fuente
+    return fuente
+
+class CacheTexto:
+    """
+    Caché LRU acotada de superficies de texto ya rasterizadas.
+    Clave: (texto, fuente, color). Los contadores de aciertos/fallos
+    permiten comprobar que un frame estable no rasteriza nada.
+    """
+    def __init__(self, capacidad=256):
+        self.capacidad = capacidad
+        self.superficies = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def render(self, texto, fuente, color):
+        clave = (texto, fuente, color)
+        surf = self.superficies.get(clave)
+        if surf is not None:
+            self.aciertos += 1
+            self.superficies.move_to_end(clave)
+            return surf
+
+        self.fallos += 1
+        if DEBUG:
+            ContadorSuperficies.total += 1
+        surf = fuente.render(texto, True, color)
+        self.superficies[clave] = surf
+        if len(self.superficies) > self.capacidad:
+            self.superficies.popitem(last=False)  # Expulsar el menos usado
+        return surf
+
+    def reiniciar_contadores(self):
+        self.aciertos = 0
+        self.fallos = 0
+
+TEXTOS = CacheTexto()
+
+# Fuentes (necesitan pygame.font iniciado: las crea iniciar_aplicacion)
+FUENTE_GRANDE = None
+FUENTE_MEDIANA = None
+FUENTE_PEQUENA = None
 
 # ============================================================
 # THREADING: SISTEMA DE AMBIENTE EN SEGUNDO PLANO
 # ============================================================
-# Usamos un Lock para evitar que el hilo escriba en la lista 
-# al mismo tiempo que el juego intenta leerla para dibujar.
+# Por defecto el hilo publica instantáneas completas (FotosParticulas) y el
+# juego dibuja la última sin esperar a nadie. El modo antiguo, con un Lock
+# compartido mientras se actualiza y se dibuja, queda para comparar
+# (ver medir_contencion_ambiente).
 LOCK_PARTICULAS = threading.Lock()
 
 class HiloAmbiente(threading.Thread):
@@ -57,105 +136,382 @@ class HiloAmbiente(threading.Thread):
     Hilo que calcula posiciones de particulas de ambiente (lucérnagas/magia)
     en segundo plano para no cargar el bucle principal.
     """
-    def __init__(self):
+    def __init__(self, maximo=50, por_tick=1, pausa=0.02, usar_lock=False):
         super().__init__()
         self.daemon = True  # El hilo muere cuando se cierra el juego
-        self.particulas = []
+        self.maximo = maximo      # Tope de partículas vivas
+        self.por_tick = por_tick  # Cuántas nacen como mucho en cada paso
+        self.pausa = pausa
+        self.usar_lock = usar_lock
+        # Mueren al salir por arriba (y < 0) o al quedarse sin alpha
+        self.particulas = SistemaParticulas(capacidad=max(64, maximo), limite_y=0)
+        self.fotos = FotosParticulas(capacidad=max(64, maximo))
+        self.espera_lock = 0.0  # Segundos que el hilo pasó esperando el lock
         self.activo = True
 
+    def paso(self):
+        # 1. Generar nuevas partículas aleatoriamente
+        faltan = min(self.por_tick, self.maximo - self.particulas.n)
+        emitir_ambiente(self.particulas, faltan, ANCHO, ALTO)
+
+        # 2. Actualizar posiciones (vectorizado) y compactar las muertas
+        self.particulas.actualizar()
+
     def run(self):
         while self.activo:
-            with LOCK_PARTICULAS:
-                # 1. Generar nuevas partículas aleatoriamente
-                if len(self.particulas) < 50:
-                    self.particulas.append({
-                        'x': random.randint(0, ANCHO),
-                        'y': random.randint(0, ALTO),
-                        'vx': random.uniform(-0.5, 0.5),
-                        'vy': random.uniform(-0.5, -1.5), # Flotan hacia arriba
-                        'radio': random.randint(1, 3),
-                        'color': (random.randint(100, 200), random.randint(200, 255), 255),
-                        'alpha': random.randint(100, 255)
-                    })
-
-                # 2. Actualizar posiciones
-                for p in self.particulas[:]:
-                    p['x'] += p['vx']
-                    p['y'] += p['vy']
-                    p['alpha'] -= 1 # Desvanecer
-                    
-                    if p['y'] < 0 or p['alpha'] <= 0:
-                        self.particulas.remove(p)
+            if self.usar_lock:
+                t0 = time.perf_counter()
+                with LOCK_PARTICULAS:
+                    self.espera_lock += time.perf_counter() - t0
+                    self.paso()
+            else:
+                # La simulación es privada del hilo; solo se publica el resultado
+                self.paso()
+                self.fotos.publicar(self.particulas)
             
             # Simular carga de trabajo o espera para no saturar CPU
-            time.sleep(0.02) 
+            time.sleep(self.pausa) 
+
+    @property
+    def publicadas(self):
+        """Partículas en el último frame que verá el bucle principal."""
+        return self.particulas.n if self.usar_lock else self.fotos.publicado.n
+
+    def dibujar(self, surface):
+        """Dibuja el último frame de partículas y devuelve los rects tocados."""
+        if self.usar_lock:
+            with LOCK_PARTICULAS:
+                return self.particulas.dibujar(surface)
+        return self.fotos.dibujar(surface)
+
+class ProcesoAmbiente:
+    """
+    Igual que HiloAmbiente, pero la simulación corre en otro proceso y no
+    compite por el GIL con el bucle de dibujo. El proceso escribe en un
+    AnilloCompartido (memoria compartida) que aquí se lee directamente.
+
+    Se comporta como el hilo daemon: el proceso es daemon, `activo = False`
+    le pide que pare y al salir del intérprete se espera su fin y se libera
+    la memoria compartida. La capacidad (`maximo`) queda fija al arrancar.
+    """
+    def __init__(self, maximo=50, por_tick=1, pausa=0.02, buffers=3):
+        self.maximo = maximo
+        self.por_tick = por_tick
+        self.pausa = pausa
+        self.buffers = buffers
+        self.anillo = None
+        self._parar = multiprocessing.Event()
+        self._proceso = None
+
+    def start(self):
+        self.anillo = AnilloCompartido(max(64, self.maximo), self.buffers)
+        self._proceso = multiprocessing.Process(
+            target=simular_ambiente_en_proceso, name="ambiente", daemon=True,
+            args=(self.anillo.nombre, self.anillo.capacidad, self.buffers, ANCHO, ALTO,
+                  self.maximo, self.por_tick, self.pausa, self._parar))
+        self._proceso.start()
+        atexit.register(self.detener)
+
+    def is_alive(self):
+        return self._proceso is not None and self._proceso.is_alive()
 
-# Instancia global del generador de ambiente
-ambiente_bg = HiloAmbiente()
+    @property
+    def activo(self):
+        return not self._parar.is_set()
+
+    @activo.setter
+    def activo(self, valor):
+        if valor:
+            self._parar.clear()
+        else:
+            self._parar.set()
+
+    def detener(self, espera=1.0):
+        """Para el proceso (a la fuerza si no responde) y libera la memoria."""
+        self._parar.set()
+        if self._proceso is not None:
+            self._proceso.join(espera)
+            if self._proceso.is_alive():
+                self._proceso.terminate()
+                self._proceso.join()
+        if self.anillo is not None:
+            self.anillo.cerrar()
+            self.anillo = None
+
+    @property
+    def publicadas(self):
+        return self.anillo.publicadas if self.anillo is not None else 0
+
+    def dibujar(self, surface):
+        """Dibuja el último frame publicado por el proceso y devuelve los rects tocados."""
+        if self.anillo is None:
+            return []
+        return dibujar_circulos(surface, *self.anillo.leer())
+
+def nuevo_ambiente(**opciones):
+    """Generador de ambiente del tipo configurado (hilo o proceso), sin arrancar."""
+    return ProcesoAmbiente(**opciones) if AMBIENTE_EN_PROCESO else HiloAmbiente(**opciones)
+
+# Instancia global del generador de ambiente (la crea iniciar_aplicacion)
+ambiente_bg = None
 
 # ============================================================
 # SISTEMA DE CARGA DE RECURSOS (SEGURO)
 # ============================================================
 def cargar_imagen(nombre, color_reserva):
     """Intenta cargar la imagen, si falla, crea un cuadro con el nombre."""
-    ruta = RUTAS_IMAGENES.get(nombre, "")
     try:
-        img = pygame.image.load(ruta).convert_alpha()
-        img = pygame.transform.scale(img, (150, 150)) # Estandarizar tamaño
-        return img
+        return RECURSOS.imagen(nombre)  # Decodificada y escalada una sola vez
     except (FileNotFoundError, pygame.error):
         # Crear imagen placeholder si falla
-        surf = pygame.Surface((150, 150))
+        surf = nueva_superficie((150, 150))
         surf.fill(color_reserva)
         pygame.draw.rect(surf, BLANCO, (0,0,150,150), 4)
         texto = FUENTE_PEQUENA.render(nombre, True, NEGRO)
         surf.blit(texto, (75 - texto.get_width()//2, 75 - texto.get_height()//2))
+        RECURSOS.registrar(nombre, surf)
         return surf
 
+# ============================================================
+# COMPOSITOR DE CAPAS (FONDOS ESTÁTICOS EN CACHÉ)
+# ============================================================
+class CompositorCapas:
+    """
+    Guarda superficies pre-dibujadas (degradado, títulos, parrilla...) y
+    solo las redibuja cuando cambia su "firma" (escena, tamaño de
+    ventana, selección...). Así cada frame cuesta unos pocos blits en
+    lugar de cientos de llamadas de dibujo.
+
+    Cada capa conserva su superficie: al redibujarla se limpia en el
+    sitio, solo se crea una nueva si cambia el tamaño.
+    """
+    def __init__(self):
+        self.capas = {}      # nombre -> (firma, superficie)
+        self.lienzos = {}    # nombre -> superficie reutilizable
+        self.reconstrucciones = 0  # Sube cada vez que una capa se rehace
+
+    def capa(self, nombre, firma, dibujar, tamaño, alpha=True):
+        """Devuelve la capa `nombre`; llama a dibujar(superficie) si la firma cambió."""
+        guardada = self.capas.get(nombre)
+        if guardada is None or guardada[0] != firma:
+            lienzo = self.lienzos.get(nombre)
+            if lienzo is None or lienzo.get_size() != tamaño:
+                lienzo = nueva_superficie(tamaño, pygame.SRCALPHA if alpha else 0)
+                self.lienzos[nombre] = lienzo
+            lienzo.fill((0, 0, 0, 0))
+            dibujar(lienzo)
+            guardada = (firma, lienzo)
+            self.capas[nombre] = guardada
+            self.reconstrucciones += 1
+        return guardada[1]
+
+    def invalidar(self, nombre=None):
+        """Descarta una capa (o todas) para forzar su reconstrucción."""
+        if nombre is None:
+            self.capas.clear()
+        else:
+            self.capas.pop(nombre, None)
+        self.reconstrucciones += 1
+
+def dibujar_degradado(surf):
+    """Hornea el fondo degradado vertical en la superficie dada."""
+    ancho, alto = surf.get_size()
+    surf.fill(NEGRO)
+    for i in range(alto):
+        color = (20, 20 + (i//15), 40)
+        pygame.draw.line(surf, color, (0, i), (ancho, i))
+
+# ============================================================
+# PERFILADOR DE FRAMES POR FASES
+# ============================================================
+class PerfilFrames:
+    """
+    Mide cuánto tarda cada fase del bucle principal con time.perf_counter()
+    y guarda las muestras (en ms) en un buffer circular de tamaño fijo.
+    Desactivado, cada marca es solo una comprobación de un booleano.
+    """
+    FASES = ("eventos", "botones", "efectos", "degradado", "ambiente",
+             "escena", "dibujo_fx", "blit", "flip", "espera")
+
+    def __init__(self, capacidad=600):
+        self.capacidad = capacidad
+        self.muestras = {f: array('d', bytes(8 * capacidad)) for f in self.FASES}
+        self.indice = 0    # Próxima posición a escribir
+        self.guardadas = 0  # Cuántos frames válidos hay (<= capacidad)
+        self.activo = False
+        self.overlay_visible = False
+        self._t = 0.0
+        self._overlay = None
+        self._overlay_edad = 0
+
+    def inicio(self):
+        if self.activo:
+            self._t = time.perf_counter()
+
+    def marcar(self, fase):
+        """Cierra la fase `fase`: guarda el tiempo desde la marca anterior."""
+        if self.activo:
+            ahora = time.perf_counter()
+            self.muestras[fase][self.indice] = (ahora - self._t) * 1000
+            self._t = ahora
+
+    def fin(self):
+        if self.activo:
+            self.indice = (self.indice + 1) % self.capacidad
+            self.guardadas = min(self.guardadas + 1, self.capacidad)
+
+    def serie(self, fase=None):
+        """Muestras en orden cronológico; sin `fase`, el total del frame."""
+        n = self.guardadas
+        orden = [(self.indice - n + i) % self.capacidad for i in range(n)]
+        if fase is not None:
+            datos = self.muestras[fase]
+            return [datos[i] for i in orden]
+        return [sum(self.muestras[f][i] for f in self.FASES) for i in orden]
+
+    def percentiles(self, fase=None, qs=(50, 95, 99)):
+        datos = sorted(self.serie(fase))
+        if not datos:
+            return [0.0 for _ in qs]
+        return [datos[min(len(datos) - 1, int(len(datos) * q / 100))] for q in qs]
+
+    def dibujar(self, surface):
+        """Overlay con percentiles por fase y un sparkline del frame total."""
+        # Rehacerlo cada 15 frames basta y evita rasterizar texto en cada uno
+        self._overlay_edad -= 1
+        if self._overlay is None or self._overlay_edad <= 0:
+            self._overlay = self._crear_overlay()
+            self._overlay_edad = 15
+        return surface.blit(self._overlay, (10, 10))
+
+    def _crear_overlay(self):
+        ancho, alto_linea = 330, 18
+        filas = len(self.FASES) + 2
+        capa = nueva_superficie((ancho, filas * alto_linea + 70), pygame.SRCALPHA)
+        capa.fill((0, 0, 0, 190))
+
+        def linea(y, columnas, color=BLANCO):
+            # La fuente no es monoespaciada: cada columna va en su propia x
+            for x, texto in zip((8, 120, 190, 260), columnas):
+                capa.blit(FUENTE_PEQUENA.render(texto, True, color), (x, y))
+
+        linea(4, ("fase (ms)", "p50", "p95", "p99"), AMARILLO)
+        for i, fase in enumerate(self.FASES + (None,)):
+            valores = [f"{v:.2f}" for v in self.percentiles(fase)]
+            linea(4 + (i + 1) * alto_linea, [fase or "TOTAL"] + valores,
+                  BLANCO if fase else CIAN)
+
+        # Sparkline de los últimos 120 frames (la línea roja marca 1/FPS)
+        totales = self.serie()[-120:]
+        base_y = capa.get_height() - 8
+        escala = 50 / max(1000 / FPS * 2, max(totales, default=0))
+        objetivo = base_y - (1000 / FPS) * escala
+        pygame.draw.line(capa, ROJO, (8, objetivo), (ancho - 8, objetivo))
+        if len(totales) > 1:
+            paso = (ancho - 16) / (len(totales) - 1)
+            puntos = [(8 + i * paso, base_y - t * escala) for i, t in enumerate(totales)]
+            pygame.draw.lines(capa, VERDE, False, puntos)
+        return capa
+
+    def guardar_csv(self, ruta):
+        """Vuelca el buffer circular (un frame por fila, ms por fase) a CSV."""
+        series = [self.serie(f) for f in self.FASES]
+        with open(ruta, "w", newline="") as f:
+            escritor = csv.writer(f)
+            escritor.writerow(("frame",) + self.FASES + ("total",))
+            for i, fila in enumerate(zip(*series)):
+                escritor.writerow((i,) + tuple(f"{v:.4f}" for v in fila) + (f"{sum(fila):.4f}",))
+        print(f"[PerfilFrames] {len(series[0])} frames guardados en {ruta}")
+
 # ============================================================
 # CLASES DE EFECTOS VISUALES
 # ============================================================
 class TextoFlotante:
+    # __slots__: objetos pequeños y sin __dict__, pensados para reciclarse en PoolTextos
+    __slots__ = ("x", "y", "y_anterior", "texto", "color", "alpha", "font", "vida")
+
     def __init__(self, x, y, texto, color=ROJO, tamaño=30):
+        self.reiniciar(x, y, texto, color, tamaño)
+
+    def reiniciar(self, x, y, texto, color=ROJO, tamaño=30):
+        """Deja el objeto como recién creado (lo usa el pool al reciclarlo)."""
         self.x = x
         self.y = y
         self.texto = texto
         self.color = color
+        self.y_anterior = y  # Posición del paso previo (para interpolar)
         self.alpha = 255
-        self.font = pygame.font.SysFont("Arial", tamaño, bold=True)
-        self.vida = 80  # frames
+        self.font = obtener_fuente("Arial", tamaño, bold=True)
+        self.vida = 80  # pasos de simulación
 
     def update(self):
+        self.y_anterior = self.y
         self.y -= 1.0  # Flotar hacia arriba lento
         self.vida -= 1
         if self.vida < 20:
             self.alpha -= 12  # Desvanecer
 
-    def draw(self, surface):
+    def draw(self, surface, interp=1.0):
         if self.vida > 0 and self.alpha > 0:
-            text_surf = self.font.render(self.texto, True, self.color)
+            # La superficie es compartida: se aplica el alpha solo para este blit
+            text_surf = TEXTOS.render(self.texto, self.font, self.color)
             text_surf.set_alpha(self.alpha)
-            surface.blit(text_surf, (self.x, self.y))
+            y = self.y_anterior + (self.y - self.y_anterior) * interp
+            rect = surface.blit(text_surf, (self.x, y))
+            text_surf.set_alpha(None)
+            return rect
+        return None
 
-class Particula:
-    def __init__(self, x, y, color):
-        self.x = x
-        self.y = y
-        self.vx = random.uniform(-4, 4)
-        self.vy = random.uniform(-4, 4)
-        self.vida = random.randint(20, 40)
-        self.color = color
-        self.radio = random.randint(3, 6)
+class PoolTextos:
+    """
+    Pool de capacidad fija de TextoFlotante: los objetos se crean una vez y
+    se reciclan desde una lista libre. Los muertos se quitan con
+    "swap-and-pop" (se pisa con el último y se hace pop), sin copiar listas.
+    Los contadores ayudan a elegir la capacidad.
+    """
+    def __init__(self, capacidad=32):
+        self.capacidad = capacidad
+        self.libres = [TextoFlotante(0, 0, "") for _ in range(capacidad)]
+        self.activos = []
+        # Contadores de presión
+        self.emitidos = 0
+        self.pico_activos = 0
+        self.agotado = 0  # Veces que no había libres y se recicló un texto vivo
 
-    def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.radio *= 0.9  # Hacerse más pequeño
-        self.vida -= 1
+    def emitir(self, x, y, texto, color=ROJO, tamaño=30):
+        self.emitidos += 1
+        if self.libres:
+            fx = self.libres.pop()
+            self.activos.append(fx)
+        else:
+            # Pool lleno: se recicla el texto al que menos vida le queda
+            self.agotado += 1
+            fx = min(self.activos, key=lambda t: t.vida)
+        fx.reiniciar(x, y, texto, color, tamaño)
+        self.pico_activos = max(self.pico_activos, len(self.activos))
+        return fx
 
-    def draw(self, surface):
-        if self.vida > 0:
-            pygame.draw.circle(surface, self.color, (int(self.x), int(self.y)), int(self.radio))
+    def actualizar(self):
+        activos = self.activos
+        i = 0
+        while i < len(activos):
+            fx = activos[i]
+            fx.update()
+            if fx.vida <= 0:
+                activos[i] = activos[-1]  # Swap-and-pop
+                activos.pop()
+                self.libres.append(fx)
+            else:
+                i += 1
+
+    def vaciar(self):
+        self.libres.extend(self.activos)
+        self.activos.clear()
+
+    def estadisticas(self):
+        return {"capacidad": self.capacidad, "activos": len(self.activos),
+                "pico_activos": self.pico_activos, "emitidos": self.emitidos,
+                "agotado": self.agotado}
 
 # ============================================================
 # CLASES DE UI (BOTONES)
@@ -169,182 +525,182 @@ class Boton:
         self.accion = accion
         self.hovered = False
 
-    def update(self, eventos):
-        mouse_pos = pygame.mouse.get_pos()
-        self.hovered = self.rect.collidepoint(mouse_pos)
-        
-        for evento in eventos:
-            if evento.type == pygame.MOUSEBUTTONDOWN and evento.button == 1:
-                if self.hovered and self.accion:
-                    self.accion()
-
     def draw(self, surface):
         color = self.color_hover if self.hovered else self.color_base
         # Sombra
-        pygame.draw.rect(surface, (20, 20, 20), (self.rect.x+3, self.rect.y+3, self.rect.w, self.rect.h), border_radius=8)
+        sombra = pygame.draw.rect(surface, (20, 20, 20), (self.rect.x+3, self.rect.y+3, self.rect.w, self.rect.h), border_radius=8)
         # Botón
         pygame.draw.rect(surface, color, self.rect, border_radius=8)
         pygame.draw.rect(surface, BLANCO, self.rect, 2, border_radius=8)
         
-        txt = FUENTE_MEDIANA.render(self.texto, True, BLANCO)
+        txt = TEXTOS.render(self.texto, FUENTE_MEDIANA, BLANCO)
         surface.blit(txt, (self.rect.centerx - txt.get_width()//2, self.rect.centery - txt.get_height()//2))
+        return self.rect.union(sombra)  # Área tocada (para rects sucios)
 
-# ============================================================
-# MODELO DE PERSONAJES
-# ============================================================
-class Personaje:
-    def __init__(self, nombre, color_tema, max_vida, daño_base):
-        self.nombre = nombre
-        self.image = cargar_imagen(nombre, color_tema)
-        self.max_vida = max_vida
-        self.vida = max_vida
-        self.daño_base = daño_base
-        self.cooldowns = {}
-        
-        # Animación y Posición
-        self.origen_x = 0
-        self.origen_y = 0
-        self.x = 0
-        self.y = 0
-        self.rect = pygame.Rect(0, 0, 150, 150)
-        self.anim_timer = 0
-        self.estado_anim = "IDLE" # IDLE, ATAQUE, REGRESO
-
-    def set_pos(self, x, y):
-        self.origen_x = x
-        self.origen_y = y
-        self.x = x
-        self.y = y
-        self.rect.topleft = (x, y)
+class EnrutadorEventos:
+    """
+    Despachador único de la entrada: lee el ratón una vez por frame y
+    resuelve hover y clics con una rejilla uniforme de celdas (índice
+    espacial de los rects de los botones). Solo el botón golpeado recibe
+    su acción, así que el coste no crece con el número de botones.
+    """
+    def __init__(self, obtener_botones, celda=64):
+        self.obtener_botones = obtener_botones  # Devuelve la lista de botones vigente
+        self.celda = celda
+        self.rejilla = {}  # (col, fila) -> [botones que tocan esa celda]
+        self._indexados = None
+        self.hover = None
 
-    def update(self):
-        # Interpolación simple para animaciones
-        if self.estado_anim == "ATAQUE":
-            # Moverse hacia adelante
-            direccion = 1 if self.origen_x < ANCHO/2 else -1
-            objetivo = self.origen_x + (200 * direccion)
-            self.x += (objetivo - self.x) * 0.2
-            if abs(self.x - objetivo) < 5:
-                self.estado_anim = "REGRESO"
-        elif self.estado_anim == "REGRESO":
-            self.x += (self.origen_x - self.x) * 0.1
-            if abs(self.x - self.origen_x) < 2:
-                self.x = self.origen_x
-                self.estado_anim = "IDLE"
-        
-        self.rect.topleft = (self.x, self.y)
+    def _indexar(self, botones):
+        c = self.celda
+        self.rejilla = {}
+        for b in botones:
+            r = b.rect
+            for cx in range(r.left // c, (r.right - 1) // c + 1):
+                for cy in range(r.top // c, (r.bottom - 1) // c + 1):
+                    self.rejilla.setdefault((cx, cy), []).append(b)
+        self._indexados = botones
+        if self.hover is not None:
+            self.hover.hovered = False
+            self.hover = None
 
-    def atacar(self, objetivo):
-        self.estado_anim = "ATAQUE"
-        spread = max(1, int(self.daño_base * 0.2))
-        daño = random.randint(self.daño_base - spread, self.daño_base + spread)
-        
-        es_critico = False
-        texto_especial = ""
+    def boton_en(self, pos):
+        """Botón bajo `pos` (el último añadido gana si se solapan) o None."""
+        botones = self.obtener_botones()
+        if botones is not self._indexados:
+            self._indexar(botones)  # La escena cambió su lista de botones
+        candidatos = self.rejilla.get((pos[0] // self.celda, pos[1] // self.celda))
+        if candidatos:
+            for b in reversed(candidatos):
+                if b.rect.collidepoint(pos):
+                    return b
+        return None
 
-        if random.random() < 0.15: # Crítico genérico
-            daño = int(daño * 1.8)
-            es_critico = True
+    def despachar(self, eventos, mouse_pos):
+        # Hover: solo cambian los dos botones implicados
+        b = self.boton_en(mouse_pos)
+        if b is not self.hover:
+            if self.hover is not None:
+                self.hover.hovered = False
+            if b is not None:
+                b.hovered = True
+            self.hover = b
 
-        # Lógica polimórfica de ataque
-        daño, texto_especial = self.habilidad_especial_ataque(daño)
-        
-        # Lógica polimórfica de defensa
-        daño_final, razon_mitigacion = objetivo.defender(daño)
-        
-        objetivo.recibir_daño(daño_final)
-        
-        # Retornamos todo para que la UI lo muestre
-        return daño_final, es_critico, texto_especial, razon_mitigacion
-
-    def recibir_daño(self, cantidad):
-        self.vida = max(0, self.vida - cantidad)
-
-    def defender(self, daño):
-        """Retorna (daño_final, texto_explicativo)"""
-        return self.habilidad_especial_defensa(daño)
-
-    # Métodos para sobreescribir
-    def habilidad_especial_ataque(self, daño): 
-        return daño, ""
-    
-    def habilidad_especial_defensa(self, daño): 
-        return daño, ""
-
-class Jinx(Personaje):
-    def habilidad_especial_ataque(self, daño):
-        if random.random() < 0.25:
-            return int(daño * 1.5), "¡COHETE!"
-        return daño, ""
-
-class Yasuo(Personaje):
-    def habilidad_especial_defensa(self, daño):
-        # Yasuo tiene probabilidad de bloquear TODO el daño
-        if random.random() < 0.15:
-            return 0, "¡MURO DE VIENTO!"
-        return daño, ""
-
-class Lux(Personaje):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.escudo_cd = 0
-
-    def habilidad_especial_defensa(self, daño):
-        if self.escudo_cd == 0:
-            self.escudo_cd = 3
-            absorb = int(daño * 0.5)
-            return daño - absorb, f"¡ESCUDO! (-{absorb})"
-        if self.escudo_cd > 0: self.escudo_cd -= 1
-        return daño, ""
-
-class Ezreal(Personaje):
-    def habilidad_especial_ataque(self, daño):
-        if random.random() < 0.2:
-            return 0, "¡Falla Skillshot!"
-        return daño + 10, ""
-
-class Poppy(Personaje):
-    def habilidad_especial_defensa(self, daño):
-        # Poppy siempre reduce daño un poco por ser tanque
-        reducido = int(daño * 0.2)
-        return daño - reducido, "¡PIEL DE HIERRO!"
-
-class Caitlyn(Personaje):
-    def habilidad_especial_ataque(self, daño):
-        if random.random() < 0.4:
-            return int(daño * 1.7), "¡Headshot!"
-        return daño, ""
+        for evento in eventos:
+            if evento.type == pygame.MOUSEBUTTONDOWN and evento.button == 1:
+                b = self.boton_en(evento.pos)
+                if b is not None and b.accion:
+                    b.accion()
+
+# ============================================================
+# ARRANQUE DE LA APLICACIÓN
+# ============================================================
+def iniciar_aplicacion():
+    """
+    Inicializa pygame, abre la ventana y crea el reloj, las fuentes y el
+    generador de ambiente. Importar este módulo no hace nada de esto; Juego()
+    la llama si nadie lo hizo antes, y llamarla varias veces no repite nada.
+    """
+    global PANTALLA, RELOJ, FUENTE_GRANDE, FUENTE_MEDIANA, FUENTE_PEQUENA, ambiente_bg
+    if PANTALLA is not None:
+        return
+    pygame.init()
+    PANTALLA = pygame.display.set_mode((ANCHO, ALTO))
+    pygame.display.set_caption("League of Pygame - Duelo por Turnos (Con Threads)")
+    RELOJ = pygame.time.Clock()
+    FUENTE_GRANDE = obtener_fuente("Arial", 50, bold=True)
+    FUENTE_MEDIANA = obtener_fuente("Arial", 30, bold=True)
+    FUENTE_PEQUENA = obtener_fuente("Arial", 18)
+    if ambiente_bg is None:  # Se puede preparar otro antes de arrancar (benchmark.py)
+        ambiente_bg = nuevo_ambiente()
 
 # ============================================================
 # GESTOR DEL JUEGO (Game Loop principal)
 # ============================================================
 class Juego:
-    def __init__(self):
+    def __init__(self, perfil_csv=None, fps_render=FPS, escala_tiempo=1.0,
+                 semilla=None, repeticion=None, ruta_grabacion=None):
+        iniciar_aplicacion()  # Ventana, fuentes y ambiente (si aún no existen)
         self.escena = "SELECCION" # SELECCION, PELEA, VICTORIA
         self.jugador1 = None
         self.jugador2 = None
         self.turno = 1
-        self.efectos = [] # Textos y partículas
+        self.textos = PoolTextos() # Textos flotantes (reciclados)
+        self.chispas = SistemaParticulas(capacidad=256)  # Partículas de impacto
         self.botones = []
+        self.botones_seleccion = []
+        self.botones_pelea = []
+        self.botones_victoria = []
+        self.enrutador = EnrutadorEventos(lambda: self.botones)
         
         # Iniciar el Hilo de Ambiente (Background)
         if not ambiente_bg.is_alive():
             ambiente_bg.start()
         
-        # Crear plantilla de personajes
+        # Crear plantilla de personajes (vida y daño en combate.ESTADISTICAS)
+        stats = combate.ESTADISTICAS
         self.roster = [
-            Lux("Lux", AMARILLO, 100, 15),
-            Yasuo("Yasuo", GRIS_CLARO, 120, 14),
-            Ezreal("Ezreal", AZUL, 105, 16),
-            Jinx("Jinx", PURPURA, 95, 18),
-            Poppy("Poppy", VERDE, 150, 10),
-            Caitlyn("Caitlyn", ROJO, 100, 15)
+            Lux("Lux", AMARILLO, *stats["Lux"]),
+            Yasuo("Yasuo", GRIS_CLARO, *stats["Yasuo"]),
+            Ezreal("Ezreal", AZUL, *stats["Ezreal"]),
+            Jinx("Jinx", PURPURA, *stats["Jinx"]),
+            Poppy("Poppy", VERDE, *stats["Poppy"]),
+            Caitlyn("Caitlyn", ROJO, *stats["Caitlyn"])
         ]
+        for pj in self.roster:
+            pj.image = cargar_imagen(pj.nombre, pj.color_tema)
+
+        # Tiradas de combate reproducibles: cada partida tiene su semilla y
+        # se graban las acciones del jugador (ver repeticion.py). Al repetir
+        # una grabación se usan su semilla y sus estadísticas.
+        if repeticion is not None:
+            semilla = repeticion.semilla
+            for pj, (_, max_vida, daño_base) in zip(self.roster, repeticion.roster):
+                pj.max_vida, pj.vida, pj.daño_base = max_vida, max_vida, daño_base
+        elif semilla is None:
+            semilla = random.randrange(2 ** 32)
+        self.rng = random.Random(semilla)
+        self.grabacion = Grabacion(semilla, [(p.nombre, p.max_vida, p.daño_base) for p in self.roster])
+        self.repeticion = Reproductor(repeticion) if repeticion is not None else None
+        self.ruta_grabacion = ruta_grabacion  # Se guarda al cerrar la ventana
         
         self.crear_interfaz_seleccion()
         self.shake_timer = 0
+        self.compositor = CompositorCapas()
+
+        # Render targets persistentes: se limpian en el sitio cada frame en
+        # lugar de crear una superficie de pantalla completa nueva.
+        self.lienzo = nueva_superficie((ANCHO, ALTO), pygame.SRCALPHA)
+        self.velo = nueva_superficie((ANCHO, ALTO), pygame.SRCALPHA)  # Oscurecer en VICTORIA
+        self.velo.fill((*NEGRO, 150))
+        self.superficies_frame = 0  # Superficies creadas en el último frame (DEBUG)
+
+        # Reloj de simulación: fps_render=0 dibuja sin límite; escala_tiempo > 1
+        # acelera la simulación respecto al tiempo real (útil en pruebas).
+        self.fps_render = fps_render
+        self.escala_tiempo = escala_tiempo
+        self.pasos_simulados = 0
+        self._reloj_anterior = None  # Se fija en el primer frame
+        self._acumulado = 0.0
+
+        # Modo de rectángulos sucios: solo se envían a la pantalla las zonas
+        # que cambiaron (pygame.display.update(rects)) en vez de flip().
+        self.modo_sucio = MODO_RECTS_SUCIOS
+        self.sucios = []          # Rects tocados en este frame
+        self.sucios_previos = []  # Rects del frame anterior (hay que borrarlos)
+        self.forzar_completo = True
+
+        # Perfilador por fases (F3 muestra el overlay). Si se pide un CSV
+        # se mide todo el tiempo y se guarda al salir.
+        self.perfil = PerfilFrames()
+        self.perfil_csv = perfil_csv
+        self.perfil.activo = perfil_csv is not None
 
     def crear_interfaz_seleccion(self):
+        # Los botones de cada escena se crean una sola vez y se reutilizan
+        if self.botones_seleccion:
+            self.botones = self.botones_seleccion
+            return
         self.botones = []
         x_inicial = 150
         y_inicial = 200
@@ -364,13 +720,16 @@ class Juego:
                      accion=lambda idx=i: self.seleccionar_personaje(idx))
             self.botones.append(b)
             col += 1
+        self.botones_seleccion = self.botones
 
     def seleccionar_personaje(self, indice):
+        self.grabacion.registrar(self.pasos_simulados, "seleccionar_personaje", indice)
         clase = self.roster[indice]
         # Clonar personaje
         nuevo = type(clase)(clase.nombre, (100,100,100), clase.max_vida, clase.daño_base)
         # Reasignar imagen (se pierde al clonar con type)
         nuevo.image = clase.image 
+        nuevo.rng = self.rng  # Todas las tiradas salen del generador de la partida
         
         if not self.jugador1:
             self.jugador1 = nuevo
@@ -387,19 +746,23 @@ class Juego:
         self.jugador2.set_pos(ANCHO - 300, 350)
         
         # Botones de acción
-        btn_atk = Boton(ANCHO//2 - 100, 600, 200, 60, "¡ATACAR!", ROJO, (255, 100, 100), self.accion_atacar)
-        btn_reset = Boton(ANCHO - 150, 20, 130, 40, "Reiniciar", GRIS, GRIS_CLARO, self.reset_game)
-        self.botones = [btn_atk, btn_reset]
+        if not self.botones_pelea:
+            btn_atk = Boton(ANCHO//2 - 100, 600, 200, 60, "¡ATACAR!", ROJO, (255, 100, 100), self.accion_atacar)
+            btn_reset = Boton(ANCHO - 150, 20, 130, 40, "Reiniciar", GRIS, GRIS_CLARO, self.reset_game)
+            self.botones_pelea = [btn_atk, btn_reset]
+        self.botones = self.botones_pelea
 
     def accion_atacar(self):
         if self.jugador1.estado_anim != "IDLE" or self.jugador2.estado_anim != "IDLE":
             return # Esperar animaciones
+        self.grabacion.registrar(self.pasos_simulados, "accion_atacar")
 
         atacante = self.jugador1 if self.turno == 1 else self.jugador2
         defensor = self.jugador2 if self.turno == 1 else self.jugador1
         
         # Calcular daño y lógica (Ahora recibe la razón de mitigación)
         daño, crit, special, mitigacion = atacante.atacar(defensor)
+        self.grabacion.registrar_vidas(self.jugador1.vida, self.jugador2.vida)
         
         # Generar efectos visuales
         pos_txt_x = defensor.x + 75
@@ -407,7 +770,7 @@ class Juego:
         
         # 1. Mostrar texto de mitigación si existe (ej: "Muro de viento")
         if mitigacion:
-            self.efectos.append(TextoFlotante(pos_txt_x, pos_txt_y - 50, mitigacion, CIAN, 25))
+            self.textos.emitir(pos_txt_x, pos_txt_y - 50, mitigacion, CIAN, 25)
 
         # 2. Mostrar Daño
         if daño == 0 and not mitigacion:
@@ -419,34 +782,57 @@ class Juego:
             else:
                 color_dmg = AMARILLO if crit else BLANCO
                 tam_dmg = 60 if crit else 40
-                self.efectos.append(TextoFlotante(pos_txt_x, pos_txt_y, f"-{daño}", color_dmg, tam_dmg))
+                self.textos.emitir(pos_txt_x, pos_txt_y, f"-{daño}", color_dmg, tam_dmg)
                 
                 # Sangre/Chispas
-                for _ in range(15):
-                    self.efectos.append(Particula(defensor.x + 75, defensor.y + 75, ROJO))
+                emitir_chispas(self.chispas, defensor.x + 75, defensor.y + 75, ROJO, 15)
 
                 if crit:
                     self.shake_timer = 10 # Vibrar pantalla
 
         # 3. Mostrar texto de habilidad ofensiva (ej: "Cohete")
         if special:
-            self.efectos.append(TextoFlotante(pos_txt_x - 50, pos_txt_y - 80, special, PURPURA, 25))
+            self.textos.emitir(pos_txt_x - 50, pos_txt_y - 80, special, PURPURA, 25)
 
         # Verificar victoria
         if defensor.vida <= 0:
             self.escena = "VICTORIA"
-            self.botones = [Boton(ANCHO//2 - 100, 500, 200, 50, "Jugar de nuevo", VERDE, AZUL, self.reset_game)]
+            if not self.botones_victoria:
+                self.botones_victoria = [Boton(ANCHO//2 - 100, 500, 200, 50, "Jugar de nuevo", VERDE, AZUL, self.reset_game)]
+            self.botones = self.botones_victoria
         else:
             self.turno = 2 if self.turno == 1 else 1
 
     def reset_game(self):
+        self.grabacion.registrar(self.pasos_simulados, "reset_game")
         self.jugador1 = None
         self.jugador2 = None
         self.turno = 1
         self.escena = "SELECCION"
-        self.efectos = []
+        self.textos.vaciar()
+        self.chispas.vaciar()
         self.crear_interfaz_seleccion()
 
+    def paso_simulacion(self):
+        """Avanza un paso fijo (PASO_SIM) de toda la lógica animada."""
+        if self.repeticion is not None:
+            self.repeticion.aplicar(self)  # Acciones grabadas para este paso
+        self.textos.actualizar()
+        self.chispas.actualizar()
+
+        if self.escena == "PELEA" or self.escena == "VICTORIA":
+            self.jugador1.update()
+            self.jugador2.update()
+
+        if self.shake_timer > 0:
+            self.shake_timer -= 1
+        self.pasos_simulados += 1
+
+    def simular(self, pasos):
+        """Avanza `pasos` pasos de simulación sin dibujar (más rápido que tiempo real)."""
+        for _ in range(pasos):
+            self.paso_simulacion()
+
     def draw_health_bar(self, surface, x, y, actual, maximo, color):
         ancho_barra = 250
         alto_barra = 25
@@ -459,135 +845,265 @@ class Juego:
         # Borde
         pygame.draw.rect(surface, BLANCO, (x, y, ancho_barra, alto_barra), 2)
         
-        txt = FUENTE_PEQUENA.render(f"{actual}/{maximo}", True, BLANCO)
+        txt = TEXTOS.render(f"{actual}/{maximo}", FUENTE_PEQUENA, BLANCO)
         surface.blit(txt, (x + ancho_barra//2 - txt.get_width()//2, y + 2))
+        return pygame.Rect(x, y, ancho_barra, alto_barra)
+
+    # --- Constructores de capas estáticas (se hornean una vez) ---
+    def dibujar_capa_seleccion(self, capa):
+        """Título, jugador elegido y parrilla de personajes."""
+        titulo = TEXTOS.render("SELECCIONA TUS CAMPEONES", FUENTE_GRANDE, BLANCO)
+        capa.blit(titulo, (ANCHO//2 - titulo.get_width()//2, 50))
+
+        if self.jugador1:
+            info = TEXTOS.render(f"Jugador 1: {self.jugador1.nombre}", FUENTE_MEDIANA, AZUL)
+        else:
+            info = TEXTOS.render("Jugador 1: Eligiendo...", FUENTE_MEDIANA, GRIS_CLARO)
+        capa.blit(info, (50, 120))
+
+        # Dibujar parrilla de personajes
+        x_inicial = 150
+        y_inicial = 200
+        col = 0
+        row = 0
+        for i, pj in enumerate(self.roster):
+            if i > 0 and i % 3 == 0:
+                row += 1
+                col = 0
+            x = x_inicial + col * 280
+            y = y_inicial + row * 220
+
+            capa.blit(pj.image, (x, y))
+            nombre = TEXTOS.render(pj.nombre, FUENTE_MEDIANA, BLANCO)
+            capa.blit(nombre, (x + 75 - nombre.get_width()//2, y - 30))
+
+            stats = TEXTOS.render(f"HP:{pj.max_vida} ATK:{pj.daño_base}", FUENTE_PEQUENA, GRIS_CLARO)
+            capa.blit(stats, (x + 75 - stats.get_width()//2, y + 155))
+            col += 1
+
+    def dibujar_capa_pelea(self, capa):
+        """Nombres de los jugadores e indicador de turno."""
+        nombre1 = TEXTOS.render(self.jugador1.nombre, FUENTE_MEDIANA, BLANCO)
+        nombre2 = TEXTOS.render(self.jugador2.nombre, FUENTE_MEDIANA, BLANCO)
+        capa.blit(nombre1, (50, 20))
+        capa.blit(nombre2, (ANCHO - 300, 20))
+
+        # Indicador de turno
+        if self.escena == "PELEA":
+            txt_turno = f"TURNO: {'JUGADOR 1' if self.turno == 1 else 'JUGADOR 2'}"
+            col_turno = AZUL if self.turno == 1 else ROJO
+            lbl = TEXTOS.render(txt_turno, FUENTE_GRANDE, col_turno)
+            capa.blit(lbl, (ANCHO//2 - lbl.get_width()//2, 100))
 
     def run(self):
         while True:
-            eventos = pygame.event.get()
-            for event in eventos:
-                if event.type == pygame.QUIT:
-                    ambiente_bg.activo = False # Apagar hilo
-                    pygame.quit()
-                    sys.exit()
-
-            # Update logic
-            for btn in self.botones:
-                btn.update(eventos)
-            
-            for fx in self.efectos[:]:
-                fx.update()
-                if hasattr(fx, 'vida') and fx.vida <= 0:
-                    self.efectos.remove(fx)
-
-            if self.shake_timer > 0:
-                self.shake_timer -= 1
-                shake_x = random.randint(-5, 5)
-                shake_y = random.randint(-5, 5)
-            else:
-                shake_x, shake_y = 0, 0
+            self.frame()
+
+    def frame(self):
+        """Un frame completo: entrada, pasos de simulación, dibujado y espera."""
+        perfil = self.perfil
+        superficies_antes = ContadorSuperficies.total
+        perfil.inicio()
+        eventos = pygame.event.get()
+        for event in eventos:
+            if event.type == pygame.QUIT:
+                ambiente_bg.activo = False # Apagar hilo
+                if self.perfil_csv:
+                    perfil.guardar_csv(self.perfil_csv)
+                if self.ruta_grabacion:
+                    self.grabacion.guardar(self.ruta_grabacion)
+                if DEBUG:
+                    print("[Juego] Pool de textos:", self.textos.estadisticas())
+                pygame.quit()
+                sys.exit()
+            elif event.type == pygame.VIDEORESIZE:
+                self.compositor.invalidar()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F2:
+                self.modo_sucio = not self.modo_sucio
+                self.forzar_completo = True
+                print(f"[Juego] Rects sucios: {'ON' if self.modo_sucio else 'OFF'}")
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                perfil.overlay_visible = not perfil.overlay_visible
+                perfil.activo = perfil.overlay_visible or self.perfil_csv is not None
+                self.forzar_completo = True
+        perfil.marcar("eventos")
 
-            # Dibujado
-            PANTALLA.fill(NEGRO) # Limpiar pantalla
+        # Update logic (durante una repetición se ignoran los clics)
+        if self.repeticion is None:
+            self.enrutador.despachar(eventos, pygame.mouse.get_pos())
+        perfil.marcar("botones")
+        
+        # Simulación a paso fijo: se acumula el tiempo real transcurrido y
+        # se consumen tantos pasos de PASO_SIM como quepan.
+        ahora = time.perf_counter()
+        if self._reloj_anterior is None:
+            self._reloj_anterior = ahora
+        self._acumulado += min((ahora - self._reloj_anterior) * self.escala_tiempo,
+                               PASO_SIM * MAX_PASOS_POR_FRAME)
+        self._reloj_anterior = ahora
+        while self._acumulado >= PASO_SIM:
+            self.paso_simulacion()
+            self._acumulado -= PASO_SIM
+        interp = self._acumulado / PASO_SIM  # Fracción del paso siguiente, para dibujar
+
+        if self.shake_timer > 0:
+            shake_x = random.randint(-5, 5)
+            shake_y = random.randint(-5, 5)
+        else:
+            shake_x, shake_y = 0, 0
+        perfil.marcar("efectos")
+
+        # Dibujado
+        reconstrucciones = self.compositor.reconstrucciones
+        sucios = self.sucios = []
+
+        # Fondo genérico degradado (horneado; solo cambia si cambia el tamaño)
+        tam = PANTALLA.get_size()
+        fondo = self.compositor.capa("degradado", tam, dibujar_degradado, tam, alpha=False)
+
+        surface_juego = self.lienzo
+        surface_juego.fill((0, 0, 0, 0))
+        perfil.marcar("degradado")
+
+        # --- DIBUJAR HILO DE AMBIENTE ---
+        # Leemos el último frame publicado por el hilo (sin bloquearlo)
+        # Pygame draw circle no soporta alpha directo facil, usamos circle sólido pequeño
+        sucios.extend(ambiente_bg.dibujar(surface_juego))
+        perfil.marcar("ambiente")
+        # --------------------------------
+
+        if self.escena == "SELECCION":
+            firma = (self.escena, self.jugador1.nombre if self.jugador1 else None)
+            surface_juego.blit(self.compositor.capa("escena", firma, self.dibujar_capa_seleccion, (ANCHO, ALTO)), (0, 0))
+
+        elif self.escena == "PELEA" or self.escena == "VICTORIA":
+            # Dibujar personajes (posición interpolada entre pasos de simulación)
+            sucios.append(surface_juego.blit(self.jugador1.image, self.jugador1.posicion_dibujo(interp)))
+            # Jugador 2 invertido (mirando a izquierda); variante espejada en caché
+            img_j2 = RECURSOS.imagen(self.jugador2.nombre, espejo=True)
+            sucios.append(surface_juego.blit(img_j2, self.jugador2.posicion_dibujo(interp)))
+            
+            # UI Barras
+            sucios.append(self.draw_health_bar(surface_juego, 50, 50, self.jugador1.vida, self.jugador1.max_vida, VERDE))
+            sucios.append(self.draw_health_bar(surface_juego, ANCHO - 300, 50, self.jugador2.vida, self.jugador2.max_vida, ROJO))
             
-            # Fondo genérico degradado
-            for i in range(ALTO):
-                color = (20, 20 + (i//15), 40)
-                pygame.draw.line(PANTALLA, color, (0, i), (ANCHO, i))
+            # Nombres + indicador de turno (capa en caché)
+            firma = (self.escena, self.jugador1.nombre, self.jugador2.nombre, self.turno)
+            surface_juego.blit(self.compositor.capa("escena", firma, self.dibujar_capa_pelea, (ANCHO, ALTO)), (0, 0))
 
-            surface_juego = pygame.Surface((ANCHO, ALTO), pygame.SRCALPHA)
+        if self.escena == "VICTORIA":
+            ganador = self.jugador1.nombre if self.jugador1.vida > 0 else self.jugador2.nombre
+            surface_juego.blit(self.velo, (0, 0))
+            txt_vic = TEXTOS.render(f"¡VICTORIA PARA {ganador}!", FUENTE_GRANDE, AMARILLO)
+            surface_juego.blit(txt_vic, (ANCHO//2 - txt_vic.get_width()//2, ALTO//2 - 100))
 
-            # --- DIBUJAR HILO DE AMBIENTE ---
-            # Adquirimos el lock para leer la lista de particulas segura
-            with LOCK_PARTICULAS:
-                for p in ambiente_bg.particulas:
-                    color_con_alpha = (*p['color'], int(p['alpha']))
-                    # Dibujar circulo con alpha (requiere surface especial en pygame, simplificamos)
-                    # Pygame draw circle no soporta alpha directo facil, usamos circle sólido pequeño
-                    pygame.draw.circle(surface_juego, p['color'], (int(p['x']), int(p['y'])), p['radio'])
-            # --------------------------------
-
-            if self.escena == "SELECCION":
-                titulo = FUENTE_GRANDE.render("SELECCIONA TUS CAMPEONES", True, BLANCO)
-                surface_juego.blit(titulo, (ANCHO//2 - titulo.get_width()//2, 50))
-                
-                if self.jugador1:
-                    info = FUENTE_MEDIANA.render(f"Jugador 1: {self.jugador1.nombre}", True, AZUL)
-                    surface_juego.blit(info, (50, 120))
-                else:
-                    info = FUENTE_MEDIANA.render("Jugador 1: Eligiendo...", True, GRIS_CLARO)
-                    surface_juego.blit(info, (50, 120))
-                
-                # Dibujar parrilla de personajes
-                x_inicial = 150
-                y_inicial = 200
-                col = 0
-                row = 0
-                for i, pj in enumerate(self.roster):
-                    if i > 0 and i % 3 == 0:
-                        row += 1
-                        col = 0
-                    x = x_inicial + col * 280
-                    y = y_inicial + row * 220
-                    
-                    surface_juego.blit(pj.image, (x, y))
-                    nombre = FUENTE_MEDIANA.render(pj.nombre, True, BLANCO)
-                    surface_juego.blit(nombre, (x + 75 - nombre.get_width()//2, y - 30))
-                    
-                    stats = FUENTE_PEQUENA.render(f"HP:{pj.max_vida} ATK:{pj.daño_base}", True, GRIS_CLARO)
-                    surface_juego.blit(stats, (x + 75 - stats.get_width()//2, y + 155))
-                    col += 1
-
-            elif self.escena == "PELEA" or self.escena == "VICTORIA":
-                # Actualizar y Dibujar personajes
-                self.jugador1.update()
-                self.jugador2.update()
-                
-                surface_juego.blit(self.jugador1.image, self.jugador1.rect)
-                # Jugador 2 invertido (mirando a izquierda)
-                img_j2 = pygame.transform.flip(self.jugador2.image, True, False)
-                surface_juego.blit(img_j2, self.jugador2.rect)
-                
-                # UI Barras
-                self.draw_health_bar(surface_juego, 50, 50, self.jugador1.vida, self.jugador1.max_vida, VERDE)
-                self.draw_health_bar(surface_juego, ANCHO - 300, 50, self.jugador2.vida, self.jugador2.max_vida, ROJO)
-                
-                nombre1 = FUENTE_MEDIANA.render(self.jugador1.nombre, True, BLANCO)
-                nombre2 = FUENTE_MEDIANA.render(self.jugador2.nombre, True, BLANCO)
-                surface_juego.blit(nombre1, (50, 20))
-                surface_juego.blit(nombre2, (ANCHO - 300, 20))
-                
-                # Indicador de turno
-                if self.escena == "PELEA":
-                    txt_turno = f"TURNO: {'JUGADOR 1' if self.turno == 1 else 'JUGADOR 2'}"
-                    col_turno = AZUL if self.turno == 1 else ROJO
-                    lbl = FUENTE_GRANDE.render(txt_turno, True, col_turno)
-                    surface_juego.blit(lbl, (ANCHO//2 - lbl.get_width()//2, 100))
-
-            if self.escena == "VICTORIA":
-                ganador = self.jugador1.nombre if self.jugador1.vida > 0 else self.jugador2.nombre
-                overlay = pygame.Surface((ANCHO, ALTO))
-                overlay.set_alpha(150)
-                overlay.fill(NEGRO)
-                surface_juego.blit(overlay, (0,0))
-                
-                txt_vic = FUENTE_GRANDE.render(f"¡VICTORIA PARA {ganador}!", True, AMARILLO)
-                surface_juego.blit(txt_vic, (ANCHO//2 - txt_vic.get_width()//2, ALTO//2 - 100))
+        perfil.marcar("escena")
 
-            # Dibujar botones
-            for btn in self.botones:
-                btn.draw(surface_juego)
+        # Dibujar botones
+        for btn in self.botones:
+            sucios.append(btn.draw(surface_juego))
 
-            # Dibujar efectos (sobre todo lo demas)
-            for fx in self.efectos:
-                fx.draw(surface_juego)
+        # Dibujar efectos (sobre todo lo demas)
+        sucios.extend(self.chispas.dibujar(surface_juego))
+        for fx in self.textos.activos:
+            rect = fx.draw(surface_juego, interp)
+            if rect:
+                sucios.append(rect)
+        perfil.marcar("dibujo_fx")
 
+        # El shake mueve toda la imagen y el overlay de victoria cubre la
+        # pantalla entera: en esos casos (o si una capa se rehízo) flip completo.
+        completo = (not self.modo_sucio or self.forzar_completo
+                    or shake_x or shake_y or self.shake_timer > 0
+                    or self.escena == "VICTORIA" or perfil.overlay_visible
+                    or reconstrucciones != self.compositor.reconstrucciones)
+
+        if completo:
             # Aplicar shake y dibujar en pantalla final
+            PANTALLA.blit(fondo, (0, 0))
             PANTALLA.blit(surface_juego, (shake_x, shake_y))
-            
+            if perfil.overlay_visible:
+                perfil.dibujar(PANTALLA)
+            perfil.marcar("blit")
             pygame.display.flip()
-            RELOJ.tick(FPS)
+            # Tras un frame desplazado por el shake, el siguiente también va completo
+            self.forzar_completo = bool(shake_x or shake_y)
+            self.sucios_previos = sucios
+        else:
+            # Se repintan las zonas de este frame y las del anterior (para borrar)
+            rects = sucios + self.sucios_previos
+            for r in rects:
+                PANTALLA.blit(fondo, r, r)
+                PANTALLA.blit(surface_juego, r, r)
+            perfil.marcar("blit")
+            pygame.display.update(rects)
+            self.sucios_previos = sucios
+        perfil.marcar("flip")
+        RELOJ.tick(self.fps_render)  # 0 = sin límite
+        perfil.marcar("espera")
+        perfil.fin()
+        if DEBUG:
+            self.superficies_frame = ContadorSuperficies.total - superficies_antes
+
+# ============================================================
+# MODO ESTRÉS: CONTENCIÓN ENTRE EL HILO DE AMBIENTE Y EL DIBUJADO
+# ============================================================
+def medir_contencion_ambiente(particulas=2000, frames=300):
+    """
+    Lee y dibuja `frames` veces las partículas de un HiloAmbiente cargado,
+    una vez con el Lock compartido (modo antiguo) y otra con instantáneas.
+    "espera" es lo que tarda el bucle principal en tener los datos en la
+    mano (adquirir el lock / copiar la foto); "frame" incluye el dibujado.
+    """
+    destino = pygame.Surface((ANCHO, ALTO), pygame.SRCALPHA)
+    for usar_lock in (True, False):
+        hilo = HiloAmbiente(maximo=particulas, por_tick=particulas, usar_lock=usar_lock)
+        hilo.start()
+        time.sleep(0.2)  # Dejar que se llene
+        esperas = []
+        totales = []
+        for _ in range(frames):
+            t0 = time.perf_counter()
+            if usar_lock:
+                with LOCK_PARTICULAS:
+                    t1 = time.perf_counter()
+                    hilo.particulas.dibujar(destino)
+            else:
+                datos = hilo.fotos.leer()
+                t1 = time.perf_counter()
+                dibujar_circulos(destino, *datos)
+            t2 = time.perf_counter()
+            esperas.append((t1 - t0) * 1000)
+            totales.append((t2 - t0) * 1000)
+            time.sleep(1 / FPS / 2)  # Aproximar el ritmo de un frame real
+        hilo.activo = False
+        hilo.join()
+
+        modo = "LOCK    " if usar_lock else "SNAPSHOT"
+        for nombre, datos in (("espera", esperas), ("frame ", totales)):
+            datos.sort()
+            p50 = datos[len(datos) // 2]
+            p99 = datos[int(len(datos) * 0.99)]
+            print(f"{modo} {nombre} p50={p50:.3f} ms  p99={p99:.3f} ms  max={datos[-1]:.3f} ms")
+        print(f"{modo} hilo esperando lock={hilo.espera_lock * 1000:.1f} ms"
+              f"  reintentos lectura={hilo.fotos.reintentos}")
 
 if __name__ == "__main__":
-    juego = Juego()
+    if "--estres-ambiente" in sys.argv:
+        medir_contencion_ambiente()
+        sys.exit()
+
+    def argumento(opcion, defecto=None):
+        return sys.argv[sys.argv.index(opcion) + 1] if opcion in sys.argv else defecto
+
+    # python juego.py --perfil-csv frames.csv  -> guarda los tiempos por fase al salir
+    # python juego.py --grabar partida.json    -> guarda semilla y acciones al salir
+    # python juego.py --repetir partida.json --velocidad 4
+    repeticion = argumento("--repetir")
+    iniciar_aplicacion()
+    juego = Juego(perfil_csv=argumento("--perfil-csv"),
+                  escala_tiempo=float(argumento("--velocidad", 1.0)),
+                  semilla=int(argumento("--semilla")) if "--semilla" in sys.argv else None,
+                  repeticion=Grabacion.cargar(repeticion) if repeticion else None,
+                  ruta_grabacion=argumento("--grabar"))
     juego.run()
\ No newline at end of file
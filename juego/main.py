@@ -1,3 +1,4 @@
+import os
 import tkinter as tk
 import random
 
@@ -7,14 +8,16 @@ root.geometry("900x700")
 
 
 # ============================================================
-#   Cargar imágenes (RUTAS COMPLETAS)
+#   Cargar imágenes (rutas relativas a la carpeta juego/img)
 # ============================================================
-lux = tk.PhotoImage(file=r"C:/Users/Estudiante/Documents/Programacion Orientada a Objetos/juego/img/lux-emote.gif")
-yasuo = tk.PhotoImage(file=r"C:/Users/Estudiante/Documents/Programacion Orientada a Objetos/juego/img/yasuo.png")
-ezreal = tk.PhotoImage(file=r"C:/Users/Estudiante/Documents/Programacion Orientada a Objetos/juego/img/Ezreal.png")
-jinx = tk.PhotoImage(file=r"C:/Users/Estudiante/Documents/Programacion Orientada a Objetos/juego/img/jinx.png")
-poppy = tk.PhotoImage(file=r"C:/Users/Estudiante/Documents/Programacion Orientada a Objetos/juego/img/poppy.png")
-cait = tk.PhotoImage(file=r"C:/Users/Estudiante/Documents/Programacion Orientada a Objetos/juego/img/caytlin.png")
+DIR_IMG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "img")
+
+lux = tk.PhotoImage(file=os.path.join(DIR_IMG, "lux-emote.gif"))
+yasuo = tk.PhotoImage(file=os.path.join(DIR_IMG, "yasuo.png"))
+ezreal = tk.PhotoImage(file=os.path.join(DIR_IMG, "Ezreal.png"))
+jinx = tk.PhotoImage(file=os.path.join(DIR_IMG, "jinx.png"))
+poppy = tk.PhotoImage(file=os.path.join(DIR_IMG, "poppy.png"))
+cait = tk.PhotoImage(file=os.path.join(DIR_IMG, "caytlin.png"))
 
 
 personajes = [
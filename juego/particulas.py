@@ -0,0 +1,329 @@
+"""
+Motor de partículas "estructura de arreglos" (SoA) con NumPy.
+
+En lugar de un objeto (o un dict) por partícula, cada propiedad vive en un
+arreglo contiguo: posición, velocidad, radio, vida, color y alpha. Así la
+actualización es un puñado de operaciones vectorizadas y las partículas
+muertas se compactan en una sola pasada, sin list.remove().
+"""
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+import pygame
+
+# Generador por defecto (se puede pasar otro con semilla para reproducir)
+_RNG = np.random.default_rng()
+
+
+class SistemaParticulas:
+    """
+    Contenedor de partículas en arreglos NumPy.
+
+    Solo las primeras `n` filas de cada arreglo están vivas. Si se emiten
+    más partículas que la capacidad, los arreglos crecen al doble.
+    """
+    def __init__(self, capacidad=1024, limite_y=-np.inf):
+        self.n = 0
+        self.limite_y = limite_y  # Por encima de esta y la partícula muere
+        self._reservar(capacidad)
+
+    def _reservar(self, capacidad):
+        viejos = getattr(self, "pos", None)
+        n = self.n
+        self.capacidad = capacidad
+        nuevos = {
+            "pos": np.zeros((capacidad, 2), dtype=np.float32),
+            "vel": np.zeros((capacidad, 2), dtype=np.float32),
+            "radio": np.zeros(capacidad, dtype=np.float32),
+            "encoger": np.ones(capacidad, dtype=np.float32),    # Factor de radio por paso
+            "vida": np.zeros(capacidad, dtype=np.float32),      # Pasos restantes
+            "color": np.zeros((capacidad, 3), dtype=np.uint8),
+            "alpha": np.zeros(capacidad, dtype=np.float32),
+            "desvanecer": np.zeros(capacidad, dtype=np.float32),  # Alpha perdido por paso
+        }
+        for nombre, arreglo in nuevos.items():
+            if viejos is not None:
+                arreglo[:n] = getattr(self, nombre)[:n]
+            setattr(self, nombre, arreglo)
+
+    def emitir(self, cantidad, x, y, vx, vy, radio, vida, color,
+               alpha=255, encoger=1.0, desvanecer=0.0):
+        """
+        Agrega `cantidad` partículas. Cada argumento puede ser un escalar
+        (igual para todas) o un arreglo de longitud `cantidad`.
+        """
+        if cantidad <= 0:
+            return
+        fin = self.n + cantidad
+        if fin > self.capacidad:
+            self._reservar(max(fin, self.capacidad * 2))
+
+        s = slice(self.n, fin)
+        self.pos[s, 0] = x
+        self.pos[s, 1] = y
+        self.vel[s, 0] = vx
+        self.vel[s, 1] = vy
+        self.radio[s] = radio
+        self.vida[s] = vida
+        self.color[s] = color
+        self.alpha[s] = alpha
+        self.encoger[s] = encoger
+        self.desvanecer[s] = desvanecer
+        self.n = fin
+
+    def actualizar(self):
+        """Avanza un paso a todas las partículas y compacta las muertas."""
+        n = self.n
+        if n == 0:
+            return
+        self.pos[:n] += self.vel[:n]
+        self.radio[:n] *= self.encoger[:n]
+        self.vida[:n] -= 1
+        self.alpha[:n] -= self.desvanecer[:n]
+
+        vivas = (self.vida[:n] > 0) & (self.alpha[:n] > 0) & (self.pos[:n, 1] >= self.limite_y)
+        indices = np.flatnonzero(vivas)
+        k = len(indices)
+        if k == n:
+            return
+        # Compactación en una pasada: las vivas pasan al principio
+        for nombre in ("pos", "vel", "radio", "encoger", "vida", "color", "alpha", "desvanecer"):
+            arreglo = getattr(self, nombre)
+            arreglo[:k] = arreglo[indices]
+        self.n = k
+
+    def vaciar(self):
+        self.n = 0
+
+    def dibujar(self, surface):
+        """Dibuja las partículas vivas y devuelve los rects tocados."""
+        n = self.n
+        if n == 0:
+            return []
+        xs = self.pos[:n, 0].astype(np.int32).tolist()
+        ys = self.pos[:n, 1].astype(np.int32).tolist()
+        radios = self.radio[:n].astype(np.int32).tolist()
+        colores = self.color[:n].tolist()
+        return dibujar_circulos(surface, xs, ys, radios, colores)
+
+
+def dibujar_circulos(surface, xs, ys, radios, colores):
+    """Dibuja círculos sólidos a partir de listas paralelas; devuelve sus rects."""
+    circulo = pygame.draw.circle
+    return [circulo(surface, c, (x, y), r) for x, y, r, c in zip(xs, ys, radios, colores)]
+
+
+def emitir_chispas(sistema, x, y, color, cantidad=15, rng=None):
+    """Explosión de chispas de impacto (antes: 15 objetos Particula)."""
+    rng = rng or _RNG
+    sistema.emitir(
+        cantidad, x, y,
+        vx=rng.uniform(-4, 4, cantidad),
+        vy=rng.uniform(-4, 4, cantidad),
+        radio=rng.integers(3, 7, cantidad),
+        vida=rng.integers(20, 41, cantidad),
+        color=color,
+        encoger=0.9,  # Hacerse más pequeño
+    )
+
+
+def emitir_ambiente(sistema, cantidad, ancho, alto, rng=None):
+    """Luciérnagas de ambiente: flotan hacia arriba y se desvanecen."""
+    rng = rng or _RNG
+    color = np.empty((cantidad, 3), dtype=np.uint8)
+    color[:, 0] = rng.integers(100, 201, cantidad)
+    color[:, 1] = rng.integers(200, 256, cantidad)
+    color[:, 2] = 255
+    sistema.emitir(
+        cantidad,
+        x=rng.integers(0, ancho + 1, cantidad),
+        y=rng.integers(0, alto + 1, cantidad),
+        vx=rng.uniform(-0.5, 0.5, cantidad),
+        vy=rng.uniform(-1.5, -0.5, cantidad),  # Flotan hacia arriba
+        radio=rng.integers(1, 4, cantidad),
+        vida=np.inf,  # Mueren por alpha o al salir por arriba
+        color=color,
+        alpha=rng.integers(100, 256, cantidad),
+        desvanecer=1.0,
+    )
+
+
+# ============================================================
+# INSTANTÁNEAS SIN LOCK (TRIPLE BUFFER)
+# ============================================================
+class _Foto:
+    """Un buffer de la instantánea: copia de las partículas de un paso."""
+    def __init__(self, capacidad):
+        self.seq = 0  # Impar mientras el escritor lo está llenando
+        self.n = 0
+        self.pos = np.zeros((capacidad, 2), dtype=np.float32)
+        self.radio = np.zeros(capacidad, dtype=np.float32)
+        self.color = np.zeros((capacidad, 3), dtype=np.uint8)
+
+
+class FotosParticulas:
+    """
+    Publica frames completos de un SistemaParticulas para que otro hilo los
+    lea sin bloquear. Hay varios buffers en anillo: el escritor siempre
+    llena uno que no es el publicado y luego cambia la referencia
+    `publicado` (una asignación, atómica en CPython).
+
+    Un lector lento podría seguir mirando un buffer que el escritor ya está
+    reutilizando; para detectarlo cada buffer lleva un número de secuencia
+    (seqlock): si cambió durante la copia, el lector reintenta con el último
+    frame. Nunca se ve una lista a medio actualizar.
+    """
+    def __init__(self, buffers=3, capacidad=64):
+        self.buffers = [_Foto(capacidad) for _ in range(buffers)]
+        self.publicado = self.buffers[0]
+        self._siguiente = 1
+        self.reintentos = 0  # Lecturas que tuvieron que repetirse
+
+    def publicar(self, sistema):
+        """Copia el estado actual de `sistema` y lo publica (solo el escritor)."""
+        foto = self.buffers[self._siguiente]
+        self._siguiente = (self._siguiente + 1) % len(self.buffers)
+
+        n = sistema.n
+        foto.seq += 1  # Impar: escribiendo
+        if n > len(foto.radio):
+            nueva = _Foto(max(n, len(foto.radio) * 2))
+            nueva.seq = foto.seq
+            self.buffers[self.buffers.index(foto)] = nueva
+            foto = nueva
+        foto.pos[:n] = sistema.pos[:n]
+        foto.radio[:n] = sistema.radio[:n]
+        foto.color[:n] = sistema.color[:n]
+        foto.n = n
+        foto.seq += 1  # Par: completo
+
+        self.publicado = foto  # Intercambio atómico de la referencia
+
+    def leer(self):
+        """Devuelve (xs, ys, radios, colores) del último frame completo."""
+        while True:
+            foto = self.publicado
+            seq = foto.seq
+            if seq % 2 == 0:
+                # Copia rápida (vectorizada); la conversión a listas va después
+                n = foto.n
+                pos = foto.pos[:n].astype(np.int32)
+                radios = foto.radio[:n].astype(np.int32)
+                colores = foto.color[:n].copy()
+                if foto.seq == seq:
+                    return pos[:, 0].tolist(), pos[:, 1].tolist(), radios.tolist(), colores.tolist()
+            self.reintentos += 1
+
+    def dibujar(self, surface):
+        """Dibuja el último frame publicado y devuelve los rects tocados."""
+        return dibujar_circulos(surface, *self.leer())
+
+
+# ============================================================
+# ANILLO EN MEMORIA COMPARTIDA (AMBIENTE EN OTRO PROCESO)
+# ============================================================
+class AnilloCompartido:
+    """
+    Lo mismo que FotosParticulas, pero los buffers viven en un bloque de
+    multiprocessing.shared_memory: un proceso simulador escribe y el
+    renderizador lee vistas NumPy sobre el mismo bloque, sin colas ni
+    pickles. La capacidad es fija (no se puede realojar entre procesos).
+
+    Cabecera (int64): [publicado, seq_0, n_0, seq_1, n_1, ...]; el seqlock
+    de cada buffer funciona igual que en FotosParticulas.
+    """
+    def __init__(self, capacidad, buffers=3, nombre=None):
+        capacidad = -(-capacidad // 8) * 8  # Múltiplo de 8: arreglos alineados
+        self.capacidad = capacidad
+        self.num_buffers = buffers
+        self.propietario = nombre is None  # Quien lo crea es quien lo libera
+        por_buffer = capacidad * (8 + 4 + 3)  # pos + radio + color
+        tamaño = 8 * (1 + 2 * buffers) + por_buffer * buffers
+        self.shm = shared_memory.SharedMemory(name=nombre, create=self.propietario,
+                                              size=tamaño if self.propietario else 0)
+        self.nombre = self.shm.name
+
+        buf = self.shm.buf
+        self.cabecera = np.ndarray(1 + 2 * buffers, dtype=np.int64, buffer=buf)
+        if self.propietario:
+            self.cabecera[:] = 0
+        desplazamiento = self.cabecera.nbytes
+        self.pos, self.radio, self.color = [], [], []
+        for _ in range(buffers):
+            self.pos.append(np.ndarray((capacidad, 2), np.float32, buf, desplazamiento))
+            desplazamiento += capacidad * 8
+            self.radio.append(np.ndarray(capacidad, np.float32, buf, desplazamiento))
+            desplazamiento += capacidad * 4
+            self.color.append(np.ndarray((capacidad, 3), np.uint8, buf, desplazamiento))
+            desplazamiento += capacidad * 3
+        self._siguiente = 1
+        self.reintentos = 0
+
+    @property
+    def publicadas(self):
+        """Partículas del último frame publicado."""
+        return int(self.cabecera[2 + 2 * self.cabecera[0]])
+
+    def publicar(self, sistema):
+        """Copia `sistema` al siguiente buffer y lo publica (solo el escritor)."""
+        i = self._siguiente
+        self._siguiente = (i + 1) % self.num_buffers
+        n = min(sistema.n, self.capacidad)
+        cab = self.cabecera
+        cab[1 + 2 * i] += 1  # Impar: escribiendo
+        self.pos[i][:n] = sistema.pos[:n]
+        self.radio[i][:n] = sistema.radio[:n]
+        self.color[i][:n] = sistema.color[:n]
+        cab[2 + 2 * i] = n
+        cab[1 + 2 * i] += 1  # Par: completo
+        cab[0] = i
+
+    def leer(self):
+        """Devuelve (xs, ys, radios, colores) del último frame completo."""
+        cab = self.cabecera
+        while True:
+            i = int(cab[0])
+            seq = int(cab[1 + 2 * i])
+            if seq % 2 == 0:
+                n = int(cab[2 + 2 * i])
+                pos = self.pos[i][:n].astype(np.int32)
+                radios = self.radio[i][:n].astype(np.int32)
+                colores = self.color[i][:n].copy()
+                if cab[1 + 2 * i] == seq:
+                    return pos[:, 0].tolist(), pos[:, 1].tolist(), radios.tolist(), colores.tolist()
+            self.reintentos += 1
+
+    def cerrar(self):
+        """Suelta las vistas y el bloque; el propietario además lo borra del sistema."""
+        if self.shm is None:
+            return
+        # Las vistas NumPy tienen que desaparecer antes de cerrar el buffer
+        self.cabecera = self.pos = self.radio = self.color = None
+        self.shm.close()
+        if self.propietario:
+            self.shm.unlink()
+        self.shm = None
+
+
+def simular_ambiente_en_proceso(nombre, capacidad, buffers, ancho, alto,
+                                maximo, por_tick, pausa, parar):
+    """
+    Bucle del proceso de ambiente: el mismo paso que HiloAmbiente, publicado
+    en el AnilloCompartido `nombre`. Termina cuando se activa el Event
+    `parar` o si el proceso padre desaparece.
+    """
+    anillo = AnilloCompartido(capacidad, buffers, nombre=nombre)
+    sistema = SistemaParticulas(capacidad=max(64, maximo), limite_y=0)
+    padre = os.getppid()
+    try:
+        while not parar.is_set() and os.getppid() == padre:
+            faltan = max(0, min(por_tick, maximo - sistema.n))
+            emitir_ambiente(sistema, faltan, ancho, alto)
+            sistema.actualizar()
+            anillo.publicar(sistema)
+            parar.wait(pausa)  # Como sleep, pero despierta al pedir parada
+    except KeyboardInterrupt:
+        pass  # Ctrl+C llega a todo el grupo de procesos; el padre limpia
+    finally:
+        anillo.cerrar()
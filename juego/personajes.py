@@ -0,0 +1,131 @@
+"""
+Modelo de los campeones: vida, daño, habilidades y animación de ataque.
+
+No importa pygame: se puede usar (y probar) sin pantalla. La imagen de
+cada campeón la asigna juego.py cuando arranca la parte gráfica.
+"""
+import random
+
+import combate
+
+ANCHO_ESCENARIO = 1080  # Ancho de la ventana de juego.py (decide hacia dónde se ataca)
+TAMAÑO_RETRATO = 150
+
+
+class Personaje:
+    # Generador aleatorio de las tiradas de combate. Se puede reemplazar por
+    # un random.Random(semilla) para reproducir un duelo.
+    rng = random
+
+    def __init__(self, nombre, color_tema, max_vida, daño_base):
+        self.nombre = nombre
+        self.color_tema = color_tema  # Color del placeholder si falta la imagen
+        self.image = None  # Superficie de pygame; la pone juego.py
+        self.max_vida = max_vida
+        self.vida = max_vida
+        self.daño_base = daño_base
+        self.cooldowns = {}
+        
+        # Animación y Posición
+        self.origen_x = 0
+        self.origen_y = 0
+        self.x = 0
+        self.y = 0
+        self.x_anterior = 0  # x del paso de simulación previo (para interpolar)
+        self.anim_timer = 0
+        self.estado_anim = "IDLE" # IDLE, ATAQUE, REGRESO
+
+    def set_pos(self, x, y):
+        self.origen_x = x
+        self.origen_y = y
+        self.x = x
+        self.y = y
+        self.x_anterior = x
+
+    def update(self):
+        # Un paso fijo de simulación (PASO_SIM): el easing es el mismo a cualquier FPS
+        self.x_anterior = self.x
+        # Interpolación simple para animaciones
+        if self.estado_anim == "ATAQUE":
+            # Moverse hacia adelante
+            direccion = 1 if self.origen_x < ANCHO_ESCENARIO/2 else -1
+            objetivo = self.origen_x + (200 * direccion)
+            self.x += (objetivo - self.x) * 0.2
+            if abs(self.x - objetivo) < 5:
+                self.estado_anim = "REGRESO"
+        elif self.estado_anim == "REGRESO":
+            self.x += (self.origen_x - self.x) * 0.1
+            if abs(self.x - self.origen_x) < 2:
+                self.x = self.origen_x
+                self.estado_anim = "IDLE"
+
+    @property
+    def rect(self):
+        """(x, y, ancho, alto) del retrato en pantalla."""
+        return (int(self.x), int(self.y), TAMAÑO_RETRATO, TAMAÑO_RETRATO)
+
+    def posicion_dibujo(self, interp):
+        """Posición entre el paso anterior y el actual (0 <= interp < 1)."""
+        return (self.x_anterior + (self.x - self.x_anterior) * interp, self.y)
+
+    def atacar(self, objetivo):
+        self.estado_anim = "ATAQUE"
+        # Daño base +-20% y crítico genérico (reglas en combate.py)
+        daño, es_critico = combate.tirar_daño(self.daño_base, self.rng)
+        texto_especial = ""
+
+        # Lógica polimórfica de ataque
+        daño, texto_especial = self.habilidad_especial_ataque(daño)
+        
+        # Lógica polimórfica de defensa
+        daño_final, razon_mitigacion = objetivo.defender(daño)
+        
+        objetivo.recibir_daño(daño_final)
+        
+        # Retornamos todo para que la UI lo muestre
+        return daño_final, es_critico, texto_especial, razon_mitigacion
+
+    def recibir_daño(self, cantidad):
+        self.vida = max(0, self.vida - cantidad)
+
+    def defender(self, daño):
+        """Retorna (daño_final, texto_explicativo)"""
+        return self.habilidad_especial_defensa(daño)
+
+    # Métodos para sobreescribir
+    def habilidad_especial_ataque(self, daño): 
+        return daño, ""
+    
+    def habilidad_especial_defensa(self, daño): 
+        return daño, ""
+
+class Jinx(Personaje):
+    def habilidad_especial_ataque(self, daño):
+        return combate.ataque_jinx(daño, self.rng)
+
+class Yasuo(Personaje):
+    def habilidad_especial_defensa(self, daño):
+        # Yasuo tiene probabilidad de bloquear TODO el daño
+        return combate.defensa_yasuo(daño, self.rng)
+
+class Lux(Personaje):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.escudo_cd = 0
+
+    def habilidad_especial_defensa(self, daño):
+        daño, texto, self.escudo_cd = combate.defensa_lux(daño, self.escudo_cd)
+        return daño, texto
+
+class Ezreal(Personaje):
+    def habilidad_especial_ataque(self, daño):
+        return combate.ataque_ezreal(daño, self.rng)
+
+class Poppy(Personaje):
+    def habilidad_especial_defensa(self, daño):
+        # Poppy siempre reduce daño un poco por ser tanque
+        return combate.defensa_poppy(daño, self.rng)
+
+class Caitlyn(Personaje):
+    def habilidad_especial_ataque(self, daño):
+        return combate.ataque_caitlyn(daño, self.rng)
@@ -0,0 +1,129 @@
+"""
+Gestor de recursos gráficos del juego.
+
+- Resuelve las imágenes de `juego/img/` relativo a este archivo (ya no
+  depende de rutas absolutas de una máquina concreta).
+- Guarda en caché cada variante ya escalada y/o espejada, así que ningún
+  frame vuelve a llamar a pygame.transform.
+- Opcionalmente "hornea" todos los campeones en un único atlas PNG con un
+  índice JSON: al arrancar se decodifica un solo archivo.
+
+Para generar el atlas:
+    python recursos.py --hornear
+"""
+import json
+import os
+
+import pygame
+
+DIR_IMG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "img")
+
+ARCHIVOS_IMAGENES = {
+    "Lux": "lux.png",
+    "Yasuo": "yasuo.png",
+    "Ezreal": "Ezreal.png",
+    "Jinx": "jinx.png",
+    "Poppy": "poppy.png",
+    "Caitlyn": "caytlin.png",
+}
+
+TAMAÑO_RETRATO = (150, 150)
+RUTA_ATLAS = os.path.join(DIR_IMG, "atlas.png")
+RUTA_INDICE_ATLAS = os.path.join(DIR_IMG, "atlas.json")
+
+
+def ruta_imagen(nombre):
+    """Ruta absoluta de la imagen de un campeón (o "" si no tiene)."""
+    archivo = ARCHIVOS_IMAGENES.get(nombre)
+    return os.path.join(DIR_IMG, archivo) if archivo else ""
+
+
+class GestorRecursos:
+    """
+    Caché de superficies por (nombre, tamaño, espejo).
+
+    La primera petición de un campeón decodifica su imagen (o la saca del
+    atlas si existe); las variantes escaladas o espejadas se calculan una
+    sola vez y se reutilizan.
+    """
+    def __init__(self, usar_atlas=True):
+        self.usar_atlas = usar_atlas
+        self.variantes = {}  # (nombre, tamaño, espejo) -> Surface
+        self._atlas = None   # nombre -> Surface (subsuperficies del atlas)
+        self.decodificaciones = 0  # Archivos de imagen leídos del disco
+
+    def _cargar_atlas(self):
+        if self._atlas is not None:
+            return self._atlas
+        self._atlas = {}
+        if not (self.usar_atlas and os.path.exists(RUTA_ATLAS) and os.path.exists(RUTA_INDICE_ATLAS)):
+            return self._atlas
+        # Un atlas más viejo que alguna imagen fuente se ignora
+        fecha_atlas = os.path.getmtime(RUTA_ATLAS)
+        for nombre in ARCHIVOS_IMAGENES:
+            ruta = ruta_imagen(nombre)
+            if os.path.exists(ruta) and os.path.getmtime(ruta) > fecha_atlas:
+                return self._atlas
+        try:
+            with open(RUTA_INDICE_ATLAS, encoding="utf-8") as f:
+                indice = json.load(f)
+            hoja = pygame.image.load(RUTA_ATLAS).convert_alpha()
+            self.decodificaciones += 1
+        except (OSError, ValueError, pygame.error):
+            return self._atlas
+        for nombre, rect in indice.items():
+            self._atlas[nombre] = hoja.subsurface(pygame.Rect(rect))
+        return self._atlas
+
+    def _original(self, nombre, tamaño):
+        """Imagen base escalada a `tamaño`. Lanza pygame.error/FileNotFoundError si no existe."""
+        atlas = self._cargar_atlas()
+        if nombre in atlas and atlas[nombre].get_size() == tamaño:
+            return atlas[nombre]
+        img = pygame.image.load(ruta_imagen(nombre)).convert_alpha()
+        self.decodificaciones += 1
+        return pygame.transform.scale(img, tamaño)  # Estandarizar tamaño
+
+    def imagen(self, nombre, tamaño=TAMAÑO_RETRATO, espejo=False):
+        """Superficie de `nombre` al tamaño pedido, espejada en horizontal si `espejo`."""
+        clave = (nombre, tamaño, espejo)
+        surf = self.variantes.get(clave)
+        if surf is None:
+            if espejo:
+                surf = pygame.transform.flip(self.imagen(nombre, tamaño), True, False)
+            else:
+                surf = self._original(nombre, tamaño)
+            self.variantes[clave] = surf
+        return surf
+
+    def registrar(self, nombre, surf, tamaño=TAMAÑO_RETRATO):
+        """Guarda una superficie ya hecha (p. ej. un placeholder) como imagen de `nombre`."""
+        self.variantes[(nombre, tamaño, False)] = surf
+        self.variantes.pop((nombre, tamaño, True), None)
+
+
+def hornear_atlas(tamaño=TAMAÑO_RETRATO, columnas=3):
+    """Escala todos los campeones y los guarda en un solo PNG + índice JSON."""
+    nombres = [n for n in ARCHIVOS_IMAGENES if os.path.exists(ruta_imagen(n))]
+    filas = (len(nombres) + columnas - 1) // columnas
+    hoja = pygame.Surface((tamaño[0] * columnas, tamaño[1] * filas), pygame.SRCALPHA)
+    indice = {}
+    for i, nombre in enumerate(nombres):
+        x = (i % columnas) * tamaño[0]
+        y = (i // columnas) * tamaño[1]
+        img = pygame.transform.scale(pygame.image.load(ruta_imagen(nombre)), tamaño)
+        hoja.blit(img, (x, y))
+        indice[nombre] = [x, y, tamaño[0], tamaño[1]]
+    pygame.image.save(hoja, RUTA_ATLAS)
+    with open(RUTA_INDICE_ATLAS, "w", encoding="utf-8") as f:
+        json.dump(indice, f, indent=2)
+    print(f"[recursos] Atlas con {len(indice)} campeones guardado en {RUTA_ATLAS}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if "--hornear" in sys.argv:
+        hornear_atlas()
+    else:
+        print(__doc__)
@@ -0,0 +1,263 @@
+"""
+Grabación y reproducción determinista de partidas.
+
+Una grabación es la semilla de las tiradas de combate, las estadísticas
+del roster en ese momento y la lista de acciones del jugador que tuvieron
+efecto (seleccionar_personaje, accion_atacar, reset_game), cada una con el
+paso de simulación en que ocurrió. Con eso se puede:
+
+- reproducirla en el juego con ventana, a cualquier velocidad
+  (python juego.py --repetir partida.json --velocidad 4);
+- reproducirla sin pantalla y sin pygame a máxima velocidad
+  (vidas_de_repeticion), que da la misma secuencia de vidas;
+- comprobar miles de grabaciones de golpe:
+  python repeticion.py carpeta_o_archivo.jsonl
+
+Este módulo no importa pygame (solo --verificar carga juego.py).
+Pruebas: python -m pytest tests/test_repeticion.py
+"""
+import json
+import os
+import random
+import sys
+import time
+
+import combate
+
+VERSION = 1
+
+# Códigos compactos de las acciones en el archivo
+CODIGOS = {"seleccionar_personaje": "s", "accion_atacar": "a", "reset_game": "r"}
+ACCIONES = {codigo: accion for accion, codigo in CODIGOS.items()}
+
+
+class Grabacion:
+    """
+    Semilla + roster + acciones (paso, accion, argumento) de una partida.
+    `vidas` guarda (vida1, vida2) tras cada ataque: no hace falta para
+    reproducir, pero permite comprobar que la reproducción coincide.
+    """
+    def __init__(self, semilla, roster, acciones=None, vidas=None):
+        self.semilla = semilla
+        self.roster = [tuple(r) for r in roster]  # [(nombre, max_vida, daño_base), ...]
+        self.acciones = acciones if acciones is not None else []
+        self.vidas = vidas if vidas is not None else []
+
+    def registrar(self, paso, accion, argumento=None):
+        self.acciones.append((paso, accion, argumento))
+
+    def registrar_vidas(self, vida1, vida2):
+        self.vidas.append((vida1, vida2))
+
+    def a_dict(self):
+        acciones = []
+        for paso, accion, argumento in self.acciones:
+            entrada = [paso, CODIGOS[accion]]
+            if argumento is not None:
+                entrada.append(argumento)
+            acciones.append(entrada)
+        return {"version": VERSION, "semilla": self.semilla, "roster": self.roster,
+                "acciones": acciones, "vidas": self.vidas}
+
+    @classmethod
+    def de_dict(cls, datos):
+        if datos.get("version") != VERSION:
+            raise ValueError(f"Versión de grabación no soportada: {datos.get('version')}")
+        acciones = [(e[0], ACCIONES[e[1]], e[2] if len(e) > 2 else None)
+                    for e in datos["acciones"]]
+        vidas = [tuple(v) for v in datos.get("vidas", [])]
+        return cls(datos["semilla"], datos["roster"], acciones, vidas)
+
+    def guardar(self, ruta):
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(self.a_dict(), f, separators=(",", ":"))
+
+    @classmethod
+    def cargar(cls, ruta):
+        with open(ruta, encoding="utf-8") as f:
+            return cls.de_dict(json.load(f))
+
+
+def cargar_grabaciones(ruta):
+    """Grabaciones de una carpeta (*.json), de un .jsonl (una por línea) o de un .json."""
+    if os.path.isdir(ruta):
+        for nombre in sorted(os.listdir(ruta)):
+            if nombre.endswith(".json"):
+                yield Grabacion.cargar(os.path.join(ruta, nombre))
+    elif ruta.endswith(".jsonl"):
+        with open(ruta, encoding="utf-8") as f:
+            for linea in f:
+                if linea.strip():
+                    yield Grabacion.de_dict(json.loads(linea))
+    else:
+        yield Grabacion.cargar(ruta)
+
+
+# ============================================================
+# REPRODUCCIÓN EN EL JUEGO (con o sin ventana)
+# ============================================================
+class Reproductor:
+    """
+    Aplica las acciones de una grabación a un Juego en el paso exacto en
+    que se grabaron. Juego.paso_simulacion llama a aplicar() antes de
+    avanzar, así que funciona igual dibujando que con Juego.simular.
+    """
+    def __init__(self, grabacion):
+        self.grabacion = grabacion
+        self.siguiente = 0
+
+    @property
+    def terminado(self):
+        return self.siguiente >= len(self.grabacion.acciones)
+
+    def aplicar(self, juego):
+        acciones = self.grabacion.acciones
+        while self.siguiente < len(acciones) and acciones[self.siguiente][0] <= juego.pasos_simulados:
+            _, accion, argumento = acciones[self.siguiente]
+            self.siguiente += 1
+            if argumento is None:
+                getattr(juego, accion)()
+            else:
+                getattr(juego, accion)(argumento)
+
+
+# ============================================================
+# REPRODUCCIÓN SIN PANTALLA (MÁXIMA VELOCIDAD)
+# ============================================================
+def vidas_de_repeticion(grabacion):
+    """
+    Re-ejecuta solo la lógica de combate de una grabación y devuelve la
+    secuencia (vida1, vida2) tras cada ataque. Como solo se graban acciones
+    que tuvieron efecto, no hace falta simular animaciones ni pasos.
+    """
+    rng = random.Random(grabacion.semilla)
+    roster = grabacion.roster
+    nombres = [None, None]
+    vida = [0, 0]
+    base = [0, 0]
+    escudo = [0, 0]  # escudo_cd de Lux (cada clon empieza en 0)
+    elegidos = 0
+    turno = 0
+    secuencia = []
+    for _, accion, argumento in grabacion.acciones:
+        if accion == "seleccionar_personaje":
+            if elegidos < 2:
+                nombres[elegidos], vida[elegidos], base[elegidos] = roster[argumento]
+                escudo[elegidos] = 0
+                elegidos += 1
+        elif accion == "accion_atacar":
+            at, de = turno, 1 - turno
+            daño, escudo[de] = combate.resolver_golpe(nombres[at], base[at], nombres[de],
+                                                      escudo[de], rng)
+            vida[de] = max(0, vida[de] - daño)
+            secuencia.append((vida[0], vida[1]))
+            turno = de
+        elif accion == "reset_game":
+            elegidos = 0
+            turno = 0
+    return secuencia
+
+
+def comprobar_grabaciones(grabaciones):
+    """Reproduce cada grabación sin pantalla; retorna (total, lista de índices que no coinciden)."""
+    total = 0
+    distintas = []
+    for i, grabacion in enumerate(grabaciones):
+        total += 1
+        if vidas_de_repeticion(grabacion) != grabacion.vidas:
+            distintas.append(i)
+    return total, distintas
+
+
+# ============================================================
+# VERIFICACIÓN CONTRA EL JUEGO REAL
+# ============================================================
+def grabar_partidas_aleatorias(partidas, semilla=0):
+    """
+    Juega `partidas` partidas con el Juego real (driver de vídeo "dummy")
+    eligiendo acciones al azar y pasos de espera variables; retorna sus
+    grabaciones.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    import juego as J
+
+    azar = random.Random(semilla)
+    grabaciones = []
+    for _ in range(partidas):
+        partida = J.Juego(fps_render=0, semilla=azar.getrandbits(32))
+        for _ in range(azar.randint(1, 3)):  # Varias peleas con reinicios entre medias
+            partida.seleccionar_personaje(azar.randrange(len(partida.roster)))
+            partida.simular(azar.randint(0, 5))
+            partida.seleccionar_personaje(azar.randrange(len(partida.roster)))
+            while partida.escena == "PELEA":
+                partida.accion_atacar()  # Se ignora (y no se graba) si hay animación
+                partida.simular(azar.randint(1, 40))
+            partida.simular(azar.randint(0, 30))
+            partida.reset_game()
+        grabaciones.append(partida.grabacion)
+    return grabaciones
+
+
+def vidas_en_el_juego(grabacion):
+    """Reproduce la grabación en el Juego real (sin ventana) y retorna las vidas que registra."""
+    import juego as J
+
+    partida = J.Juego(fps_render=0, repeticion=grabacion)
+    while not partida.repeticion.terminado:
+        partida.simular(1)
+    return partida.grabacion.vidas
+
+
+def verificar_repeticiones(partidas=100, semilla=0):
+    """
+    Graba partidas con el juego real y comprueba que tanto el Juego con un
+    Reproductor como vidas_de_repeticion dan exactamente las mismas vidas.
+    Lanza AssertionError si alguna difiere; si no, retorna las grabaciones.
+    (Las pruebas de tests/test_repeticion.py hacen la misma comprobación.)
+    """
+    grabaciones = grabar_partidas_aleatorias(partidas, semilla)
+    for i, grabacion in enumerate(grabaciones):
+        # Pasar por el formato de archivo para probarlo también
+        grabacion = Grabacion.de_dict(json.loads(json.dumps(grabacion.a_dict())))
+        rapida = vidas_de_repeticion(grabacion)
+        if rapida != grabacion.vidas:
+            raise AssertionError(f"Partida {i}: sin pantalla {rapida} != grabada {grabacion.vidas}")
+        en_juego = vidas_en_el_juego(grabacion)
+        if en_juego != grabacion.vidas:
+            raise AssertionError(f"Partida {i}: Juego {en_juego} != {grabacion.vidas}")
+    return grabaciones
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Reproducir grabaciones de partidas sin pantalla")
+    parser.add_argument("rutas", nargs="*", help="archivos .json/.jsonl o carpetas")
+    parser.add_argument("--verificar", type=int, metavar="N", nargs="?", const=100,
+                        help="grabar N partidas con el juego real y comprobar que se reproducen igual")
+    parser.add_argument("--generar", metavar="ARCHIVO.jsonl",
+                        help="con --verificar, guardar también las grabaciones")
+    args = parser.parse_args()
+
+    if args.verificar:
+        try:
+            grabaciones = verificar_repeticiones(args.verificar)
+        except AssertionError as ex:
+            print("FALLO:", ex)
+            sys.exit(1)
+        print(f"OK: {args.verificar} partidas se reproducen con las mismas vidas")
+        if args.generar:
+            with open(args.generar, "w", encoding="utf-8") as f:
+                for grabacion in grabaciones:
+                    f.write(json.dumps(grabacion.a_dict(), separators=(",", ":")) + "\n")
+
+    fallos = 0
+    for ruta in args.rutas:
+        t0 = time.perf_counter()
+        total, distintas = comprobar_grabaciones(cargar_grabaciones(ruta))
+        dt = time.perf_counter() - t0
+        print(f"{ruta}: {total} grabaciones en {dt:.2f} s ({total / dt:,.0f}/s),"
+              f" {len(distintas)} no coinciden")
+        fallos += len(distintas)
+    sys.exit(1 if fallos else 0)
@@ -0,0 +1,40 @@
+"""simular_duelo debe reproducir tirada a tirada el camino de Personaje.atacar."""
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import combate  # noqa: E402
+from combate import ESTADISTICAS  # noqa: E402
+
+DUELOS = 2000
+CRUCES = [(i * 10 + j, a, b) for i, a in enumerate(ESTADISTICAS) for j, b in enumerate(ESTADISTICAS)]
+
+
+def jugar(funcion, n1, n2, semilla, estadisticas=ESTADISTICAS, duelos=DUELOS):
+    rng = random.Random(semilla)
+    return [funcion(n1, n2, rng, estadisticas) for _ in range(duelos)]
+
+
+@pytest.mark.parametrize("semilla, n1, n2", CRUCES, ids=[f"{a}-{b}" for _, a, b in CRUCES])
+def test_igual_que_la_referencia(semilla, n1, n2):
+    assert (jugar(combate.simular_duelo, n1, n2, semilla)
+            == jugar(combate.simular_duelo_referencia, n1, n2, semilla))
+
+
+def test_estadisticas_distintas_no_reutilizan_perfiles():
+    """balance.py prueba muchas estadísticas: cada combinación debe usar las suyas."""
+    for daño in (10, 18, 26):
+        estadisticas = dict(ESTADISTICAS, Jinx=(ESTADISTICAS["Jinx"][0], daño))
+        assert (jugar(combate.simular_duelo, "Jinx", "Lux", daño, estadisticas, duelos=300)
+                == jugar(combate.simular_duelo_referencia, "Jinx", "Lux", daño, estadisticas, duelos=300))
+
+
+def test_reproducible_con_semilla():
+    assert combate.simular_duelos("Poppy", "Yasuo", 500, semilla=3) == \
+        combate.simular_duelos("Poppy", "Yasuo", 500, semilla=3)
+    resumen = combate.resumir(combate.simular_duelos("Poppy", "Yasuo", 500, semilla=3))
+    assert resumen["duelos"] == 500 and 0 < resumen["victorias_j1"] < 1
@@ -0,0 +1,40 @@
+"""La solución exacta (DP) debe concordar con Monte Carlo en todos los cruces."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import combate_exacto  # noqa: E402
+from combate import ESTADISTICAS  # noqa: E402
+
+DUELOS = 200_000
+Z_MAX = 4.5  # 72 comparaciones con semillas fijas
+CRUCES = [(i * 6 + j, a, b) for i, a in enumerate(ESTADISTICAS) for j, b in enumerate(ESTADISTICAS)]
+
+
+@pytest.fixture(scope="module")
+def exacto():
+    return combate_exacto.SolucionadorExacto().matriz()
+
+
+@pytest.mark.parametrize("semilla, a, b", CRUCES, ids=[f"{a}-{b}" for _, a, b in CRUCES])
+def test_concuerda_con_monte_carlo(exacto, semilla, a, b):
+    p, turnos = exacto[a, b]
+    z_p, z_t, detalle = combate_exacto.comparar_con_monte_carlo(a, b, p, turnos, DUELOS, semilla)
+    assert z_p < Z_MAX and z_t < Z_MAX, detalle
+
+
+def test_detecta_una_probabilidad_equivocada(exacto):
+    p, turnos = exacto["Jinx", "Poppy"]
+    z_p, _, detalle = combate_exacto.comparar_con_monte_carlo("Jinx", "Poppy", p - 0.01, turnos, DUELOS)
+    assert z_p > Z_MAX, detalle
+
+
+def test_cache_responde_vidas_menores_sin_recalcular():
+    solucionador = combate_exacto.SolucionadorExacto()
+    p, _ = solucionador.consultar("Lux", "Yasuo")
+    assert 0 < p < 1 and solucionador.resueltos == 1
+    solucionador.consultar("Lux", "Yasuo", vida1=50, vida2=60, turno=2, escudo1=2)
+    assert solucionador.resueltos == 1
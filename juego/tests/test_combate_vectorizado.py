@@ -0,0 +1,42 @@
+"""El motor por lotes debe concordar con el camino escalar (Personaje.atacar)."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import combate_vectorizado  # noqa: E402
+from combate import ESTADISTICAS  # noqa: E402
+
+DUELOS = 20000
+Z_MAX = 4.5  # 72 comparaciones: con semillas fijas, nunca se pasa por azar
+CRUCES = [(i * 10 + j, a, b) for i, a in enumerate(ESTADISTICAS) for j, b in enumerate(ESTADISTICAS)]
+
+
+@pytest.mark.parametrize("semilla, n1, n2", CRUCES, ids=[f"{a}-{b}" for _, a, b in CRUCES])
+def test_concordancia_con_el_camino_escalar(semilla, n1, n2):
+    z_victoria, z_turnos, detalle = combate_vectorizado.concordancia_cruce(n1, n2, DUELOS, semilla)
+    assert z_victoria < Z_MAX and z_turnos < Z_MAX, detalle
+
+
+def test_detecta_reglas_distintas():
+    """Con dos puntos más de daño para Jinx en el lote, la diferencia debe saltar."""
+    alteradas = dict(ESTADISTICAS, Jinx=(ESTADISTICAS["Jinx"][0], ESTADISTICAS["Jinx"][1] + 2))
+    z_victoria, z_turnos, detalle = combate_vectorizado.concordancia_cruce(
+        "Jinx", "Poppy", DUELOS, 0, estadisticas=alteradas)
+    assert max(z_victoria, z_turnos) > Z_MAX, detalle
+
+
+def test_lote_reproducible_con_semilla():
+    a = combate_vectorizado.simular_lote("Yasuo", "Caitlyn", 5000, semilla=7)
+    b = combate_vectorizado.simular_lote("Yasuo", "Caitlyn", 5000, semilla=7)
+    assert (a["victorias"] == b["victorias"]).all() and (a["turnos"] == b["turnos"]).all()
+    assert a["victorias"].sum() == 5000
+
+
+@pytest.mark.parametrize("n", [0, -3])
+def test_lote_vacio(n):
+    r = combate_vectorizado.simular_lote("Lux", "Jinx", n, semilla=1)
+    assert r["duelos"] == 0 and r["tasa_victoria_j1"] == 0.0 and r["turnos_medios"] == 0.0
+    assert r["victorias"].sum() == 0 and r["daño"].sum() == 0
@@ -0,0 +1,54 @@
+"""Las grabaciones de partidas reales deben reproducirse con las mismas vidas."""
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import repeticion  # noqa: E402
+from repeticion import Grabacion  # noqa: E402
+
+PARTIDAS = 5
+SEMILLAS = [0, 1, 2]
+
+
+@pytest.fixture(scope="module", params=SEMILLAS, ids=[f"semilla{s}" for s in SEMILLAS])
+def grabaciones(request):
+    return repeticion.grabar_partidas_aleatorias(PARTIDAS, semilla=request.param)
+
+
+def test_hay_ataques_grabados(grabaciones):
+    assert len(grabaciones) == PARTIDAS
+    assert any(g.vidas for g in grabaciones)  # Si no, las demás pruebas no comprueban nada
+
+
+def test_sin_pantalla_reproduce_las_vidas(grabaciones):
+    for i, grabacion in enumerate(grabaciones):
+        assert repeticion.vidas_de_repeticion(grabacion) == grabacion.vidas, f"Partida {i}"
+
+
+def test_el_juego_reproduce_las_vidas(grabaciones):
+    for i, grabacion in enumerate(grabaciones):
+        assert repeticion.vidas_en_el_juego(grabacion) == grabacion.vidas, f"Partida {i}"
+
+
+def test_archivo_jsonl_ida_y_vuelta(grabaciones, tmp_path):
+    ruta = tmp_path / "partidas.jsonl"
+    ruta.write_text("".join(json.dumps(g.a_dict()) + "\n" for g in grabaciones), encoding="utf-8")
+    leidas = list(repeticion.cargar_grabaciones(str(ruta)))
+    assert [g.a_dict() for g in leidas] == [g.a_dict() for g in grabaciones]
+    assert repeticion.comprobar_grabaciones(leidas) == (PARTIDAS, [])
+
+
+def test_detecta_grabacion_alterada(grabaciones):
+    grabacion = next(g for g in grabaciones if g.vidas)
+    alterada = Grabacion(grabacion.semilla, grabacion.roster, grabacion.acciones,
+                         [(v1 + 1, v2) for v1, v2 in grabacion.vidas])
+    assert repeticion.comprobar_grabaciones([grabacion, alterada]) == (2, [1])
+
+
+def test_version_desconocida():
+    with pytest.raises(ValueError):
+        Grabacion.de_dict({"version": repeticion.VERSION + 1, "semilla": 0, "roster": [], "acciones": []})
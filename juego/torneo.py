@@ -0,0 +1,280 @@
+"""
+Torneo todos contra todos entre los campeones del roster, sin pantalla.
+
+Cada cruce ordenado (A empieza contra B, B empieza contra A) se parte en
+tandas de duelos que se reparten entre procesos (ProcessPoolExecutor).
+Cada tanda tiene su propio flujo aleatorio derivado de la semilla del
+torneo (numpy.random.SeedSequence.spawn), así que el resultado es el mismo
+con 1 o con 32 procesos. Los procesos solo devuelven contadores, y el
+proceso principal los va acumulando a medida que llegan.
+
+Al final se calculan:
+    - tasa de victoria de cada campeón contra cada otro (con IC de Wilson);
+    - ratings Elo (máxima verosimilitud de Bradley-Terry, escala Elo);
+    - ratings Glicko-1, un periodo de rating por ronda del torneo.
+
+Uso:
+    python torneo.py --partidas 1000000 --procesos 8 --semilla 1
+    python torneo.py --escalado        # duelos/s con 1, 2, 4... procesos
+"""
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import combate
+import combate_vectorizado
+
+Z_95 = 1.959964
+ELO_INICIAL = 1500.0
+RD_INICIAL = 350.0  # Glicko: desviación del rating al empezar
+
+
+# ============================================================
+# TRABAJO DE UN PROCESO
+# ============================================================
+def jugar_tanda(nombre1, nombre2, partidas, semilla, motor="lotes", estadisticas=combate.ESTADISTICAS):
+    """Juega `partidas` duelos nombre1 (empieza) vs nombre2. Retorna (v1, v2, empates, turnos)."""
+    if motor == "lotes":
+        r = combate_vectorizado.simular_lote(nombre1, nombre2, partidas, semilla, estadisticas)
+        empates, v1, v2 = (int(x) for x in r["victorias"])
+        return v1, v2, empates, r["turnos_medios"] * partidas
+    rng = random.Random(semilla)
+    victorias = [0, 0, 0]
+    turnos = 0
+    for _ in range(partidas):
+        duelo = combate.simular_duelo(nombre1, nombre2, rng, estadisticas)
+        victorias[duelo.ganador] += 1
+        turnos += duelo.turnos
+    return victorias[1], victorias[2], victorias[0], turnos
+
+
+# ============================================================
+# RATINGS
+# ============================================================
+def elo_bradley_terry(puntos, partidas, iteraciones=1000, tolerancia=1e-10):
+    """
+    Ratings Elo de máxima verosimilitud a partir de los puntos acumulados
+    (victoria = 1, empate = 0.5) de cada campeón contra cada otro.
+    Algoritmo MM de Hunter; la media queda en ELO_INICIAL.
+    """
+    n = len(puntos)
+    fuerza = np.ones(n)
+    ganados = puntos.sum(axis=1)
+    for _ in range(iteraciones):
+        suma = fuerza[:, None] + fuerza[None, :]
+        denominador = (partidas / suma).sum(axis=1)
+        nueva = ganados / denominador
+        nueva /= np.exp(np.log(nueva).mean())
+        if np.abs(nueva - fuerza).max() < tolerancia:
+            fuerza = nueva
+            break
+        fuerza = nueva
+    elo = 400 * np.log10(fuerza)
+    return elo - elo.mean() + ELO_INICIAL
+
+
+class Glicko:
+    """Glicko-1 con todos los resultados de un periodo aplicados a la vez."""
+    Q = math.log(10) / 400
+
+    def __init__(self, n, inflacion=0.0):
+        self.r = np.full(n, ELO_INICIAL)
+        self.rd = np.full(n, RD_INICIAL)
+        self.inflacion = inflacion  # Constante c: cuánto crece la RD entre periodos
+
+    def _g(self, rd):
+        return 1 / np.sqrt(1 + 3 * self.Q ** 2 * rd ** 2 / math.pi ** 2)
+
+    def periodo(self, puntos, partidas):
+        """puntos[i][j]: puntos de i contra j en este periodo; partidas[i][j]: duelos jugados."""
+        rd = np.minimum(np.sqrt(self.rd ** 2 + self.inflacion ** 2), RD_INICIAL)
+        g = self._g(rd)[None, :]                      # g(RD_j)
+        esperado = 1 / (1 + 10 ** (-g * (self.r[:, None] - self.r[None, :]) / 400))
+        d2_inv = self.Q ** 2 * (partidas * g ** 2 * esperado * (1 - esperado)).sum(axis=1)
+        suma = (g * (puntos - partidas * esperado)).sum(axis=1)
+        precision = 1 / rd ** 2 + d2_inv
+        self.r = self.r + self.Q / precision * suma
+        self.rd = np.sqrt(1 / precision)
+
+
+def wilson(exitos, n, z=Z_95):
+    """Intervalo de confianza de Wilson para una proporción."""
+    if n == 0:
+        return 0.0, 1.0
+    p = exitos / n
+    centro = (p + z * z / (2 * n)) / (1 + z * z / n)
+    margen = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    return max(0.0, centro - margen), min(1.0, centro + margen)
+
+
+# ============================================================
+# TORNEO
+# ============================================================
+class Torneo:
+    """Acumula los resultados de las tandas y calcula tabla y ratings."""
+    def __init__(self, nombres):
+        self.nombres = list(nombres)
+        n = len(self.nombres)
+        self.indice = {nombre: i for i, nombre in enumerate(self.nombres)}
+        self.puntos = np.zeros((n, n))     # Puntos de i contra j (empate = 0.5)
+        self.partidas = np.zeros((n, n))   # Duelos entre i y j (simétrica)
+        self.victorias_primero = 0         # Duelos ganados por quien empieza
+        self.empates = 0
+        self.turnos = 0.0
+        self.glicko = Glicko(n)
+
+    @property
+    def total(self):
+        return int(self.partidas.sum() // 2)
+
+    def anotar(self, nombre1, nombre2, resultado, periodo=None):
+        """Suma una tanda. Si se pasa `periodo` (dict de matrices) se suma también ahí."""
+        v1, v2, empates, turnos = resultado
+        i, j = self.indice[nombre1], self.indice[nombre2]
+        n = v1 + v2 + empates
+        destinos = [(self.puntos, self.partidas)]
+        if periodo:
+            destinos.append((periodo["puntos"], periodo["partidas"]))
+        for puntos, partidas in destinos:
+            puntos[i, j] += v1 + empates / 2
+            puntos[j, i] += v2 + empates / 2
+            partidas[i, j] += n
+            partidas[j, i] += n
+        self.victorias_primero += v1
+        self.empates += empates
+        self.turnos += turnos
+
+    def resumen(self):
+        elo = elo_bradley_terry(self.puntos, self.partidas)
+        n = len(self.nombres)
+        tasas = np.full((n, n), 0.5)
+        intervalos = [[None] * n for _ in range(n)]
+        for i in range(n):
+            for j in range(n):
+                if i != j and self.partidas[i, j]:
+                    tasas[i, j] = self.puntos[i, j] / self.partidas[i, j]
+                    intervalos[i][j] = wilson(self.puntos[i, j], self.partidas[i, j])
+        return {
+            "duelos": self.total,
+            "ventaja_primero": self.victorias_primero / max(1, self.total),
+            "empates": self.empates,
+            "turnos_medios": self.turnos / max(1, self.total),
+            "campeones": [
+                {"nombre": nombre, "elo": float(elo[i]),
+                 "glicko": float(self.glicko.r[i]), "glicko_rd": float(self.glicko.rd[i]),
+                 "tasa_victoria": float(self.puntos[i].sum() / max(1, self.partidas[i].sum()))}
+                for i, nombre in enumerate(self.nombres)],
+            "tasas": tasas.tolist(),
+            "intervalos": intervalos,
+        }
+
+
+def jugar_torneo(partidas=1_000_000, procesos=None, semilla=None, tanda=100_000,
+                 motor="lotes", estadisticas=combate.ESTADISTICAS, al_progresar=None):
+    """
+    Reparte `partidas` duelos (en total) entre todos los cruces ordenados
+    del roster y los juega en `procesos` procesos. Cada ronda juega una
+    tanda de cada cruce; al completarse una ronda se aplica como periodo
+    de Glicko (en orden, así el resultado no depende de cuál termina antes).
+    """
+    nombres = list(estadisticas)
+    cruces = [(a, b) for a in nombres for b in nombres if a != b]
+    por_cruce = max(1, partidas // len(cruces))
+    rondas = [min(tanda, por_cruce - k) for k in range(0, por_cruce, tanda)]
+    flujos = iter(np.random.SeedSequence(semilla).spawn(len(rondas) * len(cruces)))
+
+    torneo = Torneo(nombres)
+    n = len(nombres)
+    periodos = {}   # ronda -> matrices del periodo
+    pendientes = {}  # ronda -> tandas que faltan
+    siguiente = 0    # Próxima ronda a aplicar en Glicko
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        futuros = {}
+        for r, tamaño in enumerate(rondas):
+            pendientes[r] = len(cruces)
+            periodos[r] = {"puntos": np.zeros((n, n)), "partidas": np.zeros((n, n))}
+            for a, b in cruces:
+                semilla_tanda = int(next(flujos).generate_state(1, np.uint64)[0])
+                futuro = pool.submit(jugar_tanda, a, b, tamaño, semilla_tanda, motor, estadisticas)
+                futuros[futuro] = (r, a, b)
+        for futuro in as_completed(futuros):
+            r, a, b = futuros.pop(futuro)
+            torneo.anotar(a, b, futuro.result(), periodos[r])
+            pendientes[r] -= 1
+            while siguiente in pendientes and pendientes[siguiente] == 0:
+                periodo = periodos.pop(siguiente)
+                torneo.glicko.periodo(periodo["puntos"], periodo["partidas"])
+                del pendientes[siguiente]
+                siguiente += 1
+            if al_progresar:
+                al_progresar(torneo)
+    return torneo
+
+
+def medir_escalado(partidas=600_000, motor="lotes", tanda=20_000):
+    """Duelos por segundo con 1, 2, 4... procesos hasta os.cpu_count()."""
+    nucleos = os.cpu_count() or 1
+    procesos = sorted({1, nucleos} | {2 ** k for k in range(1, nucleos.bit_length()) if 2 ** k <= nucleos})
+    base = None
+    for p in procesos:
+        t0 = time.perf_counter()
+        torneo = jugar_torneo(partidas, p, semilla=0, tanda=tanda, motor=motor)
+        velocidad = torneo.total / (time.perf_counter() - t0)
+        base = base or velocidad
+        print(f"{p:>3} procesos: {velocidad:>12,.0f} duelos/s  (x{velocidad / base:.2f},"
+              f" eficiencia {velocidad / base / p:.0%})")
+
+
+def imprimir(resumen, nombres):
+    print(f"{resumen['duelos']:,} duelos  |  gana quien empieza: {resumen['ventaja_primero']:.2%}"
+          f"  |  turnos medios: {resumen['turnos_medios']:.2f}")
+    print(f"\n{'Campeón':<9} {'Elo':>7} {'Glicko':>14} {'Victoria':>9}")
+    for c in sorted(resumen["campeones"], key=lambda c: -c["elo"]):
+        print(f"{c['nombre']:<9} {c['elo']:>7.1f} {c['glicko']:>7.1f} ±{Z_95 * c['glicko_rd']:>5.1f}"
+              f" {c['tasa_victoria']:>9.2%}")
+    print("\nTasa de victoria de la fila contra la columna (IC 95% ±):")
+    print(" " * 9 + "".join(f"{n[:7]:>16}" for n in nombres))
+    for i, fila in enumerate(nombres):
+        celdas = []
+        for j in range(len(nombres)):
+            ic = resumen["intervalos"][i][j]
+            if ic is None:
+                celdas.append(f"{'-':>16}")
+            else:
+                celdas.append(f"{resumen['tasas'][i][j]:>8.2%} ±{(ic[1] - ic[0]) / 2:>5.2%}")
+        print(f"{fila:<9}" + "".join(celdas))
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Torneo todos contra todos con ratings Elo/Glicko")
+    parser.add_argument("--partidas", type=int, default=1_000_000, help="duelos en total")
+    parser.add_argument("--procesos", type=int, default=None, help="por defecto, uno por núcleo")
+    parser.add_argument("--semilla", type=int, default=None)
+    parser.add_argument("--tanda", type=int, default=100_000, help="duelos por tarea")
+    parser.add_argument("--motor", choices=("lotes", "escalar"), default="lotes",
+                        help="lotes = combate_vectorizado, escalar = combate.simular_duelo")
+    parser.add_argument("--json", metavar="RUTA", help="guardar el resumen en JSON")
+    parser.add_argument("--escalado", action="store_true", help="medir duelos/s según nº de procesos")
+    args = parser.parse_args()
+
+    if args.escalado:
+        medir_escalado(motor=args.motor)
+        sys.exit()
+
+    t0 = time.perf_counter()
+    torneo = jugar_torneo(args.partidas, args.procesos, args.semilla, args.tanda, args.motor)
+    dt = time.perf_counter() - t0
+    resumen = torneo.resumen()
+    imprimir(resumen, torneo.nombres)
+    print(f"\n{resumen['duelos'] / dt:,.0f} duelos/s en {dt:.1f} s")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resumen, f, indent=2)
@@ -12,16 +12,36 @@ qué hace cada instrucción y cómo encajan las piezas.
 USO:
  - Si tienes un archivo `serviceAccountKey.json` y tu URL de Realtime Database,
    colócalos en el mismo directorio y rellena DATABASE_URL más abajo.
- - Si no tienes Firebase, el programa arrancará en modo "offline" (solo memoria)
-   para que puedas probar la interfaz y la lógica de POO sin errores.
+ - Si no tienes Firebase, el programa arrancará en modo "offline": los datos se
+   guardan en un archivo SQLite local (`usuarios_offline.db`) que sobrevive al
+   cierre del programa, para que puedas probar la interfaz y la lógica de POO.
 
 Ejecuta:
     python POO_Tkinter_Firebase_demo.py
+    python POO_Tkinter_Firebase_demo.py --benchmark   # mide el almacén offline
+    python POO_Tkinter_Firebase_demo.py --latencia 2  # simula una red lenta
+    python POO_Tkinter_Firebase_demo.py --benchmark-lotes  # escrituras agrupadas
+    python -m pytest tests  # pruebas (incluida la de la ventana con backend lento)
 
 """
 
 # ----------------------- IMPORTS -----------------------
 # Importamos tkinter y ttk para crear la interfaz.
+import bisect  # Para insertar filas nuevas en orden
+import concurrent.futures  # Pool de hilos y futures para no bloquear la ventana
+import contextlib  # Para escribir transacciones como bloques `with`
+import io  # Para silenciar los mensajes del servicio en los benchmarks
+import json  # Para guardar cada usuario (dict) como texto en SQLite
+import os  # Para construir la ruta del archivo offline
+import sqlite3  # Base de datos en un archivo, incluida con Python
+import queue  # Cola segura entre hilos para avisos y resultados
+import random  # Parte aleatoria de las claves tipo push()
+import sys  # Para escribir errores en stderr
+import threading  # Para saber si un aviso llega desde otro hilo
+import time  # Para medir tiempos (benchmarks, métricas de lotes)
+from collections import deque  # Historial acotado de métricas
+from typing import Callable, NamedTuple  # Tipos para la API de cambios
+
 import tkinter as tk  # El módulo base de Tkinter
 from tkinter import ttk, messagebox  # ttk = widgets con estilo, messagebox para diálogos
 
@@ -115,22 +135,363 @@ class Cliente(Usuario):
         return d
 
 
+# ----------------------- ALMACÉN OFFLINE (SQLite) -----------------------
+# Ruta por defecto del archivo offline: junto a este script
+RUTA_OFFLINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "usuarios_offline.db")
+
+
+class Cambio(NamedTuple):
+    """Aviso de un cambio en los datos (lo reciben los suscriptores de FirebaseService).
+
+    version: número que solo crece; cada cambio tiene el siguiente al anterior.
+    tipo:    "added"   -> la clave existe ahora con exactamente `valores`
+             "changed" -> se mezclaron `valores` en la clave (como dict.update)
+             "removed" -> la clave ya no existe (`valores` es None)
+    clave:   clave afectada; None significa "cambió todo, vuelve a cargar".
+    """
+    version: int
+    tipo: str
+    clave: str | None
+    valores: dict | None
+
+
+class AlmacenLocal:
+    """Almacén persistente clave -> dict sobre un archivo SQLite.
+
+    Cada usuario es una fila (clave, JSON) con índice por clave, así que leer,
+    insertar, actualizar o borrar uno cuesta lo mismo con 10 que con 1.000.000
+    de registros, y cada escritura toca solo su fila. Cada operación es una
+    transacción: si el programa se cierra de golpe, SQLite (modo WAL) recupera
+    el último estado confirmado al abrir el archivo de nuevo.
+
+    Cada cambio confirmado sube `version` (que también se guarda) y, si se asignó
+    `al_cambiar`, se le pasa un Cambio después del COMMIT.
+
+    Se puede usar desde varios hilos: un cerrojo deja pasar una operación a la vez.
+
+    Con ruta=":memory:" todo vive en memoria (útil para pruebas).
+    """
+
+    def __init__(self, ruta: str = RUTA_OFFLINE):
+        self.ruta = ruta
+        # isolation_level=None: controlamos las transacciones a mano con BEGIN/COMMIT.
+        # check_same_thread=False: la usan los hilos de ServicioAsincrono (con el cerrojo)
+        self.conn = sqlite3.connect(ruta, isolation_level=None, check_same_thread=False)
+        self._bloqueo = threading.RLock()
+        # WAL: escrituras incrementales al final de un diario + recuperación tras un corte.
+        # synchronous=NORMAL: en WAL sigue siendo consistente ante caídas del programa.
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        # `n` es el orden de inserción (alias del rowid); `clave` tiene índice único
+        self.conn.execute("CREATE TABLE IF NOT EXISTS usuarios ("
+                          " n INTEGER PRIMARY KEY,"
+                          " clave TEXT UNIQUE NOT NULL,"
+                          " datos TEXT NOT NULL)")
+        # Contador de claves: se guarda para no repetir claves tras borrar o reiniciar
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (nombre TEXT PRIMARY KEY, valor INTEGER)")
+        self._leer_contadores()
+        self.al_cambiar = None  # función(Cambio) que se llama tras confirmar cada cambio
+        self._pendientes = []  # Cambios de la transacción en curso
+
+    def push(self, obj: dict) -> str:
+        """Inserta `obj` con una clave nueva `local_<n>` y la retorna."""
+        return self.push_many([obj])[0]
+
+    def push_many(self, objs: list) -> list:
+        """Inserta varios objetos en una sola transacción; retorna sus claves."""
+        claves = []
+        with self._transaccion():
+            for obj in objs:
+                n = self._siguiente
+                self._siguiente += 1
+                key = f"local_{n}"
+                self.conn.execute("INSERT INTO usuarios (n, clave, datos) VALUES (?, ?, ?)",
+                                  (n, key, json.dumps(obj)))
+                claves.append(key)
+                self._anotar("added", key, dict(obj))
+        return claves
+
+    def get(self, key: str) -> dict | None:
+        """Lectura puntual por clave (usa el índice). None si no existe."""
+        with self._bloqueo:
+            fila = self.conn.execute("SELECT datos FROM usuarios WHERE clave = ?", (key,)).fetchone()
+        return json.loads(fila[0]) if fila else None
+
+    def get_all(self) -> dict:
+        """Todos los registros en orden de inserción (clave -> dict)."""
+        with self._bloqueo:
+            filas = self.conn.execute("SELECT clave, datos FROM usuarios ORDER BY n").fetchall()
+        return {clave: json.loads(datos) for clave, datos in filas}
+
+    def update(self, key: str, values: dict) -> bool:
+        """Mezcla `values` en el registro (como dict.update). False si no existe."""
+        with self._transaccion():
+            return self._actualizar(key, values)
+
+    def delete(self, key: str) -> bool:
+        """Borra el registro. False si no existía."""
+        with self._transaccion():
+            return self._borrar(key)
+
+    def new_key(self) -> str:
+        """Reserva una clave `local_<n>` para usarla después con apply_batch."""
+        with self._bloqueo:
+            n = self._siguiente
+            self._siguiente += 1  # Se guarda con la siguiente transacción que cambie algo
+        return f"local_{n}"
+
+    def apply_batch(self, operaciones: dict) -> None:
+        """Aplica varias escrituras en una sola transacción (todas o ninguna).
+
+        operaciones: clave -> ("set", dict) | ("update", dict) | ("delete", None).
+        "set" deja la clave con exactamente ese dict (la crea si no existe).
+        """
+        with self._transaccion():
+            for key, (operacion, valores) in operaciones.items():
+                if operacion == "set":
+                    n = self._orden(key)
+                    if not n:
+                        # Clave ajena que aún no está: toma la siguiente posición del contador
+                        n = self._siguiente
+                        self._siguiente += 1
+                    elif n >= self._siguiente:
+                        self._siguiente = n + 1  # local_<n> de fuera: el contador no debe repetirla
+                    self.conn.execute("INSERT INTO usuarios (n, clave, datos) VALUES (?, ?, ?)"
+                                      " ON CONFLICT (clave) DO UPDATE SET datos = excluded.datos",
+                                      (n, key, json.dumps(valores)))
+                    self._anotar("added", key, dict(valores))
+                elif operacion == "update":
+                    self._actualizar(key, valores)
+                else:
+                    self._borrar(key)
+
+    def get_page(self, start_after: str | None = None, end_before: str | None = None,
+                 limit: int = 100) -> list:
+        """Página de hasta `limit` pares (clave, dict) en orden de claves.
+
+        Con start_after: las siguientes a esa clave; con end_before: las anteriores.
+        Es un rango por clave sobre el índice, así que cuesta lo mismo en cualquier
+        punto de la tabla (aunque la clave de referencia ya se haya borrado).
+        """
+        with self._bloqueo:
+            if end_before is not None:
+                filas = self.conn.execute("SELECT clave, datos FROM usuarios WHERE n < ?"
+                                          " ORDER BY n DESC LIMIT ?", (self._orden(end_before), limit))
+                return [(clave, json.loads(datos)) for clave, datos in reversed(filas.fetchall())]
+            desde = self._orden(start_after) if start_after is not None else 0
+            filas = self.conn.execute("SELECT clave, datos FROM usuarios WHERE n > ?"
+                                      " ORDER BY n LIMIT ?", (desde, limit)).fetchall()
+        return [(clave, json.loads(datos)) for clave, datos in filas]
+
+    def get_page_at(self, offset: int, limit: int = 100) -> list:
+        """Página que empieza en la posición `offset` (para saltos con la barra).
+
+        SQLite recorre el índice hasta `offset` (unos 40 ms con 1M de filas), por eso
+        para avanzar fila a fila se usa get_page con la última clave.
+        """
+        with self._bloqueo:
+            filas = self.conn.execute("SELECT clave, datos FROM usuarios ORDER BY n LIMIT ? OFFSET ?",
+                                      (limit, offset)).fetchall()
+        return [(clave, json.loads(datos)) for clave, datos in filas]
+
+    def count_with_version(self) -> tuple:
+        """(versión, número de registros) leídos a la vez, sin cambios entre medias."""
+        with self._bloqueo:
+            return self.version, len(self)
+
+    def get_page_with_version(self, start_after: str | None = None, end_before: str | None = None,
+                              limit: int = 100) -> tuple:
+        """(versión, get_page(...)) leídos a la vez: la página refleja esa versión."""
+        with self._bloqueo:
+            return self.version, self.get_page(start_after, end_before, limit)
+
+    def get_page_at_with_version(self, offset: int, limit: int = 100) -> tuple:
+        """(versión, get_page_at(...)) leídos a la vez."""
+        with self._bloqueo:
+            return self.version, self.get_page_at(offset, limit)
+
+    def __len__(self) -> int:
+        with self._bloqueo:
+            return self.conn.execute("SELECT COUNT(*) FROM usuarios").fetchone()[0]
+
+    def __contains__(self, key: str) -> bool:
+        with self._bloqueo:
+            return self.conn.execute("SELECT 1 FROM usuarios WHERE clave = ?", (key,)).fetchone() is not None
+
+    def close(self) -> None:
+        with self._bloqueo:
+            self.conn.close()
+
+    def _orden(self, key: str) -> int:
+        """Posición `n` de una clave. Las propias son `local_<n>`, así que se calcula
+        aunque el registro ya no exista; las demás (p. ej. `abc_5`, que no es la
+        posición 5) se buscan en el índice, y 0 si no están."""
+        numero = key[len("local_"):]
+        if key.startswith("local_") and numero.isascii() and numero.isdigit():
+            return int(numero)
+        with self._bloqueo:
+            fila = self.conn.execute("SELECT n FROM usuarios WHERE clave = ?", (key,)).fetchone()
+        return fila[0] if fila else 0
+
+    def _actualizar(self, key: str, values: dict) -> bool:
+        """update() dentro de una transacción ya abierta."""
+        actual = self.get(key)
+        if actual is None:
+            return False
+        actual.update(values)
+        self.conn.execute("UPDATE usuarios SET datos = ? WHERE clave = ?", (json.dumps(actual), key))
+        self._anotar("changed", key, dict(values))
+        return True
+
+    def _borrar(self, key: str) -> bool:
+        """delete() dentro de una transacción ya abierta."""
+        borradas = self.conn.execute("DELETE FROM usuarios WHERE clave = ?", (key,)).rowcount
+        if borradas:
+            self._anotar("removed", key, None)
+        return borradas > 0
+
+    def _leer_contadores(self) -> None:
+        """Carga desde `meta` el contador de claves y la versión."""
+        meta = dict(self.conn.execute("SELECT nombre, valor FROM meta"))
+        self._siguiente = meta.get("siguiente", 1)
+        self.version = meta.get("version", 0)
+
+    def _anotar(self, tipo: str, key: str, valores: dict | None) -> None:
+        """Apunta un cambio de la transacción en curso (se avisa tras el COMMIT)."""
+        self.version += 1
+        self._pendientes.append(Cambio(self.version, tipo, key, valores))
+
+    @contextlib.contextmanager
+    def _transaccion(self):
+        """BEGIN ... COMMIT, o ROLLBACK si hay una excepción (nada queda a medias)."""
+        with self._bloqueo:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+                if self._pendientes:
+                    # Contadores en la misma transacción que los datos
+                    self.conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                                          (("siguiente", self._siguiente), ("version", self.version)))
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                # La versión vuelve a la guardada, pero _siguiente nunca baja: una clave
+                # ya entregada (new_key, o un lote que se reintentará) no debe repetirse
+                siguiente = self._siguiente
+                self._leer_contadores()
+                self._siguiente = max(self._siguiente, siguiente)
+                self._pendientes = []
+                raise
+            self.conn.execute("COMMIT")
+            cambios, self._pendientes = self._pendientes, []
+            if self.al_cambiar is not None:
+                for cambio in cambios:
+                    self.al_cambiar(cambio)
+
+
+def benchmark_almacen(tamanos=(1_000, 10_000, 100_000, 1_000_000), operaciones: int = 2_000) -> list:
+    """Mide el coste medio (µs) de push/get/update/delete según el tamaño del almacén.
+
+    Con índice por clave los tiempos deben salir casi iguales para todos los
+    tamaños. Retorna una lista de dicts (una fila por tamaño) y la imprime.
+    """
+    import random
+    import tempfile
+
+    resultados = []
+    print(f"{'registros':>10} {'push':>8} {'get':>8} {'update':>8} {'delete':>8}   (µs por operación)")
+    for tamano in tamanos:
+        with tempfile.TemporaryDirectory() as carpeta:
+            almacen = AlmacenLocal(os.path.join(carpeta, "bench.db"))
+            ejemplo = Cliente("Ana", "ana@example.com", puntos=3).to_dict()
+            for inicio in range(0, tamano, 50_000):  # Carga inicial en bloques
+                almacen.push_many([ejemplo] * min(50_000, tamano - inicio))
+            azar = random.Random(0)
+            claves = [f"local_{azar.randint(1, tamano)}" for _ in range(operaciones)]
+            fila = {"registros": tamano}
+
+            t0 = time.perf_counter()
+            nuevas = [almacen.push(ejemplo) for _ in range(operaciones)]
+            fila["push_us"] = (time.perf_counter() - t0) / operaciones * 1e6
+
+            t0 = time.perf_counter()
+            for key in claves:
+                almacen.get(key)
+            fila["get_us"] = (time.perf_counter() - t0) / operaciones * 1e6
+
+            t0 = time.perf_counter()
+            for key in claves:
+                almacen.update(key, {"puntos": 10})
+            fila["update_us"] = (time.perf_counter() - t0) / operaciones * 1e6
+
+            t0 = time.perf_counter()
+            for key in nuevas:
+                almacen.delete(key)
+            fila["delete_us"] = (time.perf_counter() - t0) / operaciones * 1e6
+
+            almacen.close()
+        print(f"{tamano:>10} {fila['push_us']:>8.1f} {fila['get_us']:>8.1f}"
+              f" {fila['update_us']:>8.1f} {fila['delete_us']:>8.1f}")
+        resultados.append(fila)
+    return resultados
+
+
 # ----------------------- SERVICIO DE PERSISTENCIA (FIREBASE) -----------------------
+# Alfabeto de las claves de push() de Firebase (ordenado como texto)
+_CARACTERES_PUSH = "-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz"
+_ultima_push = {"ms": 0, "azar": []}
+_bloqueo_push = threading.Lock()
+
+
+def nueva_clave_push() -> str:
+    """Clave con el mismo formato que ref.push() de Firebase, pero sin ir a la red.
+
+    8 caracteres con la hora en milisegundos + 12 aleatorios. Dentro del mismo
+    milisegundo se suma 1 a la parte aleatoria, así las claves salen en orden.
+    """
+    with _bloqueo_push:
+        ahora = int(time.time() * 1000)
+        if ahora == _ultima_push["ms"]:
+            azar = _ultima_push["azar"]
+            i = len(azar) - 1
+            while i > 0 and azar[i] == 63:  # Acarreo, como al sumar 1 en base 64
+                azar[i] = 0
+                i -= 1
+            azar[i] += 1
+        else:
+            azar = [random.randrange(64) for _ in range(12)]
+            _ultima_push.update(ms=ahora, azar=azar)
+        marca = ""
+        for _ in range(8):
+            marca = _CARACTERES_PUSH[ahora % 64] + marca
+            ahora //= 64
+        return marca + "".join(_CARACTERES_PUSH[c] for c in azar)
+
+
 class FirebaseService:
     """Clase que encapsula las operaciones con Firebase Realtime Database.
 
     Si Firebase no está disponible (por ejemplo, no está instalado o no se puso la
-    credencial), la clase se inicializará en modo 'offline' y almacenará datos en memoria.
+    credencial), la clase se inicializará en modo 'offline' y almacenará los datos en
+    un archivo SQLite local (ver AlmacenLocal), que se conserva entre ejecuciones.
     """
 
-    def __init__(self, cred_path: str = "serviceAccountKey.json", database_url: str = ""):
+    def __init__(self, cred_path: str = "serviceAccountKey.json", database_url: str = "",
+                 local_path: str = RUTA_OFFLINE):
         # Guardamos variables de configuración
         self.cred_path = cred_path
         self.database_url = database_url
+        self.local_path = local_path  # Archivo del almacén offline (":memory:" = sin archivo)
         self.online = False  # Indicador de si estamos conectados a Firebase
 
-        # Contenedor en memoria como fallback si Firebase no está disponible
-        self._in_memory = {}
+        # Almacén local como fallback si Firebase no está disponible (se abre al usarlo)
+        self._local = None
+        self._bloqueo_local = threading.Lock()  # Los hilos de ServicioAsincrono lo abren a la vez
+
+        # Suscriptores a los cambios (ver subscribe)
+        self._suscriptores = []
+        self._escucha = None  # Listener de Realtime Database mientras haya suscriptores
+        self._snapshot_inicial = True  # El primer evento del listener es el estado completo
+        self._version_online = 0
 
         # Intentamos inicializar Firebase solo si el paquete está disponible
         if _FIREBASE_AVAILABLE:
@@ -146,21 +507,32 @@ class FirebaseService:
             except Exception as ex:
                 # Si algo falla en la inicialización, caemos a modo offline
                 print("[FirebaseService] No se pudo inicializar Firebase:", ex)
-                print("[FirebaseService] Usando modo OFFLINE (memoria local).")
+                print("[FirebaseService] Usando modo OFFLINE (archivo local).")
                 self.online = False
                 self.ref = None
         else:
             # Paquete firebase_admin no disponible
             print("[FirebaseService] paquete 'firebase_admin' no encontrado.")
-            print("[FirebaseService] Usando modo OFFLINE (memoria local).")
+            print("[FirebaseService] Usando modo OFFLINE (archivo local).")
             self.online = False
             self.ref = None
 
+    @property
+    def local(self) -> AlmacenLocal:
+        """Almacén offline; se abre la primera vez que se necesita (una sola vez,
+        aunque varios hilos lo pidan a la vez)."""
+        if self._local is None:
+            with self._bloqueo_local:
+                if self._local is None:
+                    self._local = AlmacenLocal(self.local_path)
+        return self._local
+
     def push(self, obj: dict) -> str:
         """Inserta un objeto en la base de datos.
 
         Si estamos online, usamos `push()` de Firebase que devuelve la clave única.
-        Si estamos offline, generamos una clave simple y lo guardamos en el dict.
+        Si estamos offline, el almacén local genera una clave `local_<n>` (nunca se
+        repite, aunque se borren registros) y lo guarda en el archivo.
         Retornamos la clave generada.
         """
         if self.online and self.ref is not None:
@@ -169,36 +541,235 @@ class FirebaseService:
             print(f"[FirebaseService] Guardado en Firebase con clave: {new_ref.key}")
             return new_ref.key
         else:
-            # Modo offline: generamos una clave simple con longitud incremental
-            key = f"local_{len(self._in_memory) + 1}"
-            self._in_memory[key] = obj
-            print(f"[FirebaseService] (OFFLINE) Guardado en memoria con clave: {key}")
+            # Modo offline: el almacén local asigna la clave y escribe solo esta fila
+            key = self.local.push(obj)
+            print(f"[FirebaseService] (OFFLINE) Guardado en archivo local con clave: {key}")
             return key
 
     def get_all(self) -> dict:
         """Recupera todos los objetos.
 
-        Si estamos online, hacemos ref.get(), de lo contrario devolvemos el dict en memoria.
+        Si estamos online, hacemos ref.get(), de lo contrario leemos el almacén local.
+        Para consultar un solo registro es mucho más barato usar get(key).
         """
         if self.online and self.ref is not None:
             data = self.ref.get() or {}
             print(f"[FirebaseService] Recuperados {len(data)} elementos desde Firebase.")
             return data
         else:
-            print(f"[FirebaseService] (OFFLINE) Recuperados {len(self._in_memory)} elementos desde memoria.")
-            return dict(self._in_memory)
+            data = self.local.get_all()
+            print(f"[FirebaseService] (OFFLINE) Recuperados {len(data)} elementos desde archivo local.")
+            return data
+
+    def get(self, key: str) -> dict | None:
+        """Recupera un solo objeto por clave (None si no existe)."""
+        if self.online and self.ref is not None:
+            return self.ref.child(key).get()
+        else:
+            return self.local.get(key)
+
+    def count_with_version(self) -> tuple:
+        """(versión, número de objetos): punto de partida para aplicar Cambios después.
+
+        Online se lee la versión antes de contar; un cambio que llegue justo entre
+        medias se aplicaría dos veces (lo corrige el siguiente "Refrescar").
+        """
+        if self.online and self.ref is not None:
+            return self._version_online, self.count()
+        else:
+            return self.local.count_with_version()
+
+    def count(self) -> int:
+        """Número de objetos guardados."""
+        if self.online and self.ref is not None:
+            # shallow=True trae solo las claves, no los datos de cada usuario
+            return len(self.ref.get(shallow=True) or {})
+        else:
+            return len(self.local)
+
+    def get_page(self, start_after: str | None = None, end_before: str | None = None,
+                 limit: int = 100) -> list:
+        """Recupera una página de pares (clave, dict) ordenados por clave.
+
+        start_after=clave -> las `limit` siguientes; end_before=clave -> las `limit`
+        anteriores; sin ninguna -> las primeras. Online se traduce a una consulta
+        order_by_key() con start_at/end_at, que solo descarga esa página.
+        """
+        if self.online and self.ref is not None:
+            consulta = self.ref.order_by_key()
+            if end_before is not None:
+                # end_at incluye la propia clave: pedimos una más y la quitamos
+                data = consulta.end_at(end_before).limit_to_last(limit + 1).get() or {}
+                filas = [(k, v) for k, v in data.items() if k != end_before]
+                return filas[-limit:]
+            if start_after is not None:
+                data = consulta.start_at(start_after).limit_to_first(limit + 1).get() or {}
+                filas = [(k, v) for k, v in data.items() if k != start_after]
+                return filas[:limit]
+            return list((consulta.limit_to_first(limit).get() or {}).items())
+        else:
+            return self.local.get_page(start_after, end_before, limit)
+
+    def sort_key(self, key: str):
+        """Valor por el que se ordena `key` en get_page (para comparar claves)."""
+        if self.online and self.ref is not None:
+            return key  # order_by_key: las claves de push() se ordenan como texto
+        else:
+            return self.local._orden(key)
+
+    def get_page_at(self, offset: int, limit: int = 100) -> list:
+        """Recupera la página que empieza en la posición `offset` (saltos grandes).
+
+        Realtime Database no tiene OFFSET: online se leen solo las claves
+        (shallow) para saber en qué clave empieza la página y luego se pide esa página.
+        """
+        if self.online and self.ref is not None:
+            claves = sorted(self.ref.get(shallow=True) or {})
+            if offset >= len(claves):
+                return []
+            data = self.ref.order_by_key().start_at(claves[offset]).limit_to_first(limit).get() or {}
+            return list(data.items())
+        else:
+            return self.local.get_page_at(offset, limit)
+
+    def get_page_with_version(self, start_after: str | None = None, end_before: str | None = None,
+                              limit: int = 100) -> tuple:
+        """(versión, página de get_page): la página ya incluye los Cambios hasta esa versión.
+
+        Online la versión se lee antes de la consulta (como en count_with_version).
+        """
+        if self.online and self.ref is not None:
+            return self._version_online, self.get_page(start_after, end_before, limit)
+        else:
+            return self.local.get_page_with_version(start_after, end_before, limit)
+
+    def get_page_at_with_version(self, offset: int, limit: int = 100) -> tuple:
+        """(versión, página de get_page_at), como get_page_with_version."""
+        if self.online and self.ref is not None:
+            return self._version_online, self.get_page_at(offset, limit)
+        else:
+            return self.local.get_page_at_with_version(offset, limit)
+
+    # --- escrituras por lotes ---
+    def new_key(self) -> str:
+        """Clave nueva para un objeto que se guardará más tarde (sin ir a la red)."""
+        if self.online and self.ref is not None:
+            return nueva_clave_push()
+        else:
+            return self.local.new_key()
+
+    def apply_batch(self, operaciones: dict) -> None:
+        """Aplica de una vez varias escrituras (todas o ninguna).
+
+        operaciones: clave -> ("set", dict) | ("update", dict) | ("delete", None).
+        Online es una única actualización multi-ruta (una sola petición): "set" ->
+        {clave: dict}, "update" -> {"clave/campo": valor, ...}, "delete" -> {clave: None}.
+        Offline es una única transacción del almacén local.
+        """
+        if not operaciones:
+            return
+        if self.online and self.ref is not None:
+            rutas = {}
+            for key, (operacion, valores) in operaciones.items():
+                if operacion == "update":
+                    rutas.update({f"{key}/{campo}": valor for campo, valor in valores.items()})
+                else:
+                    rutas[key] = valores  # "set" -> dict, "delete" -> None
+            self.ref.update(rutas)
+            print(f"[FirebaseService] Lote de {len(operaciones)} escrituras en Firebase.")
+        else:
+            self.local.apply_batch(operaciones)
+            print(f"[FirebaseService] (OFFLINE) Lote de {len(operaciones)} escrituras en archivo local.")
+
+    def batch(self, ventana: float = 0.05, tamano_maximo: int = 500) -> "LoteEscrituras":
+        """Agrupa escrituras: `with servicio.batch() as lote: lote.push(...)`."""
+        return LoteEscrituras(self, ventana, tamano_maximo)
+
+    # --- feed de cambios ---
+    @property
+    def version(self) -> int:
+        """Versión del último cambio conocido (solo crece)."""
+        if self.online and self.ref is not None:
+            return self._version_online
+        else:
+            return self.local.version
+
+    def subscribe(self, callback: Callable[[Cambio], None]) -> Callable[[], None]:
+        """Llama a `callback(Cambio)` por cada alta, cambio o baja. Retorna una función
+        que cancela la suscripción.
+
+        Online se usa un listener de Realtime Database (los avisos llegan desde el hilo
+        del listener, incluidos los de nuestras propias escrituras); offline avisa el
+        almacén local justo después de confirmar cada escritura, en el mismo hilo.
+        """
+        self._suscriptores.append(callback)
+        if self.online and self.ref is not None:
+            if self._escucha is None:
+                self._snapshot_inicial = True
+                self._escucha = self.ref.listen(self._al_evento_rtdb)
+        else:
+            self.local.al_cambiar = self._emitir
+
+        def cancelar():
+            if callback in self._suscriptores:
+                self._suscriptores.remove(callback)
+            if not self._suscriptores and self._escucha is not None:
+                self._escucha.close()
+                self._escucha = None
+
+        return cancelar
+
+    def _emitir(self, cambio: Cambio) -> None:
+        for callback in list(self._suscriptores):
+            callback(cambio)
+
+    def _al_evento_rtdb(self, evento) -> None:
+        """Traduce un evento 'put'/'patch' del listener a Cambios.
+
+        Rutas: "/" = toda la lista, "/<clave>" = un usuario, "/<clave>/<campo>" = un campo.
+        """
+        ruta = [parte for parte in evento.path.split("/") if parte]
+        if not ruta:
+            if evento.event_type == "put":
+                if self._snapshot_inicial:
+                    # Estado completo al empezar a escuchar: la vista ya lo lee por páginas
+                    self._snapshot_inicial = False
+                    return
+                self._cambio_online("changed", None, None)  # Se reemplazó toda la lista
+                return
+            # patch en la raíz (actualización de varias rutas): {"clave" o "clave/campo": valor}
+            for subruta, valor in (evento.data or {}).items():
+                self._cambio_online_en([p for p in subruta.split("/") if p], valor, "put")
+            return
+        self._cambio_online_en(ruta, evento.data, evento.event_type)
+
+    def _cambio_online_en(self, ruta: list, valor, tipo_evento: str) -> None:
+        key = ruta[0]
+        if len(ruta) > 1:
+            # Un solo campo del usuario (solo se usan campos de primer nivel)
+            self._cambio_online("changed", key, {ruta[1]: valor})
+        elif valor is None:
+            self._cambio_online("removed", key, None)
+        elif tipo_evento == "patch":
+            self._cambio_online("changed", key, valor)
+        else:
+            self._cambio_online("added", key, valor)
+
+    def _cambio_online(self, tipo: str, key: str | None, valores: dict | None) -> None:
+        self._version_online += 1
+        self._emitir(Cambio(self._version_online, tipo, key, valores))
 
     def update(self, key: str, values: dict) -> None:
         """Actualiza un nodo por clave.
 
-        Si online, usamos child(key).update(values). En offline, actualizamos el dict.
+        Si online, usamos child(key).update(values). En offline, actualizamos solo esa
+        fila del almacén local.
         """
         if self.online and self.ref is not None:
             self.ref.child(key).update(values)
             print(f"[FirebaseService] Actualizado {key} en Firebase.")
         else:
-            if key in self._in_memory:
-                self._in_memory[key].update(values)
+            if self.local.update(key, values):
                 print(f"[FirebaseService] (OFFLINE) Actualizado {key}.")
 
     def delete(self, key: str) -> None:
@@ -207,9 +778,539 @@ class FirebaseService:
             self.ref.child(key).delete()
             print(f"[FirebaseService] Borrado {key} en Firebase.")
         else:
-            if key in self._in_memory:
-                del self._in_memory[key]
-                print(f"[FirebaseService] (OFFLINE) Borrado {key} de memoria.")
+            if self.local.delete(key):
+                print(f"[FirebaseService] (OFFLINE) Borrado {key} del archivo local.")
+
+
+# ----------------------- ESCRITURAS POR LOTES -----------------------
+class LoteEscrituras:
+    """Junta push/update/delete y los envía juntos con FirebaseService.apply_batch.
+
+    Las escrituras se guardan en memoria y se envían cuando pasa `ventana`
+    segundos desde la primera pendiente, cuando hay `tamano_maximo` claves
+    distintas pendientes o al llamar a flush(). Antes de enviar se fusionan:
+    varios update de la misma clave se mezclan en uno, un update sobre un push
+    pendiente se mete en el propio push, y un delete deja solo el borrado (o
+    nada, si la clave aún no se había enviado).
+
+    Como context manager, al salir sin error envía lo pendiente; si hubo una
+    excepción, descarta lo que no se llegó a enviar. No es una transacción: los
+    lotes que ya salieron dentro del bloque (por la ventana o por tamano_maximo)
+    quedan escritos.
+
+    metricas() resume cuántos lotes se enviaron, su tamaño y cuánto tardaron.
+    """
+
+    def __init__(self, servicio: FirebaseService, ventana: float = 0.05, tamano_maximo: int = 500):
+        self.servicio = servicio
+        self.ventana = ventana  # Segundos que espera una escritura antes de enviarse
+        self.tamano_maximo = tamano_maximo  # Claves pendientes que fuerzan un envío
+        self._pendientes = {}  # clave -> (operacion, valores)
+        self._temporizador = None
+        self._bloqueo = threading.Lock()  # Protege _pendientes y el temporizador
+        self._bloqueo_envio = threading.Lock()  # Un envío a la vez, en orden
+        # Métricas
+        self.operaciones = 0  # push/update/delete recibidos
+        self.escrituras = 0  # Escrituras enviadas después de fusionar
+        self.lotes = 0
+        self.errores = 0
+        self._tamanos = deque(maxlen=1000)  # Tamaño de los últimos lotes
+        self._latencias = deque(maxlen=1000)  # Segundos de los últimos envíos
+
+    # --- misma interfaz que FirebaseService ---
+    def push(self, obj: dict) -> str:
+        """Encola un alta y retorna ya su clave (se genera sin ir a la red)."""
+        key = self.servicio.new_key()
+        self._encolar(key, "set", dict(obj))
+        return key
+
+    def update(self, key: str, values: dict) -> None:
+        self._encolar(key, "update", dict(values))
+
+    def delete(self, key: str) -> None:
+        self._encolar(key, "delete", None)
+
+    # --- envío ---
+    def flush(self) -> int:
+        """Envía ya todo lo pendiente. Retorna cuántas escrituras se enviaron.
+
+        Si el envío falla, las escrituras vuelven a quedar pendientes (delante de
+        las que se encolaron mientras tanto) y se relanza la excepción.
+        """
+        with self._bloqueo_envio:
+            with self._bloqueo:
+                self._cancelar_temporizador()
+                lote, self._pendientes = self._pendientes, {}
+            if not lote:
+                return 0
+            t0 = time.perf_counter()
+            try:
+                self.servicio.apply_batch(lote)
+            except Exception:
+                with self._bloqueo:
+                    self.errores += 1
+                    recientes, self._pendientes = self._pendientes, {}
+                    for key, (operacion, valores) in list(lote.items()) + list(recientes.items()):
+                        self._fusionar(key, operacion, valores)
+                    self._programar()
+                raise
+            self._latencias.append(time.perf_counter() - t0)
+            self._tamanos.append(len(lote))
+            self.lotes += 1
+            self.escrituras += len(lote)
+            return len(lote)
+
+    def close(self) -> None:
+        """Envía lo pendiente y para el temporizador."""
+        self.flush()
+
+    def __enter__(self) -> "LoteEscrituras":
+        return self
+
+    def __exit__(self, tipo, valor, traza) -> bool:
+        if tipo is None:
+            self.flush()
+        else:
+            with self._bloqueo:  # Error dentro del bloque: no se envía nada más
+                self._cancelar_temporizador()
+                self._pendientes = {}
+        return False
+
+    def metricas(self) -> dict:
+        """Resumen de los lotes enviados (tamaños y latencias de los últimos 1000)."""
+        tamanos = list(self._tamanos)
+        latencias = sorted(self._latencias)
+        return {
+            "operaciones": self.operaciones,
+            "escrituras": self.escrituras,
+            "fusionadas": self.operaciones - self.escrituras - len(self._pendientes),
+            "pendientes": len(self._pendientes),
+            "lotes": self.lotes,
+            "errores": self.errores,
+            "tamano_medio": round(sum(tamanos) / len(tamanos), 1) if tamanos else 0,
+            "tamano_max": max(tamanos, default=0),
+            "latencia_media_ms": round(sum(latencias) / len(latencias) * 1000, 2) if latencias else 0,
+            "latencia_p95_ms": round(latencias[int(len(latencias) * 0.95)] * 1000, 2) if latencias else 0,
+            "latencia_max_ms": round(latencias[-1] * 1000, 2) if latencias else 0,
+        }
+
+    # --- internos ---
+    def _encolar(self, key: str, operacion: str, valores: dict | None) -> None:
+        with self._bloqueo:
+            self.operaciones += 1
+            self._fusionar(key, operacion, valores)
+            lleno = len(self._pendientes) >= self.tamano_maximo
+            if not lleno:
+                self._programar()
+        if lleno:
+            self.flush()
+
+    def _fusionar(self, key: str, operacion: str, valores: dict | None) -> None:
+        """Mezcla una escritura con la pendiente de la misma clave (con _bloqueo tomado)."""
+        anterior = self._pendientes.get(key)
+        if anterior is None or operacion == "set":
+            self._pendientes[key] = (operacion, valores)
+        elif operacion == "delete":
+            if anterior[0] == "set":
+                del self._pendientes[key]  # Alta que aún no se envió: no hay nada que borrar
+            else:
+                self._pendientes[key] = ("delete", None)
+        elif anterior[0] != "delete":  # update sobre set/update: se mezclan los campos
+            self._pendientes[key] = (anterior[0], {**anterior[1], **valores})
+        # update sobre un delete pendiente: la clave ya no existe, no hace nada
+
+    def _programar(self) -> None:
+        """Arranca el temporizador de la ventana si no está en marcha (con _bloqueo tomado)."""
+        if self._temporizador is None and self._pendientes:
+            self._temporizador = threading.Timer(self.ventana, self._al_vencer)
+            self._temporizador.daemon = True
+            self._temporizador.start()
+
+    def _cancelar_temporizador(self) -> None:
+        if self._temporizador is not None:
+            self._temporizador.cancel()
+            self._temporizador = None
+
+    def _al_vencer(self) -> None:
+        try:
+            self.flush()
+        except Exception as ex:  # En el hilo del temporizador: se reintenta en la próxima ventana
+            print(f"[LoteEscrituras] Error al enviar el lote: {ex!r}", file=sys.stderr)
+
+
+def benchmark_lotes(usuarios: int = 1000, latencia: float = 0.002) -> dict:
+    """Compara un trabajo masivo escribiendo de una en una y con LoteEscrituras.
+
+    El trabajo da de alta `usuarios`, actualiza dos veces a la mitad y borra a un
+    cuarto. Cada petición al backend espera `latencia` segundos (como un viaje de
+    ida y vuelta por la red) sobre un almacén offline temporal.
+    """
+    import tempfile
+
+    class ServicioLento(FirebaseService):
+        """FirebaseService offline con una espera fija por petición."""
+        peticiones = 0
+
+        def _esperar(self):
+            ServicioLento.peticiones += 1
+            time.sleep(latencia)
+
+        def push(self, obj):
+            self._esperar()
+            return super().push(obj)
+
+        def update(self, key, values):
+            self._esperar()
+            super().update(key, values)
+
+        def delete(self, key):
+            self._esperar()
+            super().delete(key)
+
+        def apply_batch(self, operaciones):
+            self._esperar()
+            super().apply_batch(operaciones)
+
+    def trabajo(destino):
+        claves = [destino.push(Cliente(f"Cliente {i}", f"c{i}@example.com").to_dict())
+                  for i in range(usuarios)]
+        for key in claves[:usuarios // 2]:
+            destino.update(key, {"puntos": 10})
+            destino.update(key, {"puntos": 20})
+        for key in claves[-usuarios // 4:]:
+            destino.delete(key)
+
+    resultado = {"usuarios": usuarios, "latencia_ms": latencia * 1000}
+    with tempfile.TemporaryDirectory() as carpeta:
+        for modo in ("una_a_una", "por_lotes"):
+            with contextlib.redirect_stdout(io.StringIO()):
+                servicio = ServicioLento(local_path=os.path.join(carpeta, f"{modo}.db"))
+                ServicioLento.peticiones = 0
+                t0 = time.perf_counter()
+                if modo == "una_a_una":
+                    trabajo(servicio)
+                else:
+                    with servicio.batch() as lote:
+                        trabajo(lote)
+                    resultado["metricas_lote"] = lote.metricas()
+                duracion = time.perf_counter() - t0
+                resultado[modo] = {"segundos": round(duracion, 3), "peticiones": ServicioLento.peticiones,
+                                   "registros": len(servicio.local)}
+                servicio.local.close()
+            print(f"  {modo:<10} {duracion:>8.3f} s  {ServicioLento.peticiones:>6} peticiones"
+                  f"  {resultado[modo]['registros']} registros al final")
+    print("  métricas del lote:", resultado["metricas_lote"])
+    return resultado
+
+
+# ----------------------- PAGINACIÓN (VENTANA DE DATOS) -----------------------
+class VentanaDatos:
+    """Guarda un trozo contiguo de filas del backend alrededor de lo que se ve.
+
+    La vista pide "dame `cantidad` filas desde la posición `offset`" y esta clase
+    decide cómo traerlas:
+      - si ya las tiene, no consulta nada;
+      - si están justo antes o después del trozo, pide la página siguiente o
+        anterior por rango de claves (get_page con la primera/última clave);
+      - si es un salto lejano (arrastrar la barra), pide la página en esa posición
+        (get_page_at) y descarta el trozo anterior.
+    Las páginas se piden con su versión (get_page_with_version...) y solo se
+    guardan si es la misma que la del trozo, para no contar un cambio dos veces.
+    Nunca guarda más de `maximo` filas, así que la memoria no depende del total.
+
+    Cada consulta se separa en dos pasos, pedido_para() (qué pedir) e incorporar()
+    (guardar la respuesta), para poder hacerla en segundo plano; filas_en() hace
+    los dos seguidos cuando basta con esperar.
+
+    aplicar() mantiene el trozo al día con los Cambios del servicio sin volver a
+    consultar; si faltan cambios (salto de versión) o llegan demasiados de golpe,
+    indica que hay que volver a cargar.
+    """
+
+    MAXIMO_PARCHE = 100  # Con más cambios seguidos sale más barato recargar
+
+    def __init__(self, servicio: "FirebaseService", pagina: int = 100, maximo: int = 1000):
+        self.servicio = servicio
+        self.pagina = pagina  # Filas por consulta al backend
+        self.maximo = maximo  # Filas como máximo en memoria
+        self.total = 0  # Total de filas en el backend (se lee en recargar)
+        self.inicio = 0  # Posición de la primera fila guardada
+        self.filas = []  # [(clave, dict), ...] desde `inicio`
+        self.consultas = 0  # Consultas hechas al backend (para medir)
+        self.version = 0  # Versión del servicio que reflejan total y filas
+
+    def recargar(self) -> None:
+        """Vuelve a contar las filas y olvida las guardadas."""
+        self.consultas += 1
+        self.reiniciar(*self.servicio.count_with_version())
+
+    def reiniciar(self, version: int, total: int) -> None:
+        """Empieza de cero con el resultado de count_with_version()."""
+        self.version = version
+        self.total = total
+        self.inicio = 0
+        self.filas = []
+
+    def aplicar(self, cambios: list) -> bool:
+        """Aplica Cambios (en orden de versión) al total y a las filas guardadas.
+
+        Retorna True si no se pudieron aplicar y hay que volver a cargar.
+        """
+        cambios = [c for c in cambios if c.version > self.version]  # Ya incluidos al recargar
+        if not cambios:
+            return False
+        if len(cambios) > self.MAXIMO_PARCHE:
+            return True
+        for cambio in cambios:
+            if cambio.clave is None or cambio.version != self.version + 1:
+                return True
+            self.version = cambio.version
+            self._aplicar_uno(cambio)
+        return False
+
+    def _aplicar_uno(self, cambio: Cambio) -> None:
+        """Deja el trozo en el estado que describe `cambio` (aplicarlo dos veces no
+        cambia nada): "added" de una clave guardada solo pone sus valores, porque ya
+        contaba en `total` (es un set/put sobre una clave que existía), y "removed"
+        de una clave que se sabe que no está no toca `total`."""
+        i = next((i for i, (k, _) in enumerate(self.filas) if k == cambio.clave), None)
+        if cambio.tipo == "changed":
+            if i is not None:
+                key, val = self.filas[i]
+                self.filas[i] = (key, {**val, **cambio.valores})
+            return
+        if i is not None:
+            if cambio.tipo == "removed":
+                del self.filas[i]
+                self.total -= 1
+            else:
+                self.filas[i] = (cambio.clave, cambio.valores)
+            return
+
+        # Clave fuera de lo guardado: importa si va antes, dentro o tras el final
+        orden = self.servicio.sort_key(cambio.clave)
+        antes = dentro = False
+        if self.filas:
+            antes = orden < self.servicio.sort_key(self.filas[0][0])
+            llega_al_final = self.inicio + len(self.filas) == self.total
+            # Su sitio cae en lo guardado (o tras la última fila de la tabla) y no está
+            dentro = not antes and (llega_al_final or orden < self.servicio.sort_key(self.filas[-1][0]))
+        if cambio.tipo == "removed":
+            if dentro or (antes and self.inicio == 0) or self.total == 0:
+                return  # Ya no estaba: nada que quitar
+            self.total -= 1
+            if antes:
+                self.inicio -= 1
+            return
+        self.total += 1
+        if antes:
+            self.inicio += 1
+        elif dentro:
+            ordenes = [self.servicio.sort_key(k) for k, _ in self.filas]
+            self.filas.insert(bisect.bisect(ordenes, orden), (cambio.clave, cambio.valores))
+
+    def limites(self, offset: int, cantidad: int) -> tuple:
+        """Ajusta [offset, offset + cantidad) al total; retorna (offset, fin)."""
+        offset = max(0, min(offset, self.total - cantidad))
+        return offset, min(self.total, offset + cantidad)
+
+    def filas_en(self, offset: int, cantidad: int) -> list:
+        """Filas [offset, offset + cantidad), consultando al servicio (y esperando)
+        lo que falte (menos filas si se acaba la tabla)."""
+        offset, fin = self.limites(offset, cantidad)
+        while (pedido := self.pedido_para(offset, fin)) is not None:
+            metodo, argumentos = pedido[0], pedido[1]
+            self.consultas += 1
+            if not self.incorporar(pedido, getattr(self.servicio, metodo)(**argumentos)):
+                break
+            offset, fin = self.limites(offset, fin - offset)
+        return [fila for fila in self.guardadas(offset, fin) if fila is not None]
+
+    def guardadas(self, offset: int, fin: int) -> list:
+        """Filas [offset, fin) ya guardadas, con None en las que aún no están."""
+        return [self.filas[i - self.inicio] if self.inicio <= i < self.inicio + len(self.filas)
+                else None for i in range(offset, fin)]
+
+    def pedido_para(self, offset: int, fin: int) -> tuple | None:
+        """Consulta que acerca lo guardado a [offset, fin), o None si ya está todo.
+
+        Retorna (metodo, argumentos, offset, fin): el servicio.<metodo>(**argumentos)
+        responde (versión, filas), que se pasa tal cual a incorporar().
+        """
+        fin_guardado = self.inicio + len(self.filas)
+        if self.inicio <= offset and fin <= fin_guardado:
+            return None
+        if self.filas and self.inicio <= offset <= fin_guardado + self.pagina:
+            # Cerca por detrás: seguimos desde la última clave hacia delante
+            argumentos = {"start_after": self.filas[-1][0], "limit": self.pagina}
+        elif self.filas and offset < self.inicio <= fin + self.pagina:
+            # Cerca por delante: retrocedemos desde la primera clave
+            argumentos = {"end_before": self.filas[0][0], "limit": min(self.pagina, self.inicio)}
+        else:
+            # Salto lejano: página centrada más o menos en el destino
+            inicio = max(0, offset - self.pagina // 4)
+            argumentos = {"offset": inicio, "limit": max(self.pagina, fin - inicio)}
+            return ("get_page_at_with_version", argumentos, offset, fin)
+        return ("get_page_with_version", argumentos, offset, fin)
+
+    def incorporar(self, pedido: tuple, respuesta: tuple) -> bool:
+        """Guarda la respuesta (versión, filas) a `pedido`. Retorna False si no sirvió:
+        se leyó en otra versión que la del trozo (los Cambios de por medio se
+        contarían dos veces o nunca), ya no encaja, o vino vacía porque se borraron
+        filas mientras tanto."""
+        metodo, argumentos, offset, fin = pedido
+        version, nuevas = respuesta
+        if version != self.version:
+            return False  # Hay que aplicar antes los Cambios que faltan y volver a pedir
+        if metodo == "get_page_at_with_version":
+            self.inicio = argumentos["offset"]
+            self.filas = nuevas
+            if not nuevas:
+                self.total = min(self.total, self.inicio)
+            return bool(nuevas)
+        if "start_after" in argumentos:
+            if not self.filas or self.filas[-1][0] != argumentos["start_after"]:
+                return False
+            if not nuevas:
+                self.total = self.inicio + len(self.filas)
+                return False
+            self.filas.extend(nuevas)
+            sobran = min(len(self.filas) - self.maximo, offset - self.inicio)
+            if sobran > 0:
+                del self.filas[:sobran]
+                self.inicio += sobran
+            return True
+        if not self.filas or self.filas[0][0] != argumentos["end_before"]:
+            return False
+        if not nuevas:
+            # No hay nada antes aunque inicio > 0: lo guardado no cuadra, empezamos de nuevo
+            self.inicio, self.filas = 0, []
+            return False
+        self.filas[:0] = nuevas
+        self.inicio -= len(nuevas)
+        sobran = min(len(self.filas) - self.maximo, self.inicio + len(self.filas) - fin)
+        if sobran > 0:
+            del self.filas[-sobran:]
+        return True
+
+# ----------------------- LLAMADAS EN SEGUNDO PLANO -----------------------
+class DespachadorTk:
+    """Lleva funciones desde cualquier hilo al hilo de Tk.
+
+    Tkinter solo se puede usar desde el hilo que creó la ventana. Los otros hilos
+    dejan la función en una cola y el hilo de Tk la vacía cada `intervalo_ms` con
+    after(); desde el propio hilo de Tk se usa after_idle directamente.
+    """
+
+    def __init__(self, raiz, intervalo_ms: int = 20):
+        self.raiz = raiz
+        self.intervalo_ms = intervalo_ms
+        self.hilo_tk = threading.current_thread()
+        self._cola = queue.SimpleQueue()
+        self._id_after = self.raiz.after(self.intervalo_ms, self._vaciar)
+
+    def llamar(self, funcion: Callable, *args) -> None:
+        """Ejecuta funcion(*args) en el hilo de Tk (se puede llamar desde cualquier hilo)."""
+        if threading.current_thread() is self.hilo_tk:
+            self.raiz.after_idle(funcion, *args)
+        else:
+            self._cola.put((funcion, args))
+
+    def detener(self) -> None:
+        """Deja de revisar la cola (antes de destruir la ventana)."""
+        if self._id_after is not None:
+            self.raiz.after_cancel(self._id_after)
+            self._id_after = None
+
+    def _vaciar(self):
+        while not self._cola.empty():
+            funcion, args = self._cola.get()
+            try:
+                funcion(*args)
+            except Exception as ex:  # Un error en un aviso no debe parar el despachador
+                print(f"[DespachadorTk] Error en {funcion}: {ex!r}", file=sys.stderr)
+        self._id_after = self.raiz.after(self.intervalo_ms, self._vaciar)
+
+
+class ServicioAsincrono:
+    """Fachada de FirebaseService que hace cada llamada en un pool de hilos.
+
+    ejecutar("push", datos, al_terminar=...) retorna enseguida un Future; cuando la
+    llamada termina, al_terminar(resultado) o al_fallar(excepcion) se ejecutan en
+    el hilo de Tk (vía DespachadorTk), así la ventana nunca espera a la red.
+
+    grupo: las llamadas con el mismo grupo se reemplazan; al pedir una nueva se
+    cancela la anterior si aún no empezó y, si ya empezó, su resultado se descarta
+    (por ejemplo, varios "Refrescar" seguidos solo pintan el último).
+
+    al_cambiar_ocupado(n) se llama (en el hilo de Tk) cada vez que cambia el número
+    de llamadas pendientes, para mostrar un indicador de actividad.
+
+    latencia: segundos de espera artificial antes de cada llamada, para comprobar
+    cómo se comporta la interfaz con una red lenta.
+    """
+
+    def __init__(self, servicio: FirebaseService, despachador: DespachadorTk,
+                 hilos: int = 4, latencia: float = 0.0):
+        self.servicio = servicio
+        self.despachador = despachador
+        self.latencia = latencia
+        self.al_cambiar_ocupado = None  # función(pendientes) en el hilo de Tk
+        self.pendientes = 0
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=hilos,
+                                                           thread_name_prefix="FirebaseService")
+        self._bloqueo = threading.Lock()
+        self._ultimo_de_grupo = {}  # grupo -> Future más reciente
+
+    def ejecutar(self, metodo: str, *args, al_terminar: Callable | None = None,
+                 al_fallar: Callable | None = None, grupo: str | None = None,
+                 **kwargs) -> concurrent.futures.Future:
+        """Llama a servicio.<metodo>(*args, **kwargs) en segundo plano."""
+        funcion = getattr(self.servicio, metodo)
+        future = self._pool.submit(self._llamar, funcion, args, kwargs)
+        with self._bloqueo:
+            self.pendientes += 1
+            anterior = self._ultimo_de_grupo.get(grupo) if grupo else None
+            if grupo:
+                self._ultimo_de_grupo[grupo] = future
+        if anterior is not None:
+            anterior.cancel()  # Solo funciona si aún no empezó; si no, se descarta al final
+        self._avisar_ocupado()
+        future.add_done_callback(
+            lambda f: self._terminado(f, metodo, grupo, al_terminar, al_fallar))
+        return future
+
+    def cerrar(self) -> None:
+        """Cancela lo que no empezó y no espera a lo que está en curso."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _llamar(self, funcion, args, kwargs):
+        if self.latencia:
+            time.sleep(self.latencia)
+        return funcion(*args, **kwargs)
+
+    def _terminado(self, future, metodo, grupo, al_terminar, al_fallar):
+        # Se ejecuta en el hilo del pool (o en el que canceló): solo se toca la cola
+        with self._bloqueo:
+            self.pendientes -= 1
+            reemplazado = grupo is not None and self._ultimo_de_grupo.get(grupo) is not future
+            if grupo is not None and not reemplazado:
+                del self._ultimo_de_grupo[grupo]
+        self._avisar_ocupado()
+        if future.cancelled() or reemplazado:
+            return
+        error = future.exception()
+        if error is not None:
+            if al_fallar is not None:
+                self.despachador.llamar(al_fallar, error)
+            else:
+                print(f"[ServicioAsincrono] Error en {metodo}: {error!r}", file=sys.stderr)
+        elif al_terminar is not None:
+            self.despachador.llamar(al_terminar, future.result())
+
+    def _avisar_ocupado(self):
+        if self.al_cambiar_ocupado is not None:
+            self.despachador.llamar(lambda: self.al_cambiar_ocupado(self.pendientes))
 
 
 # ----------------------- INTERFAZ GRÁFICA (Tkinter) -----------------------
@@ -217,19 +1318,33 @@ class AppGUI(tk.Tk):
     """Clase principal de la aplicación gráfica que hereda de tk.Tk.
 
     Esta clase crea un contenedor donde se apilan distintas vistas (frames).
+    Las vistas hablan con la base de datos a través de `self.servicio`
+    (ServicioAsincrono), así la ventana sigue respondiendo aunque la red tarde.
     """
 
-    def __init__(self, firebase_service: FirebaseService):
+    def __init__(self, firebase_service: FirebaseService, latencia: float = 0.0):
         # Llamamos al constructor de tk.Tk que crea la ventana real.
         super().__init__()
 
         # Guardamos la referencia al servicio de persistencia (inyección de dependencias).
         self.firebase = firebase_service
+        # Fachada que hace las llamadas en segundo plano y trae los resultados a Tk
+        self.despachador = DespachadorTk(self)
+        self.servicio = ServicioAsincrono(firebase_service, self.despachador, latencia=latencia)
+        self.servicio.al_cambiar_ocupado = self._al_cambiar_ocupado
+        self.protocol("WM_DELETE_WINDOW", self.cerrar)
 
         # Configuramos la ventana principal: título y tamaño inicial.
         self.title("POO + Tkinter + Firebase - Demo")
         self.geometry("560x380")
 
+        # Barra de estado abajo: indicador de actividad mientras haya llamadas pendientes
+        barra = ttk.Frame(self)
+        barra.pack(side="bottom", fill="x", padx=8, pady=(0, 4))
+        self.actividad = ttk.Progressbar(barra, mode="indeterminate", length=80)
+        self.actividad_var = tk.StringVar()
+        ttk.Label(barra, textvariable=self.actividad_var).pack(side="left")
+
         # Creamos un contenedor que alojará las vistas apiladas.
         container = ttk.Frame(self)
         container.pack(fill="both", expand=True)
@@ -259,6 +1374,24 @@ class AppGUI(tk.Tk):
         frame = self.frames[name]
         frame.tkraise()
 
+    def _al_cambiar_ocupado(self, pendientes: int) -> None:
+        # Mostramos la barra animada solo mientras hay llamadas en curso
+        if pendientes:
+            self.actividad_var.set(f"Conectando con la base de datos... ({pendientes})")
+            if not self.actividad.winfo_ismapped():
+                self.actividad.pack(side="right")
+                self.actividad.start(15)
+        else:
+            self.actividad_var.set("")
+            self.actividad.stop()
+            self.actividad.pack_forget()
+
+    def cerrar(self) -> None:
+        """Cierra la ventana sin esperar a las llamadas que sigan en curso."""
+        self.servicio.cerrar()
+        self.despachador.detener()
+        self.destroy()
+
 
 # ----------------------- VISTAS / FRAMES -----------------------
 class HomeView(ttk.Frame):
@@ -317,7 +1450,9 @@ class RegisterView(ttk.Frame):
         action = ttk.Frame(self)
         action.pack(pady=12)
 
-        ttk.Button(action, text="Guardar", command=self.guardar).pack(side="left", padx=6)
+        # Guardamos el botón para desactivarlo mientras se guarda
+        self.boton_guardar = ttk.Button(action, text="Guardar", command=self.guardar)
+        self.boton_guardar.pack(side="left", padx=6)
         ttk.Button(action, text="Volver", command=lambda: controller.show_frame("HomeView")).pack(side="left", padx=6)
 
         # Aseguramos que la columna 1 crezca (para que Entry se expanda)
@@ -345,18 +1480,45 @@ class RegisterView(ttk.Frame):
         # Convertimos a diccionario para persistir
         data = usuario.to_dict()
 
-        # Guardamos usando el servicio de persistencia inyectado en el controlador
-        key = self.controller.firebase.push(data)
+        # Guardamos en segundo plano; mientras tanto el botón queda desactivado
+        self.boton_guardar.state(["disabled"])
+        self.controller.servicio.ejecutar(
+            "push", data,
+            al_terminar=lambda key: self._guardado(usuario, key),
+            al_fallar=self._error_al_guardar)
 
+    def _guardado(self, usuario: Usuario, key: str):
+        """Se ejecuta en el hilo de Tk cuando push() terminó."""
+        self.boton_guardar.state(["!disabled"])
         # Mensaje de éxito y limpiar campos
         messagebox.showinfo("Éxito", f"{usuario.tipo()} guardado con clave {key}")
         self.nombre_var.set("")
         self.correo_var.set("")
         self.tipo_var.set("Usuario")
 
+    def _error_al_guardar(self, error: Exception):
+        self.boton_guardar.state(["!disabled"])
+        messagebox.showerror("Error", f"No se pudo guardar: {error}")
+
 
 class ListView(ttk.Frame):
-    """Vista para listar, actualizar y eliminar registros."""
+    """Vista para listar, actualizar y eliminar registros.
+
+    La tabla es virtual: el Treeview solo tiene tantos items como filas caben en
+    pantalla y, al desplazarse, se reutilizan cambiando sus valores. Los datos se
+    piden por páginas a través de VentanaDatos, así que abrir una tabla de un
+    millón de usuarios cuesta lo mismo que abrir una de cien.
+
+    La vista está suscrita a los cambios del servicio: las altas, cambios y bajas
+    se aplican solas, juntando todas las que lleguen seguidas en un único
+    repintado cuando Tk queda libre, y solo se tocan los items cuyo texto cambia.
+
+    Todas las consultas van por ServicioAsincrono: mientras llega una página se
+    ven filas "Cargando..." y la ventana sigue respondiendo; si se pide otra
+    página u otro refresco antes de que llegue, el anterior se descarta.
+    """
+
+    PASO_RUEDA = 3  # Filas que avanza cada paso de la rueda del ratón
 
     def __init__(self, parent, controller: AppGUI):
         super().__init__(parent)
@@ -384,9 +1546,44 @@ class ListView(ttk.Frame):
         self.tree.column("correo", width=160, anchor="w")
         self.tree.column("tipo", width=80, anchor="w")
 
+        # Barra de desplazamiento propia: recorre todas las filas del backend,
+        # no solo los items que existen en el Treeview
+        self.scroll = ttk.Scrollbar(table_frame, orient="vertical", command=self._desplazar_barra)
+        self.scroll.pack(side="right", fill="y")
+
         # Empaquetamos
         self.tree.pack(fill="both", expand=True)
 
+        # Estado de la tabla virtual
+        self.datos = VentanaDatos(controller.firebase)
+        self.posicion = 0  # Índice (en todo el backend) de la primera fila visible
+        self.filas_visibles = 10  # Se recalcula con el alto real del Treeview
+        self._items = []  # Items del Treeview que se reutilizan
+        self._clave_seleccionada = None  # La selección sigue a la clave, no al item
+        self._pintar_pendiente = False
+        self._valores = {}  # iid -> valores mostrados (para tocar solo lo que cambia)
+        self._ocultos = set()  # Items sobrantes quitados de la tabla con detach
+        self._clave_arriba = None  # Clave de la primera fila visible
+        self._cambios = queue.SimpleQueue()  # Cambios del servicio aún sin aplicar
+        self._parche_pendiente = False
+        self._recargando = False  # Hay un refresco en curso (los cambios esperan)
+        self._pedido_en_curso = None  # Página pedida al servicio que aún no llegó
+
+        # Eventos: cambio de tamaño, rueda del ratón (Windows/macOS y Linux), teclado
+        self.tree.bind("<Configure>", self._al_redimensionar)
+        self.tree.bind("<MouseWheel>", lambda e: self.desplazar(-self.PASO_RUEDA if e.delta > 0 else self.PASO_RUEDA))
+        self.tree.bind("<Button-4>", lambda e: self.desplazar(-self.PASO_RUEDA))
+        self.tree.bind("<Button-5>", lambda e: self.desplazar(self.PASO_RUEDA))
+        self.tree.bind("<Prior>", lambda e: self.desplazar(-self.filas_visibles))
+        self.tree.bind("<Next>", lambda e: self.desplazar(self.filas_visibles))
+        self.tree.bind("<Home>", lambda e: self.ir_a(0))
+        self.tree.bind("<End>", lambda e: self.ir_a(self.datos.total))
+        self.tree.bind("<<TreeviewSelect>>", self._al_seleccionar)
+
+        # Contador "filas x–y de N"
+        self.info_var = tk.StringVar()
+        ttk.Label(self, textvariable=self.info_var).pack()
+
         # Botones de acciones: actualizar y borrar
         action = ttk.Frame(self)
         action.pack(pady=8)
@@ -394,25 +1591,184 @@ class ListView(ttk.Frame):
         ttk.Button(action, text="Eliminar seleccionado", command=self.eliminar_seleccionado).pack(side="left", padx=6)
         ttk.Button(action, text="Volver", command=lambda: controller.show_frame("HomeView")).pack(side="left", padx=6)
 
+        # Nos suscribimos antes de cargar: los cambios ya incluidos se descartan por versión
+        self._cancelar_suscripcion = controller.firebase.subscribe(self._al_cambio)
+        self.bind("<Destroy>", lambda e: self._cancelar_suscripcion() if e.widget is self else None)
+
         # Cargamos la lista la primera vez
         self.refrescar()
 
     def refrescar(self):
-        """Recupera datos del servicio y muestra en el Treeview."""
-        # Limpiamos contenido actual del Treeview
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-
-        datos = self.controller.firebase.get_all()
-
-        # `datos` es un dict: clave -> dict(campos)
-        for key, val in datos.items():
-            # Mostramos los campos de forma segura (puede faltar alguno)
-            nombre = val.get("nombre", "")
-            correo = val.get("correo", "")
-            tipo = val.get("tipo", "")
-            # Insertamos una fila
-            self.tree.insert("", "end", values=(key, nombre, correo, tipo))
+        """Vuelve a leer el total del servicio (en segundo plano) y repinta al llegar."""
+        self._recargando = True
+        self.info_var.set("Cargando...")
+        self.controller.servicio.ejecutar("count_with_version", grupo="lista-recarga",
+                                          al_terminar=self._al_recargar,
+                                          al_fallar=self._error_de_carga)
+
+    def _al_recargar(self, resultado: tuple):
+        self._recargando = False
+        self._pedido_en_curso = None
+        self.datos.reiniciar(*resultado)
+        # Aplicamos los cambios que llegaron mientras tanto (y pintamos)
+        self._aplicar_cambios()
+
+    def _error_de_carga(self, error: Exception):
+        self._recargando = False
+        self._pedido_en_curso = None
+        self.info_var.set(f"Error al cargar: {error}")
+
+    # --- desplazamiento ---
+    def desplazar(self, filas: int):
+        """Mueve la ventana visible `filas` posiciones (negativo = hacia arriba)."""
+        self.ir_a(self.posicion + filas)
+        return "break"  # Que el Treeview no procese también el evento
+
+    def ir_a(self, posicion: int):
+        """Coloca la fila `posicion` arriba del todo (se ajusta a los límites)."""
+        self.posicion = max(0, min(posicion, self.datos.total - self.filas_visibles))
+        self._pintar_pronto()
+        return "break"
+
+    def _desplazar_barra(self, accion, cantidad, unidad=None):
+        # La barra llama con ("moveto", fracción) o ("scroll", n, "units"|"pages")
+        if accion == "moveto":
+            self.ir_a(int(float(cantidad) * self.datos.total))
+        else:
+            paso = self.filas_visibles if unidad == "pages" else 1
+            self.ir_a(self.posicion + int(cantidad) * paso)
+
+    def _pintar_pronto(self):
+        """Agrupa varios desplazamientos seguidos (p. ej. arrastrar la barra) en un solo
+        repintado cuando Tk quede libre."""
+        if not self._pintar_pendiente:
+            self._pintar_pendiente = True
+            self.after_idle(self._pintar)
+
+    def _al_redimensionar(self, event):
+        # Filas que caben = (alto - cabecera) / alto de fila, medido con el primer item
+        caja = self.tree.bbox(self._items[0]) if self._items else None
+        if not caja:
+            return
+        cabecera, alto_fila = caja[1], caja[3]
+        filas = max(1, (event.height - cabecera) // alto_fila)
+        if filas != self.filas_visibles:
+            self.filas_visibles = filas
+            self._pintar_pronto()
+
+    def _al_seleccionar(self, _event):
+        sel = self.tree.selection()
+        if sel:
+            self._clave_seleccionada = self.tree.set(sel[0], "key")
+
+    # --- cambios del servicio ---
+    def _al_cambio(self, cambio: Cambio):
+        """Suscriptor: solo encola; el trabajo se hace una vez por ciclo libre de Tk.
+
+        Puede llamarse desde cualquier hilo (pool de ServicioAsincrono o listener
+        online), por eso no toca Tk directamente sino a través del despachador.
+        """
+        self._cambios.put(cambio)
+        self.controller.despachador.llamar(self._programar_parche)
+
+    def _programar_parche(self):
+        if not self._parche_pendiente:
+            self._parche_pendiente = True
+            self.after_idle(self._aplicar_cambios)
+
+    def _aplicar_cambios(self):
+        """Aplica de golpe todos los cambios encolados y repinta una sola vez."""
+        self._parche_pendiente = False
+        if self._recargando:
+            return  # Se aplicarán al llegar el total (_al_recargar)
+        if self._vaciar_cambios():
+            self.refrescar()  # Faltan cambios o son demasiados: recarga completa
+            return
+        self._pintar()
+
+    def _vaciar_cambios(self) -> bool:
+        """Pasa a self.datos los cambios encolados, sin pintar. True si hay que recargar."""
+        cambios = []
+        while not self._cambios.empty():
+            cambios.append(self._cambios.get())
+        if self.datos.aplicar(cambios):
+            return True
+        # Mantener arriba la misma fila aunque se inserten o borren otras antes
+        for i, (key, _) in enumerate(self.datos.filas):
+            if key == self._clave_arriba:
+                self.posicion = self.datos.inicio + i
+                break
+        return False
+
+    # --- pintado ---
+    def _pintar(self):
+        """Muestra las filas [posicion, posicion + filas_visibles) reutilizando items."""
+        self._pintar_pendiente = False
+        self.posicion, fin = self.datos.limites(self.posicion, self.filas_visibles)
+        filas = self.datos.guardadas(self.posicion, fin)  # None = aún no ha llegado
+        pedido = self.datos.pedido_para(self.posicion, fin)
+        if pedido is not None and not self._recargando:
+            self._pedir(pedido)
+
+        # Solo se crean items nuevos si la tabla creció de alto; nunca al desplazarse
+        while len(self._items) < self.filas_visibles:
+            self._items.append(self.tree.insert("", "end", values=("", "", "", "")))
+
+        seleccion = ()
+        for i, iid in enumerate(self._items):
+            if i < len(filas):
+                if filas[i] is None:
+                    key, valores = None, ("", "Cargando...", "", "")
+                else:
+                    key, val = filas[i]
+                    # Mostramos los campos de forma segura (puede faltar alguno)
+                    valores = (key, val.get("nombre", ""), val.get("correo", ""), val.get("tipo", ""))
+                if self._valores.get(iid) != valores:
+                    self.tree.item(iid, values=valores)
+                    self._valores[iid] = valores
+                if iid in self._ocultos:
+                    self.tree.move(iid, "", i)
+                    self._ocultos.discard(iid)
+                if key == self._clave_seleccionada:
+                    seleccion = (iid,)
+            elif iid not in self._ocultos:
+                self.tree.detach(iid)  # Sobran items: se ocultan, no se borran
+                self._ocultos.add(iid)
+        self._clave_arriba = filas[0][0] if filas and filas[0] is not None else None
+        if self.tree.selection() != seleccion:
+            self.tree.selection_set(seleccion)
+
+        # Barra y contador
+        total = self.datos.total
+        if total:
+            self.scroll.set(self.posicion / total, (self.posicion + len(filas)) / total)
+            self.info_var.set(f"Filas {self.posicion + 1}–{self.posicion + len(filas)} de {total}")
+        else:
+            self.scroll.set(0, 1)
+            self.info_var.set("Sin registros")
+
+    def _pedir(self, pedido: tuple):
+        """Pide una página en segundo plano (si no está ya pedida)."""
+        if pedido == self._pedido_en_curso:
+            return
+        self._pedido_en_curso = pedido
+        metodo, argumentos = pedido[0], pedido[1]
+        self.controller.servicio.ejecutar(metodo, grupo="lista-pagina",
+                                          al_terminar=lambda respuesta: self._al_llegar_pagina(pedido, respuesta),
+                                          al_fallar=self._error_de_carga, **argumentos)
+
+    def _al_llegar_pagina(self, pedido: tuple, respuesta: tuple):
+        if pedido == self._pedido_en_curso:
+            self._pedido_en_curso = None
+        if self._recargando:
+            return  # La recarga vuelve a pintar (y a pedir) al llegar el total
+        # La página pudo leerse después de cambios que aún esperan en la cola: se
+        # aplican antes, y si aun así no es de la misma versión, incorporar la descarta
+        if self._vaciar_cambios():
+            self.refrescar()
+            return
+        self.datos.incorporar(pedido, respuesta)
+        self._pintar()  # Si aún falta algo, pide la siguiente página
 
     def eliminar_seleccionado(self):
         """Elimina la fila seleccionada tanto de la vista como de la persistencia."""
@@ -424,20 +1780,104 @@ class ListView(ttk.Frame):
         # Obtenemos la clave almacenada en la primera columna
         values = self.tree.item(sel[0], "values")
         key = values[0]
+        if not key:  # Fila "Cargando..."
+            return
 
         # Confirmación
         if not messagebox.askyesno("Confirmar", "¿Eliminar el registro seleccionado?"):
             return
 
-        # Borramos usando el servicio
-        self.controller.firebase.delete(key)
-        # Refrescamos la vista
-        self.refrescar()
-        messagebox.showinfo("Hecho", "Registro eliminado")
+        # Borramos en segundo plano; la fila desaparece con el aviso de cambio
+        self._clave_seleccionada = None
+        self.controller.servicio.ejecutar(
+            "delete", key,
+            al_terminar=lambda _: messagebox.showinfo("Hecho", "Registro eliminado"),
+            al_fallar=lambda error: messagebox.showerror("Error", f"No se pudo eliminar: {error}"))
+
+
+# ----------------------- BENCHMARK DE LA LISTA -----------------------
+def benchmark_lista(registros: int = 1_000_000) -> dict:
+    """Mide abrir y recorrer la lista virtual sobre un almacén offline de `registros` filas.
+
+    Sin pantalla mide solo el camino de datos (contar + pedir páginas); si hay
+    pantalla, mide además crear AppGUI hasta que la lista está pintada.
+    """
+    import tempfile
+
+    resultado = {"registros": registros}
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "lista.db")
+        almacen = AlmacenLocal(ruta)
+        ejemplo = Cliente("Ana", "ana@example.com", puntos=3).to_dict()
+        for inicio in range(0, registros, 50_000):
+            almacen.push_many([ejemplo] * min(50_000, registros - inicio))
+        almacen.close()
+
+        t0 = time.perf_counter()
+        servicio = FirebaseService(local_path=ruta)
+        datos = VentanaDatos(servicio)
+        datos.recargar()
+        datos.filas_en(0, 30)
+        resultado["abrir_ms"] = (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        datos.filas_en(registros // 2, 30)  # Arrastrar la barra a la mitad
+        resultado["salto_ms"] = (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        posicion, pasos, consultas = registros // 2, 5_000, datos.consultas
+        for _ in range(pasos):  # Rueda del ratón hacia abajo
+            posicion += ListView.PASO_RUEDA
+            datos.filas_en(posicion, 30)
+        resultado["rueda_us"] = (time.perf_counter() - t0) / pasos * 1e6
+        resultado["consultas_rueda"] = datos.consultas - consultas
+        resultado["filas_en_memoria"] = len(datos.filas)
+
+        try:
+            t0 = time.perf_counter()
+            app = AppGUI(servicio)
+            lista = app.frames["ListView"]
+            # Las páginas llegan en segundo plano: esperamos a ver la primera fila
+            while not lista.datos.filas and time.perf_counter() - t0 < 10:
+                app.update()
+            resultado["abrir_gui_ms"] = (time.perf_counter() - t0) * 1000
+            resultado["items_treeview"] = len(lista.tree.get_children())
+            app.cerrar()
+        except tk.TclError as ex:  # Sin pantalla (por ejemplo, en un servidor)
+            resultado["abrir_gui_ms"] = None
+            print("[benchmark] Sin pantalla, no se mide la ventana:", ex)
+        servicio.local.close()
+
+    for clave, valor in resultado.items():
+        print(f"  {clave:<18} {valor:.1f}" if isinstance(valor, float) else f"  {clave:<18} {valor}")
+    return resultado
 
 
 # ----------------------- PUNTO DE ENTRADA -----------------------
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Demo POO + Tkinter + Firebase")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="medir CRUD del almacén offline con 1k...1M registros y salir")
+    parser.add_argument("--benchmark-lista", type=int, metavar="N", nargs="?", const=1_000_000,
+                        help="medir abrir y recorrer la lista virtual con N registros y salir")
+    parser.add_argument("--benchmark-lotes", type=int, metavar="N", nargs="?", const=1000,
+                        help="comparar escrituras una a una y por lotes con N usuarios y salir")
+    parser.add_argument("--latencia", type=float, default=0.0,
+                        help="segundos de espera artificial en cada llamada a la base de datos")
+    parser.add_argument("--offline-db", default=RUTA_OFFLINE,
+                        help="archivo SQLite del modo offline (':memory:' = no guardar)")
+    args = parser.parse_args()
+    if args.benchmark or args.benchmark_lista or args.benchmark_lotes:
+        if args.benchmark:
+            benchmark_almacen()
+        if args.benchmark_lista:
+            benchmark_lista(args.benchmark_lista)
+        if args.benchmark_lotes:
+            benchmark_lotes(args.benchmark_lotes, latencia=args.latencia or 0.002)
+        raise SystemExit
+
     # Ruta donde el usuario puede colocar su archivo de credenciales JSON.
     # Si no usas Firebase, puedes dejar el valor por defecto y el programa seguirá
     # funcionando en modo OFFLINE.
@@ -448,10 +1888,11 @@ if __name__ == "__main__":
     DATABASE_URL = ""  # <- PON AQUÍ tu databaseURL si quieres conectar a Firebase
 
     # Inicializamos el servicio de persistencia
-    firebase_service = FirebaseService(cred_path=SERVICE_ACCOUNT_PATH, database_url=DATABASE_URL)
+    firebase_service = FirebaseService(cred_path=SERVICE_ACCOUNT_PATH, database_url=DATABASE_URL,
+                                       local_path=args.offline_db)
 
     # Creamos y arrancamos la interfaz (inyectando la dependencia)
-    app = AppGUI(firebase_service)
+    app = AppGUI(firebase_service, latencia=args.latencia)
     app.mainloop()
 
 # FIN DEL ARCHIVO
@@ -0,0 +1,110 @@
+"""Pruebas de AlmacenLocal (el archivo SQLite del modo offline)."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from estudioparcial import AlmacenLocal  # noqa: E402
+
+
+@pytest.fixture
+def ruta(tmp_path):
+    return str(tmp_path / "usuarios.db")
+
+
+@pytest.fixture
+def almacen(ruta):
+    almacen = AlmacenLocal(ruta)
+    yield almacen
+    almacen.close()
+
+
+def test_datos_y_contadores_sobreviven_al_reabrir(ruta):
+    almacen = AlmacenLocal(ruta)
+    a, b, c = almacen.push_many([{"nombre": "A"}, {"nombre": "B"}, {"nombre": "C"}])
+    almacen.update(a, {"rol": "admin"})
+    almacen.delete(c)  # La clave más alta ya no existe, pero no debe volver a salir
+    version = almacen.version
+    almacen.close()
+
+    almacen = AlmacenLocal(ruta)
+    assert almacen.get_all() == {a: {"nombre": "A", "rol": "admin"}, b: {"nombre": "B"}}
+    assert almacen.version == version
+    nueva = almacen.push({"nombre": "D"})
+    assert nueva not in (a, b, c) and almacen._orden(nueva) > almacen._orden(c)
+    almacen.close()
+
+
+def test_update_mezcla_campos(almacen):
+    key = almacen.push({"nombre": "Ana", "rol": "cliente"})
+    assert almacen.update(key, {"rol": "admin", "edad": 30})
+    assert almacen.get(key) == {"nombre": "Ana", "rol": "admin", "edad": 30}
+
+
+def test_update_y_delete_de_clave_inexistente(almacen):
+    version = almacen.version
+    assert not almacen.update("local_99", {"x": 1})
+    assert not almacen.delete("local_99")
+    assert almacen.version == version  # Nada cambió: la versión no avanza
+    assert "local_99" not in almacen and len(almacen) == 0
+
+
+def test_delete(almacen):
+    a, b = almacen.push_many([{"i": 1}, {"i": 2}])
+    assert almacen.delete(a)
+    assert a not in almacen and almacen.get(a) is None
+    assert list(almacen.get_all()) == [b]
+
+
+def test_rollback_no_deja_nada_a_medias(almacen):
+    avisos = []
+    almacen.al_cambiar = avisos.append
+    existente = almacen.push({"i": 0})
+    version = almacen.version
+    avisos.clear()
+    with pytest.raises(TypeError):  # El segundo objeto no se puede guardar como JSON
+        almacen.push_many([{"i": 1}, {"i": object()}])
+    with pytest.raises(TypeError):
+        almacen.apply_batch({existente: ("update", {"i": 5}), "local_50": ("set", {"x": object()})})
+    assert almacen.get_all() == {existente: {"i": 0}}
+    assert almacen.version == version and avisos == []
+    # La conexión sigue utilizable tras el ROLLBACK
+    almacen.push({"i": 2})
+    assert [c.tipo for c in avisos] == ["added"] and almacen.version == version + 1
+
+
+def test_cada_cambio_avisa_tras_el_commit(almacen):
+    avisos = []
+    almacen.al_cambiar = avisos.append
+    key = almacen.push({"i": 1})
+    almacen.update(key, {"i": 2})
+    almacen.delete(key)
+    assert [(c.version, c.tipo, c.clave) for c in avisos] == [
+        (1, "added", key), (2, "changed", key), (3, "removed", key)]
+
+
+def test_clave_ajena_no_choca_con_local(almacen):
+    claves = almacen.push_many([{"i": i} for i in range(6)])
+    assert "local_5" in claves
+    almacen.apply_batch({"abc_5": ("set", {"ajena": True})})  # Antes compartía n con local_5
+    assert almacen.get("abc_5") == {"ajena": True} and almacen.get("local_5") == {"i": 4}
+    assert almacen._orden("abc_5") not in (almacen._orden(k) for k in claves)
+    nueva = almacen.push({"i": 6})
+    assert len(almacen) == 8 and nueva not in claves
+    assert list(almacen.get_all()) == claves + ["abc_5", nueva]  # Orden de inserción
+
+
+def test_set_de_local_importada_avanza_el_contador(almacen):
+    almacen.apply_batch({"local_40": ("set", {"importada": True})})
+    assert almacen.push({"i": 1}) == "local_41"
+
+
+def test_set_sobre_clave_existente_la_reemplaza(almacen):
+    key = almacen.push({"nombre": "Ana", "rol": "cliente"})
+    almacen.apply_batch({key: ("set", {"nombre": "Ana"})})
+    almacen.apply_batch({"abc": ("set", {"v": 1})})
+    almacen.apply_batch({"abc": ("set", {"v": 2})})
+    assert almacen.get_all() == {key: {"nombre": "Ana"}, "abc": {"v": 2}}
+
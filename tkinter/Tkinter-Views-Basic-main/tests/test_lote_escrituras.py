@@ -0,0 +1,84 @@
+"""Pruebas de LoteEscrituras sobre el almacén offline (sin Firebase)."""
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from estudioparcial import AlmacenLocal, FirebaseService, LoteEscrituras  # noqa: E402
+
+
+@pytest.fixture
+def servicio(tmp_path):
+    servicio = FirebaseService(local_path=str(tmp_path / "usuarios.db"))
+    yield servicio
+    servicio.local.close()
+
+
+def fallar_una_vez(almacen, monkeypatch):
+    """El siguiente cambio del almacén falla dentro de la transacción (ROLLBACK)."""
+    original = almacen._anotar
+
+    def anotar(*args):
+        monkeypatch.setattr(almacen, "_anotar", original)
+        original(*args)
+        raise sqlite3.OperationalError("disk I/O error")
+    monkeypatch.setattr(almacen, "_anotar", anotar)
+
+
+def test_fusiona_escrituras_de_la_misma_clave(servicio):
+    with LoteEscrituras(servicio, ventana=60) as lote:
+        a = lote.push({"nombre": "Ana", "rol": "cliente"})
+        lote.update(a, {"rol": "admin"})
+        b = lote.push({"nombre": "Beto"})
+        lote.delete(b)
+    assert lote.metricas()["lotes"] == 1
+    assert lote.escrituras == 1
+    assert servicio.get(a) == {"nombre": "Ana", "rol": "admin"}
+    assert b not in servicio.local
+
+
+def test_excepcion_descarta_solo_lo_no_enviado(servicio):
+    with pytest.raises(RuntimeError):
+        with LoteEscrituras(servicio, ventana=60, tamano_maximo=2) as lote:
+            enviados = [lote.push({"i": 0}), lote.push({"i": 1})]  # tamano_maximo: sale ya
+            descartado = lote.push({"i": 2})
+            raise RuntimeError
+    assert all(key in servicio.local for key in enviados)
+    assert descartado not in servicio.local
+
+
+def test_envio_fallido_no_repite_claves(servicio, monkeypatch):
+    lote = LoteEscrituras(servicio, ventana=60)
+    a = lote.push({"nombre": "A"})
+    fallar_una_vez(servicio.local, monkeypatch)
+    with pytest.raises(sqlite3.OperationalError):
+        lote.flush()
+    assert lote.metricas()["pendientes"] == 1  # A vuelve a la cola
+
+    b = lote.push({"nombre": "B"})
+    c = servicio.push({"nombre": "C"})  # Escritura directa mientras A sigue pendiente
+    lote.close()
+
+    assert len({a, b, c}) == 3
+    assert servicio.get(a) == {"nombre": "A"}
+    assert servicio.get(b) == {"nombre": "B"}
+    assert servicio.get(c) == {"nombre": "C"}
+
+
+def test_claves_no_se_repiten_al_reabrir(tmp_path, monkeypatch):
+    ruta = str(tmp_path / "usuarios.db")
+    almacen = AlmacenLocal(ruta)
+    reservada = almacen.new_key()
+    fallar_una_vez(almacen, monkeypatch)
+    with pytest.raises(sqlite3.OperationalError):
+        almacen.push({"x": 1})
+    guardada = almacen.push({"x": 2})
+    almacen.close()
+
+    almacen = AlmacenLocal(ruta)
+    nueva = almacen.push({"x": 3})
+    almacen.close()
+    assert len({reservada, guardada, nueva}) == 3
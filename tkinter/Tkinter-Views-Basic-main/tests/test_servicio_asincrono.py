@@ -0,0 +1,127 @@
+"""Pruebas de ServicioAsincrono con un backend lento (latencia inyectada).
+
+Usan el intérprete Tcl sin ventana: after() y el bucle de eventos funcionan
+igual que con tk.Tk(), así que corren también sin pantalla.
+"""
+import os
+import sys
+import threading
+import time
+import tkinter as tk
+from _tkinter import DONT_WAIT
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import estudioparcial  # noqa: E402
+from estudioparcial import DespachadorTk, FirebaseService, ServicioAsincrono  # noqa: E402
+
+RETARDO = 2.0  # Segundos que tarda cada llamada al backend
+HUECO_MAXIMO = 0.25  # Mayor pausa admitida del bucle de eventos
+
+
+@pytest.fixture
+def raiz():
+    raiz = tk.Tcl()
+    yield raiz
+    for id_after in raiz.tk.splitlist(raiz.tk.call("after", "info")):  # Latidos pendientes
+        raiz.after_cancel(id_after)
+
+
+@pytest.fixture
+def servicio(tmp_path):
+    servicio = FirebaseService(local_path=str(tmp_path / "usuarios.db"))  # Archivo nuevo
+    yield servicio
+    servicio.local.close()
+
+
+def girar(raiz, hasta, limite):
+    """Hace vueltas del bucle de eventos (como mainloop) hasta que `hasta()` o el límite."""
+    fin = time.perf_counter() + limite
+    while not hasta() and time.perf_counter() < fin:
+        raiz.tk.dooneevent(DONT_WAIT) or time.sleep(0.001)
+    for _ in range(50):  # Entregas rezagadas: si sobrara alguna, debe verse
+        raiz.tk.dooneevent(DONT_WAIT)
+
+
+def test_backend_lento_no_congela_el_bucle_de_eventos(raiz, servicio):
+    despachador = DespachadorTk(raiz)
+    asincrono = ServicioAsincrono(servicio, despachador, latencia=RETARDO)
+    hilo_tk = threading.current_thread()
+    huecos = []
+    ultimo = [time.perf_counter()]
+
+    def latido():
+        ahora = time.perf_counter()
+        huecos.append(ahora - ultimo[0])
+        ultimo[0] = ahora
+        raiz.after(10, latido)
+
+    entregas = []
+
+    def anotar(nombre):
+        return lambda resultado: entregas.append((nombre, resultado, threading.current_thread() is hilo_tk))
+
+    raiz.after(10, latido)
+    t0 = time.perf_counter()
+    for i in range(4):  # Primeros push en paralelo sobre un archivo aún sin abrir
+        asincrono.ejecutar("push", {"nombre": f"Usuario {i}"}, al_terminar=anotar(f"push{i}"),
+                           al_fallar=anotar(f"error{i}"))
+    for i in range(3):
+        asincrono.ejecutar("count_with_version", grupo="refresco", al_terminar=anotar(f"refresco{i}"))
+    assert time.perf_counter() - t0 < 0.1  # Lanzar no espera a la red
+
+    girar(raiz, lambda: not asincrono.pendientes and len(entregas) >= 5, limite=4 * RETARDO + 5)
+    duracion = time.perf_counter() - t0
+    despachador.detener()
+    asincrono.cerrar()
+
+    nombres = sorted(nombre for nombre, _, _ in entregas)
+    assert nombres == ["push0", "push1", "push2", "push3", "refresco2"]
+    assert all(en_tk for _, _, en_tk in entregas), "Un resultado llegó fuera del hilo de Tk"
+    claves = [resultado for nombre, resultado, _ in entregas if nombre.startswith("push")]
+    assert len(set(claves)) == 4, claves
+    assert all(servicio.get(key) is not None for key in claves)
+    assert max(huecos) < HUECO_MAXIMO, f"El bucle se paró {max(huecos) * 1000:.0f} ms"
+    assert duracion < 3 * RETARDO  # Las llamadas van en paralelo, no en fila
+
+
+def test_error_del_backend_llega_a_al_fallar_en_el_hilo_de_tk(raiz, servicio):
+    despachador = DespachadorTk(raiz)
+    asincrono = ServicioAsincrono(servicio, despachador)
+    hilo_tk = threading.current_thread()
+    errores = []
+    asincrono.ejecutar("push", {"x": object()},  # No se puede guardar como JSON
+                       al_terminar=lambda _: pytest.fail("no debía terminar bien"),
+                       al_fallar=lambda ex: errores.append((ex, threading.current_thread() is hilo_tk)))
+
+    girar(raiz, lambda: errores, limite=5)
+    despachador.detener()
+    asincrono.cerrar()
+
+    assert len(errores) == 1
+    assert isinstance(errores[0][0], TypeError) and errores[0][1]
+    assert len(servicio.local) == 0
+
+
+def test_almacen_offline_se_abre_una_sola_vez(tmp_path, monkeypatch):
+    class AlmacenLento(estudioparcial.AlmacenLocal):
+        def __init__(self, ruta):
+            time.sleep(0.01)  # Agranda la ventana en la que otro hilo podría abrir otro
+            super().__init__(ruta)
+    monkeypatch.setattr(estudioparcial, "AlmacenLocal", AlmacenLento)
+    servicio = FirebaseService(local_path=str(tmp_path / "usuarios.db"))
+    salida = threading.Barrier(4)
+    almacenes = []
+
+    def abrir():
+        salida.wait()
+        almacenes.append(servicio.local)
+    hilos = [threading.Thread(target=abrir) for _ in range(4)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    servicio.local.close()
+    assert len({id(almacen) for almacen in almacenes}) == 1
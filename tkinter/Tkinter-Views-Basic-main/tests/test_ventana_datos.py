@@ -0,0 +1,253 @@
+"""Pruebas de VentanaDatos (la lista paginada) sobre un almacén offline en disco."""
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from estudioparcial import Cambio, FirebaseService, VentanaDatos  # noqa: E402
+
+
+@pytest.fixture
+def servicio(tmp_path):
+    servicio = FirebaseService(local_path=str(tmp_path / "usuarios.db"))
+    yield servicio
+    servicio.local.close()
+
+
+def llenar(servicio, n):
+    return servicio.local.push_many([{"nombre": f"Usuario {i}"} for i in range(n)])
+
+
+def todas(servicio):
+    return list(servicio.local.get_all().items())
+
+
+def comprobar(ventana, servicio):
+    """El trozo guardado coincide con la tabla real en su posición."""
+    verdad = todas(servicio)
+    assert ventana.total == len(verdad)
+    assert ventana.filas == verdad[ventana.inicio:ventana.inicio + len(ventana.filas)]
+
+
+class VistaSimulada:
+    """Lo que hace ListView sin Tk: los Cambios se encolan, las páginas se piden,
+    se leen y se entregan en momentos distintos, y al entregar una página primero
+    se aplican los Cambios encolados."""
+
+    def __init__(self, servicio, pagina=10, maximo=40):
+        self.servicio = servicio
+        self.ventana = VentanaDatos(servicio, pagina=pagina, maximo=maximo)
+        self.cola = []
+        servicio.subscribe(self.cola.append)
+        self.ventana.recargar()
+        self.pedido = None  # Pedido lanzado y aún sin leer
+        self.leida = None  # (pedido, respuesta) leída y aún sin entregar
+
+    def vaciar(self):
+        cambios, self.cola[:] = list(self.cola), []
+        if self.ventana.aplicar(cambios):
+            self.ventana.recargar()
+            self.pedido = self.leida = None
+
+    def pedir(self, posicion, cantidad):
+        offset, fin = self.ventana.limites(posicion, cantidad)
+        self.pedido = self.ventana.pedido_para(offset, fin)
+
+    def leer(self):
+        if self.pedido is not None:
+            metodo, argumentos = self.pedido[0], self.pedido[1]
+            self.leida = (self.pedido, getattr(self.servicio, metodo)(**argumentos))
+            self.pedido = None
+
+    def entregar(self):
+        if self.leida is not None:
+            self.vaciar()
+            if self.leida is not None:
+                self.ventana.incorporar(*self.leida)
+            self.leida = None
+
+
+def escribir_al_azar(servicio, rng):
+    claves = list(servicio.local.get_all())
+    accion = rng.random()
+    if accion < 0.4 or not claves:
+        servicio.push({"nombre": f"Nuevo {rng.random():.6f}"})
+    elif accion < 0.75:
+        servicio.delete(rng.choice(claves))
+    else:
+        servicio.update(rng.choice(claves), {"nombre": f"Cambiado {rng.random():.6f}"})
+
+
+@pytest.mark.parametrize("semilla", range(40))
+def test_paginas_y_cambios_intercalados(servicio, semilla, capsys):
+    """Una escritura entre pedir una página y recibirla no la cuenta dos veces."""
+    rng = random.Random(semilla)
+    llenar(servicio, rng.randrange(0, 120))
+    vista = VistaSimulada(servicio)
+    for _ in range(150):
+        paso = rng.random()
+        if paso < 0.3:
+            escribir_al_azar(servicio, rng)
+        elif paso < 0.5:
+            vista.pedir(rng.randrange(0, max(1, vista.ventana.total)), 12)
+        elif paso < 0.7:
+            vista.leer()
+        elif paso < 0.9:
+            vista.entregar()
+        else:
+            vista.vaciar()
+        if not vista.cola:  # Con todo aplicado, la ventana debe cuadrar
+            comprobar(vista.ventana, servicio)
+    vista.vaciar()
+    comprobar(vista.ventana, servicio)
+    capsys.readouterr()  # Los avisos del servicio no interesan
+
+
+def test_pagina_leida_en_otra_version_se_descarta(servicio):
+    llenar(servicio, 30)
+    ventana = VentanaDatos(servicio, pagina=10)
+    ventana.recargar()
+    pedido = ventana.pedido_para(0, 10)
+    servicio.push({"nombre": "Nueva"})  # Commit entre el pedido y la lectura
+    respuesta = getattr(servicio, pedido[0])(**pedido[1])
+    assert not ventana.incorporar(pedido, respuesta)
+    assert ventana.filas == [] and ventana.total == 30
+
+
+def test_added_de_clave_guardada_no_cambia_el_total(servicio):
+    claves = llenar(servicio, 5)
+    ventana = VentanaDatos(servicio, pagina=10)
+    ventana.recargar()
+    ventana.filas_en(0, 5)
+    siguiente = ventana.version + 1
+    assert not ventana.aplicar([Cambio(siguiente, "added", claves[2], {"nombre": "Otro"})])
+    assert ventana.total == 5 and ventana.filas[2] == (claves[2], {"nombre": "Otro"})
+
+
+def test_removed_de_clave_que_no_esta_no_cambia_el_total(servicio):
+    claves = llenar(servicio, 5)
+    servicio.local.delete(claves[2])
+    ventana = VentanaDatos(servicio, pagina=10)
+    ventana.recargar()
+    ventana.filas_en(0, 4)  # Toda la tabla: su hueco y lo que va tras el final se conocen
+    for clave in (claves[2], "local_999"):
+        assert not ventana.aplicar([Cambio(ventana.version + 1, "removed", clave, None)])
+    assert ventana.total == 4 and ventana.inicio == 0
+    assert [k for k, _ in ventana.filas] == [claves[0], claves[1], claves[3], claves[4]]
+
+
+@pytest.fixture
+def ventana(servicio):
+    """Ventana sobre 250 filas, páginas de 20 y como mucho 60 en memoria."""
+    llenar(servicio, 250)
+    ventana = VentanaDatos(servicio, pagina=20, maximo=60)
+    ventana.recargar()
+    return ventana
+
+
+def test_recargar_lee_total_y_version(servicio, ventana):
+    assert (ventana.version, ventana.total) == servicio.count_with_version()
+    assert ventana.filas == [] and ventana.inicio == 0 and ventana.consultas == 1
+    ventana.filas_en(100, 10)
+    ventana.reiniciar(7, 3)
+    assert (ventana.version, ventana.total, ventana.inicio, ventana.filas) == (7, 3, 0, [])
+
+
+def test_limites_se_ajustan_al_total(ventana):
+    assert ventana.limites(10, 5) == (10, 15)
+    assert ventana.limites(-4, 5) == (0, 5)
+    assert ventana.limites(248, 5) == (245, 250)  # Al final: se retrocede para llenar
+    ventana.reiniciar(ventana.version, 3)
+    assert ventana.limites(0, 5) == (0, 3)
+
+
+def test_filas_en_coincide_con_la_tabla(servicio, ventana):
+    verdad = todas(servicio)
+    for offset in (0, 15, 40, 200, 120, 119, 245, 0):
+        inicio, fin = ventana.limites(offset, 12)
+        assert ventana.filas_en(offset, 12) == verdad[inicio:fin]
+        assert len(ventana.filas) <= ventana.maximo
+
+
+def test_avanzar_usa_paginas_por_clave(ventana):
+    ventana.filas_en(0, 10)
+    consultas = ventana.consultas
+    assert ventana.filas_en(5, 10)  # Ya guardadas: no consulta
+    assert ventana.consultas == consultas
+    assert ventana.pedido_para(15, 25)[:2] == (
+        "get_page_with_version", {"start_after": ventana.filas[-1][0], "limit": 20})
+
+
+def test_retroceder_usa_end_before(ventana):
+    ventana.filas_en(100, 10)
+    inicio = ventana.inicio
+    metodo, argumentos, _, _ = ventana.pedido_para(inicio - 5, inicio + 5)
+    assert metodo == "get_page_with_version"
+    assert argumentos == {"end_before": ventana.filas[0][0], "limit": 20}
+
+
+def test_salto_lejano_usa_get_page_at(ventana):
+    ventana.filas_en(0, 10)
+    metodo, argumentos, offset, fin = ventana.pedido_para(200, 210)
+    assert metodo == "get_page_at_with_version"
+    assert argumentos == {"offset": 195, "limit": 20} and (offset, fin) == (200, 210)
+
+
+def test_pedido_para_none_si_ya_esta(ventana):
+    ventana.filas_en(30, 10)
+    assert ventana.pedido_para(30, 40) is None
+
+
+def test_incorporar_descarta_paginas_que_ya_no_encajan(servicio, ventana):
+    ventana.filas_en(0, 10)
+    pedido = ventana.pedido_para(20, 30)
+    respuesta = getattr(servicio, pedido[0])(**pedido[1])
+    ventana.filas_en(150, 10)  # La vista saltó mientras la página venía de camino
+    filas = list(ventana.filas)
+    assert not ventana.incorporar(pedido, respuesta)
+    assert ventana.filas == filas
+
+
+def test_pagina_vacia_al_final_corrige_el_total(servicio, ventana):
+    ventana.filas_en(240, 10)
+    assert not ventana.incorporar(("get_page_with_version", {"start_after": ventana.filas[-1][0]}, 250, 260),
+                                  (ventana.version, []))
+    assert ventana.total == ventana.inicio + len(ventana.filas)
+
+
+def test_aplicar_ignora_cambios_ya_incluidos(ventana):
+    assert not ventana.aplicar([Cambio(ventana.version, "removed", "local_1", None)])
+    assert ventana.total == 250
+
+
+def test_aplicar_pide_recargar_si_falta_un_cambio(ventana):
+    assert ventana.aplicar([Cambio(ventana.version + 2, "removed", "local_1", None)])
+
+
+def test_aplicar_pide_recargar_si_cambia_todo(ventana):
+    assert ventana.aplicar([Cambio(ventana.version + 1, "changed", None, None)])
+
+
+def test_aplicar_pide_recargar_con_demasiados_cambios(ventana):
+    v = ventana.version
+    muchos = [Cambio(v + i, "changed", f"local_{i}", {"x": i}) for i in range(1, VentanaDatos.MAXIMO_PARCHE + 2)]
+    assert ventana.aplicar(muchos)
+    assert not ventana.aplicar(muchos[:VentanaDatos.MAXIMO_PARCHE])
+    assert ventana.version == v + VentanaDatos.MAXIMO_PARCHE
+
+
+def test_aplicar_sigue_a_la_tabla(servicio, ventana, capsys):
+    cambios = []
+    servicio.subscribe(cambios.append)
+    ventana.filas_en(100, 20)
+    claves = [k for k, _ in ventana.filas]
+    servicio.delete(claves[0])  # Dentro del trozo
+    servicio.delete("local_5")  # Antes del trozo: se corre una posición
+    servicio.update(claves[3], {"nombre": "Cambiado"})
+    servicio.push({"nombre": "Al final"})  # Fuera del trozo
+    assert not ventana.aplicar(cambios)
+    comprobar(ventana, servicio)
+    capsys.readouterr()